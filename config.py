@@ -37,6 +37,10 @@ def init_logging(level, log_to_file):
     websockets_logger.setLevel(logging.INFO)
     requests_logger = logging.getLogger("urllib3")
     requests_logger.setLevel(logging.INFO)
+    httpx_logger = logging.getLogger("httpx")
+    httpx_logger.setLevel(logging.WARNING)
+    httpcore_logger = logging.getLogger("httpcore")
+    httpcore_logger.setLevel(logging.INFO)
 
     # Gets the root logger to set handlers/formatters
     logger = logging.getLogger()
@@ -64,6 +68,19 @@ class _ShowdownConfig:
     pre_battle_msg: str
 
     damage_calc_type: str
+    transposition_table_size: int
+    merge_equivalent_states: bool
+    instruction_cache_size: int
+    keep_instruction_cache: bool
+    batch_evaluation: bool
+    search_time_budget: float
+    search_processes: int
+    decision_executor: str
+    decision_workers: int
+    max_concurrent_battles: int
+    smogon_stats_cache_dir: str
+    smogon_stats_cache_ttl: int
+    smogon_stats_offline: bool
     pokemon_mode: str
     save_replay: bool
     start_timer: str
@@ -105,6 +122,19 @@ class _ShowdownConfig:
 
         # Other Showdown Settings
         self.damage_calc_type = env("DAMAGE_CALC_TYPE", "average")
+        self.transposition_table_size = env.int("TRANSPOSITION_TABLE_SIZE", 100000)
+        self.merge_equivalent_states = env.bool("MERGE_EQUIVALENT_STATES", False)
+        self.instruction_cache_size = env.int("INSTRUCTION_CACHE_SIZE", 20000)
+        self.keep_instruction_cache = env.bool("KEEP_INSTRUCTION_CACHE", False)
+        self.batch_evaluation = env.bool("BATCH_EVALUATION", False)
+        self.search_time_budget = env.float("SEARCH_TIME_BUDGET", 0)
+        self.search_processes = env.int("SEARCH_PROCESSES", 0)
+        self.decision_executor = env("DECISION_EXECUTOR", "thread")
+        self.decision_workers = env.int("DECISION_WORKERS", 1)
+        self.max_concurrent_battles = env.int("MAX_CONCURRENT_BATTLES", 1)
+        self.smogon_stats_cache_dir = env("SMOGON_STATS_CACHE_DIR", "cache")
+        self.smogon_stats_cache_ttl = env.int("SMOGON_STATS_CACHE_TTL", 86400)
+        self.smogon_stats_offline = env.bool("SMOGON_STATS_OFFLINE", False)
         self.pokemon_mode = env("POKEMON_MODE")
         self.save_replay = env.bool("SAVE_REPLAY", False)
         self.start_timer = env.bool("START_TIMER", False)
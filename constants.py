@@ -81,32 +81,63 @@ SMOGON_HAS_STATS_PAGE_SUFFIXES = [
 # this has to do with the Pokemon-Showdown PROTOCOL
 ID_LOOKUP = {"p1": "p2", "p2": "p1"}
 
+
 # mutator strings
-MUTATOR_SWITCH = "switch"
-MUTATOR_APPLY_VOLATILE_STATUS = "apply_volatile_status"
-MUTATOR_REMOVE_VOLATILE_STATUS = "remove_volatile_status"
-MUTATOR_DAMAGE = "damage"
-MUTATOR_HEAL = "heal"
-MUTATOR_BOOST = "boost"
-MUTATOR_UNBOOST = "unboost"
-MUTATOR_APPLY_STATUS = "apply_status"
-MUTATOR_REMOVE_STATUS = "remove_status"
-MUTATOR_SIDE_START = "side_start"
-MUTATOR_SIDE_END = "side_end"
-MUTATOR_WISH_START = "wish_start"
-MUTATOR_WISH_DECREMENT = "wish_decrement"
-MUTATOR_FUTURESIGHT_START = "futuresight_start"
-MUTATOR_FUTURESIGHT_DECREMENT = "futuresight_decrement"
-MUTATOR_DISABLE_MOVE = "disable_move"
-MUTATOR_ENABLE_MOVE = "enable_move"
-MUTATOR_WEATHER_START = "weather_start"
-MUTATOR_WEATHER_END = "weather_end"
-MUTATOR_FIELD_START = "field_start"
-MUTATOR_FIELD_END = "field_end"
-MUTATOR_TOGGLE_TRICKROOM = "toggle_trickroom"
-MUTATOR_CHANGE_TYPE = "change_type"
-MUTATOR_CHANGE_ITEM = "change_item"
-MUTATOR_CHANGE_STATS = "change_stats"
+# an opcode is a string that also has the index of its method in the StateMutator dispatch tables
+# it is equal to its name, so instructions can be compared with ones written using plain strings
+class Opcode(str):
+    __slots__ = ()
+    opcode_index = None
+
+    def __reduce__(self):
+        return get_opcode, (str(self),)
+
+
+OPCODES = []
+
+
+def make_opcode(name):
+    # each opcode has its own class so `opcode_index` is a class attribute, which is the fastest to look up
+    opcode_class = type(
+        "Opcode", (Opcode,), {"__slots__": (), "opcode_index": len(OPCODES)}
+    )
+    OPCODES.append(opcode_class(name))
+    return OPCODES[-1]
+
+
+def get_opcode(name):
+    # the opcode for an instruction name given as a plain string
+    for opcode in OPCODES:
+        if opcode == name:
+            return opcode
+    raise ValueError("{} is not a mutator instruction".format(name))
+
+
+MUTATOR_SWITCH = make_opcode("switch")
+MUTATOR_APPLY_VOLATILE_STATUS = make_opcode("apply_volatile_status")
+MUTATOR_REMOVE_VOLATILE_STATUS = make_opcode("remove_volatile_status")
+MUTATOR_DAMAGE = make_opcode("damage")
+MUTATOR_HEAL = make_opcode("heal")
+MUTATOR_BOOST = make_opcode("boost")
+MUTATOR_UNBOOST = make_opcode("unboost")
+MUTATOR_APPLY_STATUS = make_opcode("apply_status")
+MUTATOR_REMOVE_STATUS = make_opcode("remove_status")
+MUTATOR_SIDE_START = make_opcode("side_start")
+MUTATOR_SIDE_END = make_opcode("side_end")
+MUTATOR_WISH_START = make_opcode("wish_start")
+MUTATOR_WISH_DECREMENT = make_opcode("wish_decrement")
+MUTATOR_FUTURESIGHT_START = make_opcode("futuresight_start")
+MUTATOR_FUTURESIGHT_DECREMENT = make_opcode("futuresight_decrement")
+MUTATOR_DISABLE_MOVE = make_opcode("disable_move")
+MUTATOR_ENABLE_MOVE = make_opcode("enable_move")
+MUTATOR_WEATHER_START = make_opcode("weather_start")
+MUTATOR_WEATHER_END = make_opcode("weather_end")
+MUTATOR_FIELD_START = make_opcode("field_start")
+MUTATOR_FIELD_END = make_opcode("field_end")
+MUTATOR_TOGGLE_TRICKROOM = make_opcode("toggle_trickroom")
+MUTATOR_CHANGE_TYPE = make_opcode("change_type")
+MUTATOR_CHANGE_ITEM = make_opcode("change_item")
+MUTATOR_CHANGE_STATS = make_opcode("change_stats")
 
 
 DAMAGE = "damage"
@@ -318,6 +349,8 @@ BOOST_RESET_MOVES = {"haze", "clearsmog"}
 
 ABILITY_AFTER_MOVE = {"static", "flamebody"}
 
+SPEED_VOLATILE_STATUSES = {"quarkdrivespe", "protosynthesisspe"}
+
 WEIGHT_BASED_MOVES = {
     "heavyslam",
     "heatcrash",
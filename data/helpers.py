@@ -1,3 +1,4 @@
+import asyncio
 import constants
 
 import data
@@ -160,38 +161,42 @@ def get_most_likely_spread(pkmn_name):
     return sets[SPREADS_STRING][0]
 
 
-def get_standard_battle_sets(battle_mode, pokemon_names=None):
+async def get_standard_battle_sets(battle_mode, pokemon_names=None):
     if any(battle_mode.endswith(s) for s in constants.SMOGON_HAS_STATS_PAGE_SUFFIXES):
         smogon_stats_file_name = get_smogon_stats_file_name(battle_mode)
         logger.debug(
             "Making HTTP request to {} for usage stats".format(smogon_stats_file_name)
         )
-        smogon_usage_data = get_pokemon_information(
+        smogon_usage_data = await get_pokemon_information(
             smogon_stats_file_name, pkmn_names=pokemon_names
         )
     else:
         # use ALL data for a mode like battle-factory
+        # the requests are made at the same time
         logger.debug("Making HTTP request for ALL usage stats\nplease wait...")
-        ubers_data = get_pokemon_information(
-            get_smogon_stats_file_name("gen9ubers"), pkmn_names=pokemon_names
-        )
-        ou_data = get_pokemon_information(
-            get_smogon_stats_file_name("gen9ou"), pkmn_names=pokemon_names
-        )
-        uu_data = get_pokemon_information(
-            get_smogon_stats_file_name("gen9uu"), pkmn_names=pokemon_names
-        )
-        ru_data = get_pokemon_information(
-            get_smogon_stats_file_name("gen9ru"), pkmn_names=pokemon_names
-        )
-        nu_data = get_pokemon_information(
-            get_smogon_stats_file_name("gen9nu"), pkmn_names=pokemon_names
-        )
-        pu_data = get_pokemon_information(
-            get_smogon_stats_file_name("gen9pu"), pkmn_names=pokemon_names
-        )
-        lc_data = get_pokemon_information(
-            get_smogon_stats_file_name("gen9lc"), pkmn_names=pokemon_names
+        (
+            ubers_data,
+            ou_data,
+            uu_data,
+            ru_data,
+            nu_data,
+            pu_data,
+            lc_data,
+        ) = await asyncio.gather(
+            *(
+                get_pokemon_information(
+                    get_smogon_stats_file_name(game_mode), pkmn_names=pokemon_names
+                )
+                for game_mode in [
+                    "gen9ubers",
+                    "gen9ou",
+                    "gen9uu",
+                    "gen9ru",
+                    "gen9nu",
+                    "gen9pu",
+                    "gen9lc",
+                ]
+            )
         )
 
         smogon_usage_data = lc_data
@@ -1,4 +1,6 @@
+from collections import namedtuple
 from copy import deepcopy
+from types import MappingProxyType
 import os
 import json
 import logging
@@ -7,6 +9,8 @@ import data
 from data import all_move_json
 from data import pokedex
 from showdown.engine import damage_calculator
+from showdown.engine.compiled_move import compile_moves
+from showdown.engine.compiled_move import compiled_moves
 
 logger = logging.getLogger(__name__)
 
@@ -35,141 +39,177 @@ PRE_PHYSICAL_SPECIAL_SPLIT_CATEGORY_LOOKUP = {
 }
 
 
-def apply_move_mods(gen_number):
+# the constants that are different between generations
+GENERATION_CONSTANTS = [
+    "HIDDEN_POWER_TYPE_STRING_INDEX",
+    "HIDDEN_POWER_ACTIVE_MOVE_BASE_DAMAGE_STRING",
+    "HIDDEN_POWER_RESERVE_MOVE_BASE_DAMAGE_STRING",
+    "REQUEST_DICT_ABILITY",
+    "ICE_WEATHER",
+]
+
+# the data for one generation
+# it is built once and shared by every battle of that generation
+# the data module is given deep copies of its dictionaries, so changing the data module cannot change it
+GenerationData = namedtuple(
+    "GenerationData",
+    [
+        "gen_number",
+        "all_move_json",
+        "compiled_moves",
+        "pokedex",
+        "random_battle_sets",
+        "constants",
+        "terrain_damage_boost",
+    ],
+)
+
+# the current generation's data, before any mods are applied
+base_all_move_json = deepcopy(all_move_json)
+base_pokedex = deepcopy(pokedex)
+base_random_battle_sets = data.random_battle_sets
+base_constants = {name: getattr(constants, name) for name in GENERATION_CONSTANTS}
+base_terrain_damage_boost = damage_calculator.TERRAIN_DAMAGE_BOOST
+
+
+def apply_move_mods(move_json, gen_number):
     logger.debug("Applying move mod for gen {}".format(gen_number))
     for gen_number in reversed(range(gen_number, CURRENT_GEN)):
         with open("{}/gen{}_move_mods.json".format(PWD, gen_number), "r") as f:
             move_mods = json.load(f)
         for move, modifications in move_mods.items():
-            all_move_json[move].update(modifications)
+            move_json[move].update(modifications)
 
 
-def apply_pokedex_mods(gen_number):
+def apply_pokedex_mods(pokedex_json, gen_number):
     logger.debug("Applying dex mod for gen {}".format(gen_number))
     for gen_number in reversed(range(gen_number, CURRENT_GEN)):
         with open("{}/gen{}_pokedex_mods.json".format(PWD, gen_number), "r") as f:
             pokedex_mods = json.load(f)
         for pokemon, modifications in pokedex_mods.items():
-            pokedex[pokemon].update(modifications)
+            pokedex_json[pokemon].update(modifications)
 
 
-def set_random_battle_sets(gen_number):
-    logger.debug("Setting random battle sets for gen {}".format(gen_number))
+def load_random_battle_sets(gen_number):
+    logger.debug("Loading random battle sets for gen {}".format(gen_number))
     with open("{}/random_battle_sets_gen{}.json".format(PWD, gen_number), "r") as f:
-        data.random_battle_sets = json.load(f)
+        return json.load(f)
 
 
-def apply_gen_3_mods():
-    # no pokedex mods in gen3 (apparently)
-    constants.HIDDEN_POWER_TYPE_STRING_INDEX = -2
-    constants.HIDDEN_POWER_ACTIVE_MOVE_BASE_DAMAGE_STRING = "70"
-    constants.HIDDEN_POWER_RESERVE_MOVE_BASE_DAMAGE_STRING = "70"
-    constants.REQUEST_DICT_ABILITY = "baseAbility"
-    apply_move_mods(3)
-    undo_physical_special_split()
+def undo_physical_special_split(move_json):
+    for move_name, move_data in move_json.items():
+        if move_data[constants.CATEGORY] in constants.DAMAGING_CATEGORIES:
+            try:
+                move_data[constants.CATEGORY] = (
+                    PRE_PHYSICAL_SPECIAL_SPLIT_CATEGORY_LOOKUP[
+                        move_data[constants.TYPE]
+                    ]
+                )
+            except KeyError:
+                pass
 
 
-def apply_gen_4_mods():
-    constants.HIDDEN_POWER_TYPE_STRING_INDEX = -2
-    constants.HIDDEN_POWER_ACTIVE_MOVE_BASE_DAMAGE_STRING = "70"
-    constants.HIDDEN_POWER_RESERVE_MOVE_BASE_DAMAGE_STRING = "70"
-    constants.REQUEST_DICT_ABILITY = "baseAbility"
-    apply_move_mods(4)
-    apply_pokedex_mods(4)
+def get_gen_number(game_mode):
+    # game modes look like 'gen9randombattle'
+    if game_mode[:3] == "gen" and game_mode[3:4].isdigit():
+        return int(game_mode[3])
+    return CURRENT_GEN
 
 
-def apply_gen_5_mods():
-    constants.HIDDEN_POWER_TYPE_STRING_INDEX = -2
-    constants.HIDDEN_POWER_ACTIVE_MOVE_BASE_DAMAGE_STRING = "70"
-    constants.HIDDEN_POWER_RESERVE_MOVE_BASE_DAMAGE_STRING = "70"
-    constants.REQUEST_DICT_ABILITY = "baseAbility"
-    apply_move_mods(5)
-    apply_pokedex_mods(5)
+def build_generation_data(gen_number):
+    logger.debug("Building the data for gen {}".format(gen_number))
+    if gen_number >= CURRENT_GEN:
+        move_json = base_all_move_json
+        pokedex_json = base_pokedex
+    else:
+        move_json = deepcopy(base_all_move_json)
+        pokedex_json = deepcopy(base_pokedex)
 
+    gen_constants = dict(base_constants)
+    random_battle_sets = base_random_battle_sets
+    terrain_damage_boost = base_terrain_damage_boost
 
-def apply_gen_6_mods():
-    constants.REQUEST_DICT_ABILITY = "baseAbility"
-    apply_move_mods(6)
-    apply_pokedex_mods(6)
+    if gen_number in (3, 4, 5):
+        gen_constants["HIDDEN_POWER_TYPE_STRING_INDEX"] = -2
+        gen_constants["HIDDEN_POWER_ACTIVE_MOVE_BASE_DAMAGE_STRING"] = "70"
+        gen_constants["HIDDEN_POWER_RESERVE_MOVE_BASE_DAMAGE_STRING"] = "70"
+    if gen_number in (3, 4, 5, 6):
+        gen_constants["REQUEST_DICT_ABILITY"] = "baseAbility"
 
+    # there are no mods for gen1 and gen2
+    if 3 <= gen_number < CURRENT_GEN:
+        apply_move_mods(move_json, gen_number)
 
-def apply_gen_7_mods():
-    apply_move_mods(7)
-    apply_pokedex_mods(7)
+    # no pokedex mods in gen3 (apparently)
+    if 4 <= gen_number < CURRENT_GEN:
+        apply_pokedex_mods(pokedex_json, gen_number)
 
+    if gen_number == 3:
+        undo_physical_special_split(move_json)
 
-def apply_gen_8_mods():
-    apply_move_mods(8)
-    apply_pokedex_mods(8)
+    if gen_number < 8:
+        random_battle_sets = load_random_battle_sets(7)
+        terrain_damage_boost = 1.5  # terrain gave a 1.5x damage boost prior to gen8
 
+    if gen_number < 9:
+        gen_constants["ICE_WEATHER"] = (
+            constants.HAIL
+        )  # ice-type weather was hail prior to gen9
 
-def undo_physical_special_split():
-    for move_name, move_data in all_move_json.items():
-        if move_data[constants.CATEGORY] in constants.DAMAGING_CATEGORIES:
-            try:
-                move_data[
-                    constants.CATEGORY
-                ] = PRE_PHYSICAL_SPECIAL_SPLIT_CATEGORY_LOOKUP[
-                    move_data[constants.TYPE]
-                ]
-            except KeyError:
-                pass
+    return GenerationData(
+        gen_number,
+        MappingProxyType(move_json),
+        MappingProxyType(compile_moves(move_json)),
+        MappingProxyType(pokedex_json),
+        MappingProxyType(random_battle_sets),
+        MappingProxyType(gen_constants),
+        terrain_damage_boost,
+    )
 
 
-# Last Generation
-last_gen = None
+# the data of every generation that has been built, by generation number
+generation_data = {}
 
-# Create verification check backups
-pokedex_backup = deepcopy(pokedex)
-all_move_json_backup = deepcopy(all_move_json)
 
+def get_generation_data(game_mode):
+    gen_number = get_gen_number(game_mode)
+    if gen_number not in generation_data:
+        generation_data[gen_number] = build_generation_data(gen_number)
+    return generation_data[gen_number]
 
-def apply_mods(game_mode):
-    global last_gen
-
-    # If the game mode has changed
-    if last_gen == None or (not last_gen in game_mode):
-        logger.debug(f"Applying mods for '{game_mode}' ....")
-
-        # Restore the original data
-        pokedex = deepcopy(pokedex_backup)
-        all_move_json = deepcopy(all_move_json_backup)
-
-        if "gen1" in game_mode:
-            last_gen = "gen1"
-        elif "gen2" in game_mode:
-            last_gen = "gen2"
-        elif "gen3" in game_mode:
-            apply_gen_3_mods()
-            last_gen = "gen3"
-        elif "gen4" in game_mode:
-            apply_gen_4_mods()
-            last_gen = "gen4"
-        elif "gen5" in game_mode:
-            apply_gen_5_mods()
-            last_gen = "gen5"
-        elif "gen6" in game_mode:
-            apply_gen_6_mods()
-            last_gen = "gen6"
-        elif "gen7" in game_mode:
-            apply_gen_7_mods()
-            last_gen = "gen7"
-        elif "gen8" in game_mode:
-            apply_gen_8_mods()
-            last_gen = "gen8"
-        elif "gen9" in game_mode:
-            last_gen = "gen9"
-
-        if game_mode[:3] == "gen":
-            if int(game_mode[3]) < 8:
-                set_random_battle_sets(7)
-                damage_calculator.TERRAIN_DAMAGE_BOOST = (
-                    1.5  # terrain gave a 1.5x damage boost prior to gen8
-                )
-            if int(game_mode[3]) < 9:
-                constants.ICE_WEATHER = (
-                    constants.HAIL
-                )  # ice-type weather was hail prior to gen9
 
-    else:
-        logger.debug("Generation not changed. Mod not modified.")
+# the generation whose data is in the data module
+active_generation_data = None
+
+
+def apply_mods(game_mode):
+    global active_generation_data
+
+    gen_data = get_generation_data(game_mode)
+    if gen_data is active_generation_data:
+        return
+
+    logger.debug("Using the data for gen {}".format(gen_data.gen_number))
+
+    # other modules hold references to these dictionaries so they are changed in place
+    # a thread still searching with the old generation would see them change,
+    # so battles of different generations are only played at the same time in separate processes
+    # compiled moves cannot be changed so they are shared with the generation's data
+    all_move_json.clear()
+    all_move_json.update(deepcopy(dict(gen_data.all_move_json)))
+    compiled_moves.clear()
+    compiled_moves.update(gen_data.compiled_moves)
+    pokedex.clear()
+    pokedex.update(deepcopy(dict(gen_data.pokedex)))
+
+    for name, value in gen_data.constants.items():
+        setattr(constants, name, value)
+    damage_calculator.TERRAIN_DAMAGE_BOOST = gen_data.terrain_damage_boost
+
+    # random battles use the random battle sets of the generation
+    random_battle_sets = deepcopy(dict(gen_data.random_battle_sets))
+    if data.pokemon_sets is data.random_battle_sets:
+        data.pokemon_sets = random_battle_sets
+    data.random_battle_sets = random_battle_sets
+
+    active_generation_data = gen_data
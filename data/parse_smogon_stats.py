@@ -1,10 +1,18 @@
+import asyncio
+import json
 import logging
 import ntpath
+import re
+import time
 from datetime import datetime
 from dateutil import relativedelta
 
-import requests
-
+from config import ShowdownConfig
+from data.smogon_stats_cache import find_newest_cache_key
+from data.smogon_stats_cache import get_cache_key
+from data.smogon_stats_cache import read_cache
+from data.smogon_stats_cache import write_cache
+from showdown import http_client
 from showdown.engine.helpers import spreads_are_alike
 from showdown.engine.helpers import normalize_name
 
@@ -17,6 +25,20 @@ SPREADS_STRING = "spreads"
 ABILITY_STRING = "abilities"
 EFFECTIVENESS = "effectiveness"
 
+# a run of json that does not open or close an object:
+# anything outside of strings and brackets, whole strings, and arrays of numbers
+JSON_WITHOUT_NESTING = re.compile(
+    r'[^"{}\[\]]*(?:(?:"[^"\\]*(?:\\.[^"\\]*)*"|\[[^"{}\[\]]*\])[^"{}\[\]]*)*'
+)
+JSON_OBJECT_KEY = re.compile(r'\s*,?\s*("[^"\\]*(?:\\.[^"\\]*)*")\s*:\s*')
+JSON_WHITESPACE = re.compile(r"\s*")
+JSON_OBJECT_START = re.compile(r"\s*{")
+JSON_OBJECT_END = re.compile(r"\s*}")
+
+# downloads of stats files that are in progress, by cache key
+# a file that is already being downloaded is not downloaded again
+stats_downloads = {}
+
 
 def get_smogon_stats_file_name(game_mode, month_delta=1):
     """
@@ -44,26 +66,289 @@ def pokemon_is_similar(normalized_name, list_of_pkmn_names):
     )
 
 
-def get_pokemon_information(smogon_stats_url, pkmn_names=None):
-    r = requests.get(smogon_stats_url)
-    if r.status_code == 404:
-        r = requests.get(
+class PokemonNameIndex:
+    """Finds whether a name is in `pkmn_names` or similar to one of them.
+    Gives the same result as `pokemon_is_similar` without comparing the name to every pokemon
+    """
+
+    def __init__(self, pkmn_names):
+        self.names = set(pkmn_names)
+        self.prefixes = {n[:i] for n in self.names for i in range(len(n) + 1)}
+
+    def is_similar(self, normalized_name):
+        # either a name starts with `normalized_name` or `normalized_name` starts with a name
+        return normalized_name in self.prefixes or any(
+            normalized_name[:i] in self.names for i in range(len(normalized_name) + 1)
+        )
+
+    def __contains__(self, normalized_name):
+        return normalized_name in self.names or self.is_similar(normalized_name)
+
+
+class SmogonStatsParser:
+    """Reads the pokemon in a chaos stats file from pieces of the file as it is downloaded.
+    Only the pokemon that are in `name_index` are decoded; the rest are skipped without keeping them.
+    Every pokemon is decoded when there is no `name_index`"""
+
+    # what the parser is looking at in the file
+    FILE_START = "file_start"
+    FILE_KEY = "file_key"
+    FILE_VALUE = "file_value"
+    POKEMON_NAME = "pokemon_name"
+    POKEMON_VALUE = "pokemon_value"
+    FILE_END = "file_end"
+
+    def __init__(self, name_index=None):
+        self.name_index = name_index
+        self.infos = {}
+
+        self.buffer = ""
+        self.position = 0
+        self.state = self.FILE_START
+
+        # the object being skipped or decoded
+        self.key = None
+        self.value_start = None
+        self.depth = 0
+
+    def feed(self, text):
+        self.buffer += text
+        while self.state != self.FILE_END and self.parse_next():
+            pass
+
+        # everything before the position is done with
+        # unless it is the start of a pokemon that will be decoded
+        keep_from = self.position
+        if (
+            self.state == self.POKEMON_VALUE
+            and self.value_start is not None
+            and self.is_wanted(self.key)
+        ):
+            keep_from = self.value_start
+        self.buffer = self.buffer[keep_from:]
+        self.position -= keep_from
+        if self.value_start is not None:
+            self.value_start -= keep_from
+
+    def close(self):
+        if self.state != self.FILE_END:
+            raise ValueError("The stats file ended early")
+        return self.infos
+
+    def is_wanted(self, pkmn_name):
+        return self.name_index is None or normalize_name(pkmn_name) in self.name_index
+
+    def parse_next(self):
+        # returns False when more of the file is needed
+        if self.state == self.FILE_START:
+            match = JSON_OBJECT_START.match(self.buffer, self.position)
+            if match is None:
+                return False
+            self.position = match.end()
+            self.state = self.FILE_KEY
+
+        elif self.state in (self.FILE_KEY, self.POKEMON_NAME):
+            end_match = JSON_OBJECT_END.match(self.buffer, self.position)
+            if end_match is not None:
+                self.position = end_match.end()
+                self.state = (
+                    self.FILE_END if self.state == self.FILE_KEY else self.FILE_KEY
+                )
+                return True
+
+            key_match = JSON_OBJECT_KEY.match(self.buffer, self.position)
+            if key_match is None:
+                return False
+            self.key = json.loads(key_match.group(1))
+            self.position = key_match.end()
+            self.value_start = None
+            self.state = (
+                self.FILE_VALUE if self.state == self.FILE_KEY else self.POKEMON_VALUE
+            )
+
+        else:
+            return self.parse_value()
+
+        return True
+
+    def parse_value(self):
+        if self.value_start is None:
+            self.position = JSON_WHITESPACE.match(self.buffer, self.position).end()
+            if self.position == len(self.buffer):
+                return False
+            if self.buffer[self.position] not in "{[":
+                raise ValueError("Expected an object for {}".format(self.key))
+
+            # the pokemon are in the object named `data`
+            if self.state == self.FILE_VALUE and self.key == "data":
+                self.position += 1
+                self.state = self.POKEMON_NAME
+                return True
+
+            self.value_start = self.position
+            self.depth = 0
+
+        while True:
+            self.position = JSON_WITHOUT_NESTING.match(self.buffer, self.position).end()
+
+            # the rest of the object, or the rest of a string in it, has not been downloaded yet
+            if self.position == len(self.buffer) or self.buffer[self.position] == '"':
+                return False
+
+            if self.buffer[self.position] in "{[":
+                self.depth += 1
+            else:
+                self.depth -= 1
+            self.position += 1
+
+            if self.depth == 0:
+                break
+
+        if self.state == self.POKEMON_VALUE:
+            if self.is_wanted(self.key):
+                self.infos[self.key] = json.loads(
+                    self.buffer[self.value_start : self.position]
+                )
+            self.state = self.POKEMON_NAME
+        else:
+            self.state = self.FILE_KEY
+
+        self.value_start = None
+        return True
+
+
+async def read_smogon_stats(smogon_stats_url, name_index):
+    # returns None if there are no stats at this url
+    async with http_client.stream("GET", smogon_stats_url) as r:
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+
+        parser = SmogonStatsParser(name_index)
+        async for text in r.aiter_text():
+            parser.feed(text)
+        return parser.close()
+
+
+async def get_smogon_stats(smogon_stats_url, pkmn_names=None):
+    # only the pokemon in `pkmn_names`, or with a name similar to one of them, are read
+    name_index = PokemonNameIndex(pkmn_names) if pkmn_names else None
+
+    infos = await read_smogon_stats(smogon_stats_url, name_index)
+    if infos is None:
+        infos = await read_smogon_stats(
             get_smogon_stats_file_name(
                 ntpath.basename(smogon_stats_url.replace("-0.json", "")), month_delta=2
+            ),
+            name_index,
+        )
+
+    return infos
+
+
+async def download_all_pokemon_information(smogon_stats_url, cache_key):
+    infos = parse_pokemon_information(await get_smogon_stats(smogon_stats_url))
+    write_cache(ShowdownConfig.smogon_stats_cache_dir, cache_key, infos)
+    logger.debug("Saved stats for {} to the cache".format(cache_key))
+    return infos
+
+
+def finish_download(cache_key, task):
+    del stats_downloads[cache_key]
+
+    # nothing waits for a background refresh so its errors are logged here
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(
+            "Could not download stats for {}: {}".format(
+                cache_key, repr(task.exception())
             )
         )
 
-    infos = r.json()["data"]
+
+def start_download(smogon_stats_url, cache_key):
+    if cache_key not in stats_downloads:
+        task = asyncio.ensure_future(
+            download_all_pokemon_information(smogon_stats_url, cache_key)
+        )
+        stats_downloads[cache_key] = task
+        task.add_done_callback(lambda t: finish_download(cache_key, t))
+
+    return stats_downloads[cache_key]
+
+
+async def get_all_pokemon_information(smogon_stats_url):
+    # the stats for every pokemon in the file, from the cache when possible
+    cache_dir = ShowdownConfig.smogon_stats_cache_dir
+    cache_key = get_cache_key(smogon_stats_url)
+    cached = read_cache(cache_dir, cache_key) if cache_dir else None
+
+    if ShowdownConfig.smogon_stats_offline:
+        # stats from an earlier month are better than none
+        if cached is None and cache_dir:
+            newest_cache_key = find_newest_cache_key(cache_dir, cache_key)
+            if newest_cache_key is not None:
+                cached = read_cache(cache_dir, newest_cache_key)
+
+        if cached is None:
+            logger.warning("No cached stats for {} in offline mode".format(cache_key))
+            return {}
+
+        return cached[1]
+
+    if cached is None:
+        return await start_download(smogon_stats_url, cache_key)
+
+    saved_time, infos = cached
+    if time.time() - saved_time > ShowdownConfig.smogon_stats_cache_ttl:
+        # the old stats are used until the new ones have been downloaded
+        logger.debug("Refreshing stats for {} in the background".format(cache_key))
+        start_download(smogon_stats_url, cache_key)
+
+    return infos
+
+
+async def get_pokemon_information(smogon_stats_url, pkmn_names=None):
+    if ShowdownConfig.smogon_stats_cache_dir or ShowdownConfig.smogon_stats_offline:
+        all_infos = await get_all_pokemon_information(smogon_stats_url)
+        return filter_pokemon_information(all_infos, pkmn_names=pkmn_names)
+
+    infos = await get_smogon_stats(smogon_stats_url, pkmn_names=pkmn_names)
+    return parse_pokemon_information(infos, pkmn_names=pkmn_names)
+
+
+def filter_pokemon_information(all_infos, pkmn_names=None):
+    # gives the same result as `parse_pokemon_information` from the stats of every pokemon
+    final_infos = {}
+    name_index = PokemonNameIndex(pkmn_names) if pkmn_names else None
+    for normalized_name, pkmn_information in all_infos.items():
+        if name_index is not None and normalized_name not in name_index:
+            continue
+        else:
+            logger.debug(
+                "Adding {} to sets lookup for this battle".format(normalized_name)
+            )
+
+        final_infos[normalized_name] = dict(pkmn_information)
+        if pkmn_names is not None:
+            final_infos[normalized_name][EFFECTIVENESS] = {
+                counter_name: effectiveness
+                for counter_name, effectiveness in pkmn_information[
+                    EFFECTIVENESS
+                ].items()
+                if counter_name in pkmn_names
+            }
+
+    return final_infos
+
+
+def parse_pokemon_information(infos, pkmn_names=None):
     final_infos = {}
+    name_index = PokemonNameIndex(pkmn_names) if pkmn_names else None
     for pkmn_name, pkmn_information in infos.items():
         normalized_name = normalize_name(pkmn_name)
 
         # if `pkmn_names` is provided, only find data on pkmn in that list
-        if (
-            pkmn_names
-            and normalized_name not in pkmn_names
-            and not pokemon_is_similar(normalized_name, pkmn_names)
-        ):
+        if name_index is not None and normalized_name not in name_index:
             continue
         else:
             logger.debug(
@@ -82,7 +367,7 @@ def get_pokemon_information(smogon_stats_url, pkmn_names=None):
             "Checks and Counters"
         ].items():
             counter_name = normalize_name(counter_name)
-            if counter_name in pkmn_names:
+            if pkmn_names is None or counter_name in pkmn_names:
                 matchup_effectiveness[counter_name] = round(
                     1 - counter_information[1], 2
                 )
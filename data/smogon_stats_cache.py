@@ -0,0 +1,75 @@
+import logging
+import ntpath
+import os
+import pickle
+import re
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+# bump this when the format of the parsed stats changes so old files are not used
+CACHE_VERSION = 1
+CACHE_FILE_EXTENSION = ".cache"
+
+
+def get_cache_key(smogon_stats_url):
+    # stats urls look like 'https://www.smogon.com/stats/2024-05/chaos/gen9ou-0.json'
+    # the key is the month and the file name: '2024-05-gen9ou-0'
+    month = smogon_stats_url.split("/")[-3]
+    file_name = ntpath.basename(smogon_stats_url).replace(".json", "")
+    return "{}-{}".format(month, file_name)
+
+
+def get_cache_path(cache_dir, cache_key):
+    return os.path.join(cache_dir, cache_key + CACHE_FILE_EXTENSION)
+
+
+def read_cache(cache_dir, cache_key):
+    # returns the time the stats were saved and the stats, or None if there is no usable file
+    try:
+        with open(get_cache_path(cache_dir, cache_key), "rb") as f:
+            version, saved_time, infos = pickle.loads(zlib.decompress(f.read()))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Could not read cached stats {}: {}".format(cache_key, e))
+        return None
+
+    if version != CACHE_VERSION:
+        return None
+
+    return saved_time, infos
+
+
+def write_cache(cache_dir, cache_key, infos):
+    os.makedirs(cache_dir, exist_ok=True)
+    contents = zlib.compress(
+        pickle.dumps(
+            (CACHE_VERSION, time.time(), infos), protocol=pickle.HIGHEST_PROTOCOL
+        )
+    )
+
+    # a partially written file is never read because it is only renamed once it is complete
+    path = get_cache_path(cache_dir, cache_key)
+    temporary_path = "{}.{}.tmp".format(path, os.getpid())
+    with open(temporary_path, "wb") as f:
+        f.write(contents)
+    os.replace(temporary_path, path)
+
+
+def find_newest_cache_key(cache_dir, cache_key):
+    # the key for the same stats file from the most recent month that is cached
+    file_name = cache_key[len("YYYY-MM-") :]
+    pattern = re.compile(
+        r"^\d{4}-\d{2}-" + re.escape(file_name + CACHE_FILE_EXTENSION) + "$"
+    )
+    try:
+        file_names = [f for f in os.listdir(cache_dir) if pattern.match(f)]
+    except FileNotFoundError:
+        return None
+
+    if not file_names:
+        return None
+    return max(file_names)[: -len(CACHE_FILE_EXTENSION)]
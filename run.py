@@ -6,12 +6,30 @@ from datetime import datetime
 
 from config import ShowdownConfig, init_logging
 
+from data.mods.apply_mods import get_generation_data
+from showdown.decision_executor import check_concurrent_battles
+from showdown.decision_executor import create_decision_executor
+from showdown.http_client import close_http_client
 from showdown.run_battle import pokemon_battle
 from showdown.websocket_client import PSWebsocketClient
 
 logger = logging.getLogger(__name__)
 
 
+async def run_battle_in_slot(
+    battle_slots, ps_websocket_client, battle_format, prisma, executor
+):
+    try:
+        await pokemon_battle(ps_websocket_client, battle_format, prisma, executor)
+
+    # An error in one battle should not stop the others
+    except Exception:
+        logger.error(traceback.format_exc())
+
+    finally:
+        battle_slots.release()
+
+
 async def showdown():
     # Configure the showdown bot
     ShowdownConfig.configure()
@@ -19,38 +37,82 @@ async def showdown():
     # Configure logging
     init_logging(ShowdownConfig.log_level, ShowdownConfig.log_to_file)
 
+    # Build the data for the generations that can be played before any challenge is accepted
+    for game_mode in ShowdownConfig.allowed_modes:
+        get_generation_data(game_mode)
+
+    # Battles played at the same time must not change the data used by each other's decisions
+    check_concurrent_battles(
+        ShowdownConfig.decision_executor,
+        ShowdownConfig.max_concurrent_battles,
+        ShowdownConfig.allowed_modes,
+    )
+
     # Create the prisma client
     prisma = Prisma()
 
+    # Start the workers that pick moves
+    # these are used for every battle so they only have to start once
+    executor = create_decision_executor(
+        ShowdownConfig.decision_executor, ShowdownConfig.decision_workers
+    )
+
     # Create the showdown web socket client
     ps_websocket_client = await PSWebsocketClient.create(
         ShowdownConfig.username, ShowdownConfig.password, ShowdownConfig.websocket_uri
     )
 
-    # Log into the web socket client
-    await ps_websocket_client.login()
-
-    # Custom avatar is defined
-    if ShowdownConfig.avatar:
-        # Set the account avatar to the custom avatar
-        await ps_websocket_client.send_message("", [f"/avatar {ShowdownConfig.avatar}"])
-
-    # Infinite loop
-    while True:
-        # If showdown file logging is enabled
-        if ShowdownConfig.log_to_file:
-            # Log rollover to the file
-            ShowdownConfig.log_handler.do_rollover(
-                datetime.now().strftime("%Y-%m-%dT%H:%M:%S.log")
+    # The shared http client is used from logging in until the bot stops
+    try:
+        # Log into the web socket client
+        await ps_websocket_client.login()
+
+        # Custom avatar is defined
+        if ShowdownConfig.avatar:
+            # Set the account avatar to the custom avatar
+            await ps_websocket_client.send_message(
+                "", [f"/avatar {ShowdownConfig.avatar}"]
             )
 
-        # Wait for a challenge in one of the allowed gamemodes
-        battle_format = await ps_websocket_client.accept_challenge(
-            ShowdownConfig.allowed_modes, ShowdownConfig.room_name, prisma
-        )
+        # Limits how many battles are played at the same time
+        battle_slots = asyncio.Semaphore(ShowdownConfig.max_concurrent_battles)
+
+        # References to the running battles so they are not garbage collected
+        battle_tasks = set()
+
+        # Infinite loop
+        while True:
+            # Wait until there is room for another battle
+            # challenges sent while every slot was taken are ignored
+            if battle_slots.locked():
+                await battle_slots.acquire()
+                ps_websocket_client.message_router.discard_global_messages()
+            else:
+                await battle_slots.acquire()
+
+            # If showdown file logging is enabled
+            if ShowdownConfig.log_to_file:
+                # Log rollover to the file
+                ShowdownConfig.log_handler.do_rollover(
+                    datetime.now().strftime("%Y-%m-%dT%H:%M:%S.log")
+                )
+
+            # Wait for a challenge in one of the allowed gamemodes
+            battle_format = await ps_websocket_client.accept_challenge(
+                ShowdownConfig.allowed_modes, ShowdownConfig.room_name, prisma
+            )
 
-        # Handle the battle in the format which has been challenged
-        await pokemon_battle(ps_websocket_client, battle_format, prisma)
+            # Handle the battle in the format which has been challenged
+            # the next challenge can be accepted while this battle is played
+            battle_task = asyncio.create_task(
+                run_battle_in_slot(
+                    battle_slots, ps_websocket_client, battle_format, prisma, executor
+                )
+            )
+            battle_tasks.add(battle_task)
+            battle_task.add_done_callback(battle_tasks.discard)
+    finally:
+        await close_http_client()
 
 
 # If this is the main process
@@ -36,6 +36,7 @@ from showdown.engine.helpers import get_pokemon_info_from_condition
 from showdown.engine.helpers import set_makes_sense
 from showdown.engine.helpers import normalize_name
 from showdown.engine.helpers import calculate_stats
+from showdown.engine.evaluate import Scoring
 
 
 logger = logging.getLogger(__name__)
@@ -45,7 +46,24 @@ LastUsedMove = namedtuple("LastUsedMove", ["pokemon_name", "move", "turn"])
 DamageDealt = namedtuple(
     "DamageDealt", ["attacker", "defender", "move", "percent_damage", "crit"]
 )
-StatRange = namedtuple("Range", ["min", "max"])
+StatRange = namedtuple("StatRange", ["min", "max"])
+
+
+class BattleContext(
+    namedtuple(
+        "BattleContext",
+        ["pokemon_sets", "effectiveness", "pokemon_alive_static", "team_dataset_sets"],
+        defaults=(None, {}, Scoring.POKEMON_ALIVE_STATIC, {}),
+    )
+):
+    # the data of one battle that the engine reads from module level data
+    # it is applied before the battle is used, see `showdown.decision_executor.apply_battle_context`
+    # `pokemon_sets` is None when the random battle sets of the generation are used
+    # it is replaced instead of modified so every copy of a battle can share it
+    __slots__ = ()
+
+    def __deepcopy__(self, memo):
+        return self
 
 
 # Based on the format, this dict controls which pokemon will be replaced during team preview
@@ -74,6 +92,7 @@ class Battle(ABC):
 
         self.battle_type = None
         self.generation = None
+        self.context = BattleContext()
         self.time_remaining = None
 
         self.request_json = None
@@ -339,7 +358,7 @@ class Battler:
     def __init__(self):
         self.active = None
         self.reserve = []
-        self.side_conditions = defaultdict(lambda: 0)
+        self.side_conditions = defaultdict(int)
 
         self.name = None
         self.trapped = False
@@ -573,7 +592,7 @@ class Pokemon:
         self.moves = []
         self.status = None
         self.volatile_statuses = []
-        self.boosts = defaultdict(lambda: 0)
+        self.boosts = defaultdict(int)
         self.can_mega_evo = False
         self.can_ultra_burst = False
         self.can_dynamax = False
@@ -1,16 +1,41 @@
 import logging
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 
 import config
 import constants
+from config import ShowdownConfig
+from showdown.decision_executor import set_battle_context
 
+from showdown.engine.compact_state import decode_state
+from showdown.engine.compact_state import encode_state
+from showdown.engine.damage_calculator import DamageCache
+from showdown.engine.evaluate import PokemonScoreCache
+from showdown.engine.instruction_cache import InstructionCache
 from showdown.engine.objects import StateMutator
+from showdown.engine.transposition_table import TranspositionTable
 from showdown.engine.select_best_move import pick_safest
 from showdown.engine.select_best_move import get_payoff_matrix
-
+from showdown.engine.select_best_move import order_options_from_scores
+from showdown.engine.select_best_move import SearchTimeout
 
 logger = logging.getLogger(__name__)
 
 
+# only this much of the time left on the battle timer is spent searching
+TIMER_SEARCH_FRACTION = 0.5
+MAX_ITERATIVE_DEEPENING_DEPTH = 10
+
+# created the first time a parallel search is run and re-used for every search after that
+search_process_pool = None
+
+# kept between decisions when ShowdownConfig.keep_instruction_cache is set
+# the instructions depend on the data mods so it is emptied when a different generation is searched
+instruction_cache = None
+instruction_cache_generation = None
+
+
 def format_decision(battle, decision):
     # Formats a decision for communication with Pokemon-Showdown
     # If the pokemon can mega-evolve, it will
@@ -59,18 +84,174 @@ def prefix_opponent_move(score_lookup, prefix):
     return new_score_lookup
 
 
+def get_instruction_cache(generation):
+    global instruction_cache, instruction_cache_generation
+    if ShowdownConfig.instruction_cache_size <= 0:
+        return None
+
+    if not ShowdownConfig.keep_instruction_cache:
+        return InstructionCache(ShowdownConfig.instruction_cache_size)
+
+    if instruction_cache is None or instruction_cache_generation != generation:
+        instruction_cache = InstructionCache(ShowdownConfig.instruction_cache_size)
+        instruction_cache_generation = generation
+    return instruction_cache
+
+
+# the caches shared by every search of one decision
+SearchCaches = namedtuple(
+    "SearchCaches",
+    ["transposition_table", "instruction_cache", "pokemon_score_cache", "damage_cache"],
+)
+
+
+def create_search_caches(generation):
+    # the pokemon scores and damage rolls are not keyed by the Scoring weights or the data of the generation
+    # those can change between decisions so new caches are made for each one
+    return SearchCaches(
+        TranspositionTable(ShowdownConfig.transposition_table_size),
+        get_instruction_cache(generation),
+        PokemonScoreCache(),
+        DamageCache(),
+    )
+
+
+def create_mutator(state, caches):
+    return StateMutator(
+        state,
+        pokemon_score_cache=caches.pokemon_score_cache,
+        damage_cache=caches.damage_cache,
+    )
+
+
+def log_search_caches(caches):
+    for cache in caches:
+        logger.debug(cache)
+
+
+def configure_search_process(
+    damage_calc_type,
+    transposition_table_size,
+    merge_equivalent_states,
+    instruction_cache_size,
+    keep_instruction_cache,
+    batch_evaluation,
+):
+    # search processes do not share the configuration of the main process when they are spawned
+    ShowdownConfig.damage_calc_type = damage_calc_type
+    ShowdownConfig.transposition_table_size = transposition_table_size
+    ShowdownConfig.merge_equivalent_states = merge_equivalent_states
+    ShowdownConfig.instruction_cache_size = instruction_cache_size
+    ShowdownConfig.keep_instruction_cache = keep_instruction_cache
+    ShowdownConfig.batch_evaluation = batch_evaluation
+
+
+def get_search_process_pool():
+    global search_process_pool
+    if search_process_pool is None:
+        search_process_pool = ProcessPoolExecutor(
+            max_workers=ShowdownConfig.search_processes,
+            initializer=configure_search_process,
+            initargs=(
+                ShowdownConfig.damage_calc_type,
+                ShowdownConfig.transposition_table_size,
+                ShowdownConfig.merge_equivalent_states,
+                ShowdownConfig.instruction_cache_size,
+                ShowdownConfig.keep_instruction_cache,
+                ShowdownConfig.batch_evaluation,
+            ),
+        )
+    return search_process_pool
+
+
+def search_root_subtree(
+    encoded_state, user_option, opponent_options, depth, generation, battle_context
+):
+    """Runs in a search process. Returns the scores for one of the bot's options in the state"""
+    # the data mods and the data used to evaluate a state can change between battles
+    set_battle_context(generation, battle_context)
+
+    caches = create_search_caches(generation)
+    return get_payoff_matrix(
+        create_mutator(decode_state(encoded_state), caches),
+        [user_option],
+        opponent_options,
+        depth=depth,
+        prune=True,
+        transposition_table=caches.transposition_table,
+        instruction_cache=caches.instruction_cache,
+        batch_evaluation=ShowdownConfig.batch_evaluation,
+    )
+
+
+def pick_safest_move_from_battles_in_parallel(battles, depth=2):
+    """
+    Searches every (battle, bot option) pair in a separate process.
+
+    The scores of a bot option cannot be used to prune the others like they are in a single search,
+    so the payoff matrices are full where a single search would have some `nan` scores.
+
+    """
+    pool = get_search_process_pool()
+    futures = []
+    for b in battles:
+        encoded_state = encode_state(b.create_state())
+        user_options, opponent_options = b.get_all_options()
+        futures.append(
+            [
+                pool.submit(
+                    search_root_subtree,
+                    encoded_state,
+                    user_option,
+                    opponent_options,
+                    depth,
+                    b.generation,
+                    b.context,
+                )
+                for user_option in user_options
+            ]
+        )
+
+    all_scores = dict()
+    for i, battle_futures in enumerate(futures):
+        scores = dict()
+        for future in battle_futures:
+            scores.update(future.result())
+
+        prefixed_scores = prefix_opponent_move(scores, str(i))
+        all_scores = {**all_scores, **prefixed_scores}
+
+    decision, payoff = pick_safest(all_scores, remove_guaranteed=True)
+    bot_choice = decision[0]
+    logger.debug("Safest: {}, {}".format(bot_choice, payoff))
+    return bot_choice
+
+
 def pick_safest_move_from_battles(battles):
+    if ShowdownConfig.search_processes > 0:
+        return pick_safest_move_from_battles_in_parallel(battles)
+
     all_scores = dict()
+    caches = create_search_caches(battles[0].generation)
     for i, b in enumerate(battles):
         state = b.create_state()
-        mutator = StateMutator(state)
+        mutator = create_mutator(state, caches)
         user_options, opponent_options = b.get_all_options()
         logger.debug("Searching through the state: {}".format(mutator.state))
-        scores = get_payoff_matrix(mutator, user_options, opponent_options, prune=True)
+        scores = get_payoff_matrix(
+            mutator,
+            user_options,
+            opponent_options,
+            prune=True,
+            transposition_table=caches.transposition_table,
+            instruction_cache=caches.instruction_cache,
+            batch_evaluation=ShowdownConfig.batch_evaluation,
+        )
 
         prefixed_scores = prefix_opponent_move(scores, str(i))
         all_scores = {**all_scores, **prefixed_scores}
 
+    log_search_caches(caches)
     decision, payoff = pick_safest(all_scores, remove_guaranteed=True)
     bot_choice = decision[0]
     logger.debug("Safest: {}, {}".format(bot_choice, payoff))
@@ -87,17 +268,25 @@ def pick_safest_move_using_dynamic_search_depth(battles):
     """
     all_scores = dict()
     num_battles = len(battles)
+    caches = create_search_caches(battles[0].generation)
 
     if num_battles > 1:
         search_depth = 2
 
         for i, b in enumerate(battles):
             state = b.create_state()
-            mutator = StateMutator(state)
+            mutator = create_mutator(state, caches)
             user_options, opponent_options = b.get_all_options()
             logger.debug("Searching through the state: {}".format(mutator.state))
             scores = get_payoff_matrix(
-                mutator, user_options, opponent_options, depth=search_depth, prune=True
+                mutator,
+                user_options,
+                opponent_options,
+                depth=search_depth,
+                prune=True,
+                transposition_table=caches.transposition_table,
+                instruction_cache=caches.instruction_cache,
+                batch_evaluation=ShowdownConfig.batch_evaluation,
             )
             prefixed_scores = prefix_opponent_move(scores, str(i))
             all_scores = {**all_scores, **prefixed_scores}
@@ -107,7 +296,7 @@ def pick_safest_move_using_dynamic_search_depth(battles):
 
         b = battles[0]
         state = b.create_state()
-        mutator = StateMutator(state)
+        mutator = create_mutator(state, caches)
         user_options, opponent_options = b.get_all_options()
 
         num_user_options = len(user_options)
@@ -123,7 +312,14 @@ def pick_safest_move_using_dynamic_search_depth(battles):
         logger.debug("Opponent Options: {}".format(opponent_options))
         logger.debug("Search depth: {}".format(search_depth))
         all_scores = get_payoff_matrix(
-            mutator, user_options, opponent_options, depth=search_depth, prune=True
+            mutator,
+            user_options,
+            opponent_options,
+            depth=search_depth,
+            prune=True,
+            transposition_table=caches.transposition_table,
+            instruction_cache=caches.instruction_cache,
+            batch_evaluation=ShowdownConfig.batch_evaluation,
         )
 
     else:
@@ -133,4 +329,82 @@ def pick_safest_move_using_dynamic_search_depth(battles):
     bot_choice = decision[0]
     logger.debug("Safest: {}, {}".format(bot_choice, payoff))
     logger.debug("Depth: {}".format(search_depth))
+    log_search_caches(caches)
+    return bot_choice
+
+
+def get_search_time_budget(battle):
+    time_budget = ShowdownConfig.search_time_budget
+    if battle.time_remaining is not None:
+        time_budget = min(time_budget, battle.time_remaining * TIMER_SEARCH_FRACTION)
+    return time_budget
+
+
+def pick_safest_move_using_iterative_deepening(
+    battles, max_depth=MAX_ITERATIVE_DEEPENING_DEPTH
+):
+    """
+    Searches one turn deeper at a time until the time budget runs out.
+
+    The result of the deepest search that completed for every battle is used.
+    The first depth is always searched fully so that there is a move to return.
+    The scores from each depth order the options for the next depth so more of the tree is pruned.
+
+    """
+    time_budget = get_search_time_budget(battles[0])
+    deadline = time.time() + time_budget
+    caches = create_search_caches(battles[0].generation)
+
+    searches = []
+    for b in battles:
+        state = b.create_state()
+        mutator = create_mutator(state, caches)
+        user_options, opponent_options = b.get_all_options()
+        searches.append((mutator, user_options, opponent_options))
+
+    logger.debug("Search time budget: {}s".format(round(time_budget, 2)))
+
+    all_scores = None
+    search_depth = 0
+    for depth in range(1, max_depth + 1):
+        iteration_start = time.time()
+        depth_scores = dict()
+        ordered_searches = []
+        try:
+            for i, (mutator, user_options, opponent_options) in enumerate(searches):
+                scores = get_payoff_matrix(
+                    mutator,
+                    user_options,
+                    opponent_options,
+                    depth=depth,
+                    prune=True,
+                    transposition_table=caches.transposition_table,
+                    instruction_cache=caches.instruction_cache,
+                    batch_evaluation=ShowdownConfig.batch_evaluation,
+                    deadline=deadline if all_scores is not None else None,
+                )
+                prefixed_scores = prefix_opponent_move(scores, str(i))
+                depth_scores = {**depth_scores, **prefixed_scores}
+                user_options, opponent_options = order_options_from_scores(
+                    user_options, opponent_options, scores
+                )
+                ordered_searches.append((mutator, user_options, opponent_options))
+        except SearchTimeout:
+            logger.debug("Ran out of time searching depth {}".format(depth))
+            break
+
+        all_scores = depth_scores
+        search_depth = depth
+        searches = ordered_searches
+
+        # the next depth will take longer than this one did
+        iteration_time = time.time() - iteration_start
+        if deadline - time.time() < iteration_time:
+            break
+
+    decision, payoff = pick_safest(all_scores, remove_guaranteed=True)
+    bot_choice = decision[0]
+    logger.debug("Safest: {}, {}".format(bot_choice, payoff))
+    logger.debug("Depth: {}".format(search_depth))
+    log_search_caches(caches)
     return bot_choice
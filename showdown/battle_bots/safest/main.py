@@ -1,7 +1,9 @@
+from config import ShowdownConfig
 from showdown.battle import Battle
 
 from ..helpers import format_decision
 from ..helpers import pick_safest_move_from_battles
+from ..helpers import pick_safest_move_using_iterative_deepening
 
 
 class BattleBot(Battle):
@@ -10,5 +12,8 @@ class BattleBot(Battle):
 
     def find_best_move(self):
         battles = self.prepare_battles(join_moves_together=True)
-        safest_move = pick_safest_move_from_battles(battles)
+        if ShowdownConfig.search_time_budget > 0:
+            safest_move = pick_safest_move_using_iterative_deepening(battles)
+        else:
+            safest_move = pick_safest_move_from_battles(battles)
         return format_decision(self, safest_move)
@@ -0,0 +1,90 @@
+import asyncio
+import json
+from collections import defaultdict
+
+SAVE_REPLAY_RESPONSE = "|queryresponse|savereplay|"
+
+
+def get_battle_room(message):
+    # messages sent to a room start with '>ROOMID'
+    if message.startswith(">"):
+        room = message.split("\n", 1)[0][1:].strip()
+        if room.startswith("battle-"):
+            return room
+
+    # the response to saving a replay is not sent to the battle's room
+    elif message.startswith(SAVE_REPLAY_RESPONSE):
+        obj = json.loads(message.replace(SAVE_REPLAY_RESPONSE, ""))
+        return "battle-{}".format(obj["id"])
+
+    return None
+
+
+def get_battle_format(battle_room):
+    # battle rooms look like 'battle-gen9randombattle-1234567'
+    return battle_room.split("-")[1]
+
+
+class MessageRouter:
+    """Puts every message from the websocket into the queue of the battle it belongs to.
+    Messages that do not belong to a battle go into `global_messages`"""
+
+    def __init__(self):
+        self.global_messages = asyncio.Queue()
+        self.battle_messages = dict()
+        self.new_battles = defaultdict(asyncio.Queue)
+        self.finished_battles = set()
+        self.error = None
+
+    def route_message(self, message):
+        battle_room = get_battle_room(message)
+        if battle_room is None:
+            self.global_messages.put_nowait(message)
+            return
+
+        if battle_room in self.finished_battles:
+            return
+
+        if battle_room not in self.battle_messages:
+            self.battle_messages[battle_room] = asyncio.Queue()
+            self.new_battles[get_battle_format(battle_room)].put_nowait(battle_room)
+
+        self.battle_messages[battle_room].put_nowait(message)
+
+    def close(self, error):
+        # everything waiting for a message gets the error instead
+        self.error = error
+        queues = [self.global_messages, *self.battle_messages.values()]
+        for queue in queues + list(self.new_battles.values()):
+            queue.put_nowait(error)
+
+    @staticmethod
+    async def get_from_queue(queue):
+        item = await queue.get()
+        if isinstance(item, Exception):
+            # leave the error for the next reader of this queue
+            queue.put_nowait(item)
+            raise item
+        return item
+
+    async def receive_message(self, battle_tag=None):
+        if battle_tag is None:
+            return await self.get_from_queue(self.global_messages)
+        return await self.get_from_queue(self.battle_messages[battle_tag])
+
+    async def receive_new_battle(self, battle_format):
+        # waits for a battle of this format to start and returns the battle's room
+        if self.error is not None:
+            raise self.error
+        return await self.get_from_queue(self.new_battles[battle_format])
+
+    def discard_global_messages(self):
+        while not self.global_messages.empty():
+            message = self.global_messages.get_nowait()
+            if isinstance(message, Exception):
+                self.global_messages.put_nowait(message)
+                return
+
+    def finish_battle(self, battle_tag):
+        self.battle_messages.pop(battle_tag, None)
+        self.finished_battles.add(battle_tag)
@@ -0,0 +1,132 @@
+import importlib
+import logging
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+import data
+from config import ShowdownConfig
+from data.mods.apply_mods import apply_mods
+from data.mods.apply_mods import get_gen_number
+from data.team_datasets import TeamDatasets
+from showdown.engine.evaluate import Scoring
+
+logger = logging.getLogger(__name__)
+
+
+THREAD_EXECUTOR = "thread"
+PROCESS_EXECUTOR = "process"
+
+
+def create_battle_snapshot(battle):
+    # pickling is much faster than a deepcopy and the result can be sent to another process
+    return pickle.dumps(battle, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def set_battle_context(generation, battle_context):
+    # the engine reads the data of a battle from module level data
+    # so the data of the battle being used is put there before it is updated or a move is picked
+    if generation is not None:
+        apply_mods(generation)
+
+    if battle_context.pokemon_sets is None:
+        data.pokemon_sets = data.random_battle_sets
+    else:
+        data.pokemon_sets = battle_context.pokemon_sets
+
+    # other modules hold a reference to this dictionary so it must be modified in place
+    if data.effectiveness != battle_context.effectiveness:
+        data.effectiveness.clear()
+        data.effectiveness.update(battle_context.effectiveness)
+
+    Scoring.POKEMON_ALIVE_STATIC = battle_context.pokemon_alive_static
+    TeamDatasets.pokemon_sets = battle_context.team_dataset_sets
+
+
+def apply_battle_context(battle):
+    set_battle_context(battle.generation, battle.context)
+
+
+def find_best_move_from_snapshot(battle_snapshot):
+    # the context of the battle is part of the snapshot
+    # so a decision process uses the data of this battle and not whatever another battle set last
+    battle = pickle.loads(battle_snapshot)
+    apply_battle_context(battle)
+    if battle.request_json:
+        battle.user.from_json(battle.request_json)
+
+    return battle.find_best_move()
+
+
+def configure_decision_process(config_values):
+    # spawned processes do not have the configuration of the main process
+    for name, value in config_values.items():
+        setattr(ShowdownConfig, name, value)
+
+
+def warm_up_worker():
+    # importing the battle bot loads the data it uses before the first decision needs it
+    importlib.import_module(
+        "showdown.battle_bots.{}.main".format(ShowdownConfig.battle_bot_module)
+    )
+    logger.debug(
+        "Worker ready with {} moves and {} pokemon loaded".format(
+            len(data.all_move_json), len(data.pokedex)
+        )
+    )
+    return os.getpid()
+
+
+def check_concurrent_battles(executor_type, max_concurrent_battles, allowed_modes):
+    # a thread picking a move reads the module level data, which is set for every battle that is updated
+    # so battles can only be played at the same time in threads when all of them use the same data
+    # every standard battle has the usage data of its own pokemon
+    # and `apply_mods` replaces the contents of the move and pokedex data when the generation changes
+    if executor_type != THREAD_EXECUTOR or max_concurrent_battles <= 1:
+        return
+
+    generations = sorted(set(get_gen_number(mode) for mode in allowed_modes))
+    if len(generations) > 1:
+        raise ValueError(
+            "Formats from generations {} cannot be played at the same time with the {} decision executor, "
+            "use the {} decision executor".format(
+                generations, THREAD_EXECUTOR, PROCESS_EXECUTOR
+            )
+        )
+
+    standard_modes = [mode for mode in allowed_modes if "random" not in mode]
+    if standard_modes:
+        raise ValueError(
+            "{} cannot be played in more than one battle at a time with the {} decision executor, "
+            "use the {} decision executor".format(
+                standard_modes, THREAD_EXECUTOR, PROCESS_EXECUTOR
+            )
+        )
+
+
+def create_decision_executor(executor_type, max_workers):
+    if executor_type == THREAD_EXECUTOR:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    elif executor_type == PROCESS_EXECUTOR:
+        # the log handler cannot be pickled and is not needed to pick a move
+        config_values = {
+            k: v for k, v in vars(ShowdownConfig).items() if k != "log_handler"
+        }
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=configure_decision_process,
+            initargs=(config_values,),
+        )
+    else:
+        raise ValueError("Invalid decision executor: {}".format(executor_type))
+
+    # workers are only started when there is work for them
+    # submitting one task per worker starts all of them now instead of during a battle
+    wait([executor.submit(warm_up_worker) for _ in range(max_workers)])
+    logger.debug(
+        "Started {} {} worker(s) for picking moves".format(max_workers, executor_type)
+    )
+
+    return executor
@@ -0,0 +1,186 @@
+import numpy as np
+
+import constants
+
+from .damage_calculator import SPECIAL_LOGIC_MOVES
+from .damage_calculator import _calculate_damage
+from .damage_calculator import calculate_modifier_without_type_effectiveness
+from .damage_calculator import damage_multipication_array
+from .damage_calculator import get_damage_stats
+from .damage_calculator import get_defending_types
+from .damage_calculator import get_move
+from .damage_calculator import pokemon_type_indicies
+
+# Calculates the damage of many moves against many defenders with one set of NumPy operations
+# `calculate_damage_rolls` does the arithmetic of `_calculate_damage` on arrays, in the same order,
+# so every roll is exactly the same as the one `_calculate_damage` gives
+# The search does not use this module - it is for callers that have one set of moves to try against many defenders
+
+
+type_effectiveness_array = np.array(damage_multipication_array, dtype=np.float64)
+
+TYPELESS_INDEX = pokemon_type_indicies["typeless"]
+
+DAMAGE_ROLL_MULTIPLIERS = {
+    "average": [0.925],
+    "min": [0.85],
+    "max": [1],
+    "min_max": [0.85, 1],
+    "min_max_average": [0.85, 0.925, 1],
+    "all": [
+        0.85,
+        0.86,
+        0.87,
+        0.88,
+        0.89,
+        0.90,
+        0.91,
+        0.92,
+        0.93,
+        0.94,
+        0.95,
+        0.96,
+        0.97,
+        0.98,
+        0.99,
+        1,
+    ],
+}
+
+
+def get_type_indices(list_of_types):
+    # pads every list of types to the same length with typeless, which does not change type effectiveness
+    length = max(1, max(len(types) for types in list_of_types))
+    return [
+        [pokemon_type_indicies[t] for t in types]
+        + [TYPELESS_INDEX] * (length - len(types))
+        for types in list_of_types
+    ]
+
+
+def calculate_damage_rolls(
+    level,
+    base_powers,
+    attack_stats,
+    defense_stats,
+    move_types,
+    defending_types,
+    modifiers=1,
+    calc_type="average",
+):
+    """
+    :param level: the level of the attacker
+    :param base_powers: the base power of each move - shape (moves,)
+    :param attack_stats: the attacking stat each move uses - broadcast to (moves, defenders)
+    :param defense_stats: the defending stat each move hits - broadcast to (moves, defenders)
+    :param move_types: the index in `pokemon_type_indicies` of the type of each move - shape (moves,)
+    :param defending_types: the type indices of each defender, padded with typeless - shape (defenders, types) or (moves, defenders, types)
+    :param modifiers: every modifier other than type effectiveness - broadcast to (moves, defenders)
+    :param calc_type: one of the calc types of `_calculate_damage`
+    :return: an array of every damage roll of every move against every defender - shape (moves, defenders, rolls)
+    """
+    try:
+        roll_multipliers = DAMAGE_ROLL_MULTIPLIERS[calc_type]
+    except KeyError:
+        raise ValueError(
+            "{} is not one of {}".format(calc_type, list(DAMAGE_ROLL_MULTIPLIERS))
+        )
+
+    base_powers = np.asarray(base_powers, dtype=np.float64)[:, np.newaxis]
+    move_types = np.asarray(move_types)
+    defending_types = np.asarray(defending_types)
+    if defending_types.ndim == 2:
+        defending_types = np.broadcast_to(
+            defending_types, (len(move_types),) + defending_types.shape
+        )
+
+    damage = int(int((2 * level) / 5) + 2) * base_powers
+    damage = np.trunc(damage * attack_stats / defense_stats)
+    damage = np.trunc(damage / 50) + 2
+
+    # the effectiveness of every move type against every defending type, multiplied across the defending types
+    type_effectiveness = type_effectiveness_array[
+        move_types[:, np.newaxis, np.newaxis], defending_types
+    ].prod(axis=2)
+
+    damage = damage * (type_effectiveness * modifiers)
+
+    return np.trunc(
+        damage[:, :, np.newaxis] * np.array(roll_multipliers, dtype=np.float64)
+    ).astype(np.int64)
+
+
+def calculate_damage_against_defenders(
+    attacker, moves, defenders, conditions=None, calc_type="average"
+):
+    """The result of `_calculate_damage` for every move in `moves` against every pokemon in `defenders`
+
+    :return: a list with a list for each move, holding what `_calculate_damage` gives against each defender
+    """
+    if conditions is None:
+        conditions = {}
+
+    moves = [get_move(move) for move in moves]
+    results = [[None] * len(defenders) for _ in moves]
+
+    # moves that are not calculated with the damage formula are given to `_calculate_damage`
+    # the rest are calculated together
+    calculated_moves = []
+    for i, move in enumerate(moves):
+        if (
+            move is None
+            or move.get(constants.CATEGORY) not in constants.DAMAGING_CATEGORIES
+            or move[constants.ID] in SPECIAL_LOGIC_MOVES
+            or move[constants.BASE_POWER] == 0
+        ):
+            for j, defender in enumerate(defenders):
+                results[i][j] = _calculate_damage(
+                    attacker, defender, move, conditions=conditions, calc_type=calc_type
+                )
+        else:
+            calculated_moves.append(i)
+
+    if not calculated_moves or not defenders:
+        return results
+
+    attack_stats = []
+    defense_stats = []
+    defending_types = []
+    modifiers = []
+    for i in calculated_moves:
+        move = moves[i]
+        if move[constants.CATEGORY] == constants.PHYSICAL:
+            attack, defense = constants.ATTACK, constants.DEFENSE
+        else:
+            attack, defense = constants.SPECIAL_ATTACK, constants.SPECIAL_DEFENSE
+
+        for defender in defenders:
+            attack_stat, defense_stat = get_damage_stats(
+                attacker, defender, move, attack, defense, conditions
+            )
+            attack_stats.append(attack_stat)
+            defense_stats.append(defense_stat)
+            defending_types.append(get_defending_types(defender, move))
+            modifiers.append(
+                calculate_modifier_without_type_effectiveness(
+                    attacker, defender, move, conditions
+                )
+            )
+
+    shape = (len(calculated_moves), len(defenders))
+    damage_rolls = calculate_damage_rolls(
+        attacker.level,
+        [moves[i][constants.BASE_POWER] for i in calculated_moves],
+        np.array(attack_stats, dtype=np.float64).reshape(shape),
+        np.array(defense_stats, dtype=np.float64).reshape(shape),
+        [pokemon_type_indicies[moves[i][constants.TYPE]] for i in calculated_moves],
+        np.array(get_type_indices(defending_types)).reshape(shape + (-1,)),
+        np.array(modifiers, dtype=np.float64).reshape(shape),
+        calc_type=calc_type,
+    )
+
+    for row, i in enumerate(calculated_moves):
+        for j in range(len(defenders)):
+            results[i][j] = list(set(damage_rolls[row, j].tolist()))
+
+    return results
@@ -0,0 +1,153 @@
+import numpy as np
+
+import constants
+from data import effectiveness
+
+from .evaluate import Scoring
+
+# Scores every leaf of one (user_move, opponent_move) cell of `get_payoff_matrix` at once
+# The features of every pokemon in every leaf are rows of one matrix that is multiplied by the Scoring weights
+# The products are added up in the same order `evaluate` adds them so the scores are exactly the same
+
+
+def get_pokemon_feature_weights():
+    # the weights are read from Scoring every time because they are changed for some battles
+    return np.array(
+        [
+            Scoring.POKEMON_ALIVE_STATIC,
+            Scoring.POKEMON_HP,
+            Scoring.POKEMON_BOOSTS[constants.ATTACK],
+            Scoring.POKEMON_BOOSTS[constants.DEFENSE],
+            Scoring.POKEMON_BOOSTS[constants.SPECIAL_ATTACK],
+            Scoring.POKEMON_BOOSTS[constants.SPECIAL_DEFENSE],
+            Scoring.POKEMON_BOOSTS[constants.SPEED],
+            Scoring.POKEMON_BOOSTS[constants.ACCURACY],
+            Scoring.POKEMON_BOOSTS[constants.EVASION],
+            1,  # the status is scored when the features are found because burn depends on the pokemon
+            1,  # the same for the volatile statuses
+        ],
+        dtype=np.float64,
+    )
+
+
+def get_side_feature_weights():
+    return np.array(
+        list(Scoring.STATIC_SCORED_SIDE_CONDITIONS.values())
+        + list(Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS.values()),
+        dtype=np.float64,
+    )
+
+
+def get_pokemon_features(pkmn):
+    diminishing_returns = Scoring.POKEMON_BOOST_DIMINISHING_RETURNS
+    try:
+        status_score = Scoring.POKEMON_STATIC_STATUSES[pkmn.status]
+    except KeyError:
+        # KeyError only happens when the status is BURN
+        status_score = Scoring.BURN(pkmn.burn_multiplier)
+
+    volatile_status_score = 0
+    for vol_stat in pkmn.volatile_status:
+        volatile_status_score += Scoring.POKEMON_VOLATILE_STATUSES.get(vol_stat, 0)
+
+    return (
+        1,
+        float(pkmn.hp) / pkmn.maxhp,
+        diminishing_returns[pkmn.attack_boost],
+        diminishing_returns[pkmn.defense_boost],
+        diminishing_returns[pkmn.special_attack_boost],
+        diminishing_returns[pkmn.special_defense_boost],
+        diminishing_returns[pkmn.speed_boost],
+        diminishing_returns[pkmn.accuracy_boost],
+        diminishing_returns[pkmn.evasion_boost],
+        status_score,
+        volatile_status_score,
+    )
+
+
+def get_side_features(side, alive_reserve_count):
+    # in the same order as `get_side_feature_weights`
+    side_conditions = side.side_conditions
+    return [
+        side_conditions.get(c, 0) for c in Scoring.STATIC_SCORED_SIDE_CONDITIONS
+    ] + [
+        side_conditions.get(c, 0) * alive_reserve_count
+        for c in Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS
+    ]
+
+
+def get_matchup_score(state):
+    try:
+        matchup_score = (
+            Scoring.MATCHUP_BONUS
+            * effectiveness[state.user.active.id][state.opponent.active.id]
+        )
+        matchup_score -= (
+            Scoring.MATCHUP_BONUS
+            * effectiveness[state.opponent.active.id][state.user.active.id]
+        )
+    except KeyError:
+        return 0
+    return matchup_score
+
+
+def evaluate_leaves(mutator, state_instructions):
+    """Returns the score `evaluate` gives the state after each of `state_instructions`, in the same order"""
+    state = mutator.state
+    pokemon_rows = []
+    pokemon_signs = []
+    alive = []
+    side_rows = []
+    matchup_scores = []
+    for instructions in state_instructions:
+        mutator.apply(instructions.instructions)
+
+        for side, sign in ((state.user, 1), (state.opponent, -1)):
+            for pkmn in (side.active, *side.reserve.values()):
+                pokemon_rows.append(get_pokemon_features(pkmn))
+                pokemon_signs.append(sign)
+                alive.append(pkmn.hp > 0)
+
+        user_alive_reserve_count = len(
+            [p for p in state.user.reserve.values() if p.hp > 0]
+        )
+        opponent_alive_reserve_count = len(
+            [p for p in state.opponent.reserve.values() if p.hp > 0]
+        ) + (6 - (len(state.opponent.reserve) + 1))
+        side_rows.append(
+            get_side_features(state.user, user_alive_reserve_count)
+            + [
+                -feature
+                for feature in get_side_features(
+                    state.opponent, opponent_alive_reserve_count
+                )
+            ]
+        )
+        matchup_scores.append(get_matchup_score(state))
+
+        mutator.reverse(instructions.instructions)
+
+    number_of_leaves = len(state_instructions)
+    if not number_of_leaves:
+        return []
+
+    # `cumsum` adds the products one column at a time, the same order `evaluate_pokemon` adds them
+    pokemon_products = (
+        np.array(pokemon_rows, dtype=np.float64) * get_pokemon_feature_weights()
+    )
+    pokemon_scores = np.where(
+        np.array(alive), np.round(np.cumsum(pokemon_products, axis=1)[:, -1]), 0
+    )
+    pokemon_scores = (pokemon_scores * np.array(pokemon_signs)).reshape(
+        number_of_leaves, -1
+    )
+
+    # every pokemon and side-condition score is a whole number so the order they are added in does not matter
+    side_feature_weights = get_side_feature_weights()
+    side_weights = np.concatenate((side_feature_weights, side_feature_weights))
+    scores = pokemon_scores.sum(axis=1) + np.array(side_rows, dtype=np.float64).dot(
+        side_weights
+    )
+    scores += np.array(matchup_scores, dtype=np.float64)
+
+    return [int(score) for score in np.trunc(scores)]
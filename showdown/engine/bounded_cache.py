@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+
+class BoundedCache:
+    """A cache of at most `max_size` entries that counts its hits and misses
+
+    When full, the least-recently-used entry is evicted"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        if not lookups:
+            return 0.0
+        return self.hits / lookups
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return "{}(entries={}, hits={}, misses={}, hit_rate={:.2%})".format(
+            type(self).__name__,
+            len(self.entries),
+            self.hits,
+            self.misses,
+            self.hit_rate(),
+        )
@@ -0,0 +1,267 @@
+from collections import defaultdict
+
+import constants
+from data.mods.apply_mods import base_all_move_json
+from data.mods.apply_mods import base_pokedex
+from data.mods.apply_mods import base_random_battle_sets
+
+from .helpers import natures
+from .helpers import normalize_name
+from .objects import State
+from .objects import Side
+from .objects import Pokemon
+
+# Encodes a State as nested tuples where every name is replaced with a small integer
+# and the volatile statuses of a pokemon are one bitmask
+# It converts to and from a State without losing anything and is used to send states to the search processes
+# The StateMutator, `evaluate` and the damage calculator only work on State objects - an encoded state is decoded first
+#
+# The codes come from the unmodified data files so every process gives the same name the same code
+# Names that are not in the tables (a pokemon the data does not know about, for example) are kept as strings
+# Code 0 is None
+
+
+MOVE_KEYS = {constants.ID, constants.DISABLED, constants.CURRENT_PP}
+
+# natures that do not change any stats are not in the natures lookup
+NEUTRAL_NATURES = ["bashful", "docile", "hardy", "quirky", "serious"]
+
+
+def _get_volatile_statuses():
+    volatile_statuses = {
+        constants.SUBSTITUTE,
+        constants.DYNAMAX,
+        constants.PARTIALLY_TRAPPED,
+        *constants.PROTECT_VOLATILE_STATUSES,
+    }
+    for move in base_all_move_json.values():
+        if move.get(constants.VOLATILE_STATUS):
+            volatile_statuses.add(move[constants.VOLATILE_STATUS])
+    return sorted(volatile_statuses)
+
+
+def _get_names():
+    names = set(base_pokedex)
+    names.update(base_all_move_json)
+    names.update(natures)
+    names.update(NEUTRAL_NATURES)
+    names.add(constants.UNKNOWN_ITEM)
+    names.update(constants.NON_VOLATILE_STATUSES)
+    names.update(constants.IRREVERSIBLE_WEATHER)
+    for pkmn in base_pokedex.values():
+        names.update(pkmn[constants.TYPES])
+        names.update(normalize_name(a) for a in pkmn[constants.ABILITIES].values())
+    for move in base_all_move_json.values():
+        for key in [constants.SIDE_CONDITIONS, constants.WEATHER, constants.TERRAIN]:
+            if move.get(key):
+                names.add(normalize_name(move[key]))
+    for sets in base_random_battle_sets.values():
+        names.update(item for item, _ in sets[constants.ITEMS])
+    return [None] + sorted(names)
+
+
+NAMES = _get_names()
+NAME_CODES = {name: code for code, name in enumerate(NAMES)}
+
+VOLATILE_STATUSES = _get_volatile_statuses()
+VOLATILE_STATUS_BITS = {
+    volatile_status: 1 << i for i, volatile_status in enumerate(VOLATILE_STATUSES)
+}
+
+
+def encode_name(name):
+    return NAME_CODES.get(name, name)
+
+
+def decode_name(code):
+    if isinstance(code, int) and not isinstance(code, bool):
+        return NAMES[code]
+    return code
+
+
+def encode_volatile_statuses(volatile_statuses):
+    # returns the bitmask of the known volatile statuses and a tuple of the unknown ones
+    mask = 0
+    unknown = []
+    for volatile_status in volatile_statuses:
+        bit = VOLATILE_STATUS_BITS.get(volatile_status)
+        if bit is None:
+            unknown.append(volatile_status)
+        else:
+            mask |= bit
+    return mask, tuple(unknown)
+
+
+def decode_volatile_statuses(mask, unknown):
+    volatile_statuses = set(unknown)
+    i = 0
+    while mask:
+        if mask & 1:
+            volatile_statuses.add(VOLATILE_STATUSES[i])
+        mask >>= 1
+        i += 1
+    return volatile_statuses
+
+
+def encode_move(move):
+    if move.keys() == MOVE_KEYS:
+        return (
+            encode_name(move[constants.ID]),
+            move[constants.DISABLED],
+            move[constants.CURRENT_PP],
+        )
+
+    # a move with other keys is kept as it is
+    return tuple(move.items())
+
+
+def decode_move(encoded_move):
+    if encoded_move and isinstance(encoded_move[0], tuple):
+        return dict(encoded_move)
+
+    move_id, disabled, current_pp = encoded_move
+    return {
+        constants.ID: decode_name(move_id),
+        constants.DISABLED: disabled,
+        constants.CURRENT_PP: current_pp,
+    }
+
+
+def encode_pokemon(pkmn):
+    # the values are in the same order as the arguments to Pokemon.__init__
+    # the volatile statuses are a (bitmask, unknown volatile statuses) pair
+    return (
+        encode_name(pkmn.id),
+        pkmn.level,
+        tuple(encode_name(t) for t in pkmn.types),
+        pkmn.hp,
+        pkmn.maxhp,
+        encode_name(pkmn.ability),
+        encode_name(pkmn.item),
+        pkmn.attack,
+        pkmn.defense,
+        pkmn.special_attack,
+        pkmn.special_defense,
+        pkmn.speed,
+        encode_name(pkmn.nature),
+        tuple(pkmn.evs),
+        pkmn.attack_boost,
+        pkmn.defense_boost,
+        pkmn.special_attack_boost,
+        pkmn.special_defense_boost,
+        pkmn.speed_boost,
+        pkmn.accuracy_boost,
+        pkmn.evasion_boost,
+        encode_name(pkmn.status),
+        pkmn.terastallized,
+        encode_volatile_statuses(pkmn.volatile_status),
+        tuple(encode_move(m) for m in pkmn.moves),
+    )
+
+
+def decode_pokemon(encoded_pkmn):
+    (
+        identifier,
+        level,
+        types,
+        hp,
+        maxhp,
+        ability,
+        item,
+        attack,
+        defense,
+        special_attack,
+        special_defense,
+        speed,
+        nature,
+        evs,
+        attack_boost,
+        defense_boost,
+        special_attack_boost,
+        special_defense_boost,
+        speed_boost,
+        accuracy_boost,
+        evasion_boost,
+        status,
+        terastallized,
+        volatile_statuses,
+        moves,
+    ) = encoded_pkmn
+    return Pokemon(
+        decode_name(identifier),
+        level,
+        [decode_name(t) for t in types],
+        hp,
+        maxhp,
+        decode_name(ability),
+        decode_name(item),
+        attack,
+        defense,
+        special_attack,
+        special_defense,
+        speed,
+        nature=decode_name(nature),
+        evs=evs,
+        attack_boost=attack_boost,
+        defense_boost=defense_boost,
+        special_attack_boost=special_attack_boost,
+        special_defense_boost=special_defense_boost,
+        speed_boost=speed_boost,
+        accuracy_boost=accuracy_boost,
+        evasion_boost=evasion_boost,
+        status=decode_name(status),
+        terastallized=terastallized,
+        volatile_status=decode_volatile_statuses(*volatile_statuses),
+        moves=[decode_move(m) for m in moves],
+    )
+
+
+def encode_side(side):
+    return (
+        encode_pokemon(side.active),
+        tuple(
+            (encode_name(pkmn_name), encode_pokemon(pkmn))
+            for pkmn_name, pkmn in side.reserve.items()
+        ),
+        side.wish,
+        tuple(
+            (encode_name(side_condition), count)
+            for side_condition, count in side.side_conditions.items()
+        ),
+        side.future_sight,
+    )
+
+
+def decode_side(encoded_side):
+    active, reserve, wish, side_conditions, future_sight = encoded_side
+    return Side(
+        decode_pokemon(active),
+        {decode_name(name): decode_pokemon(pkmn) for name, pkmn in reserve},
+        wish,
+        defaultdict(
+            int,
+            ((decode_name(name), count) for name, count in side_conditions),
+        ),
+        future_sight,
+    )
+
+
+def encode_state(state):
+    return (
+        encode_side(state.user),
+        encode_side(state.opponent),
+        encode_name(state.weather),
+        encode_name(state.field),
+        state.trick_room,
+    )
+
+
+def decode_state(encoded_state):
+    user, opponent, weather, field, trick_room = encoded_state
+    return State(
+        decode_side(user),
+        decode_side(opponent),
+        decode_name(weather),
+        decode_name(field),
+        trick_room,
+    )
@@ -0,0 +1,150 @@
+from collections.abc import Mapping
+from collections.abc import MutableMapping
+from types import MappingProxyType
+
+import constants
+from data import all_move_json
+
+# Moves from the move data are compiled once into CompiledMove objects that cannot be changed
+# The special-effects that modify a move call `.copy()` and change the copy, like they would a dictionary
+# That copy is a MoveOverlay: it only holds the values that were changed and reads everything else from the CompiledMove
+
+
+# every flag is given its own bit the first time a move with that flag is compiled
+FLAG_BITS = {}
+
+# marks a key that was deleted from a MoveOverlay
+REMOVED = object()
+
+
+def get_flag_bit(flag):
+    try:
+        return FLAG_BITS[flag]
+    except KeyError:
+        bit = FLAG_BITS[flag] = 1 << len(FLAG_BITS)
+        return bit
+
+
+def get_flag_bits(flags):
+    flag_bits = 0
+    for flag in flags:
+        flag_bits |= get_flag_bit(flag)
+    return flag_bits
+
+
+def freeze(value):
+    # nested dictionaries become read-only views
+    # `.copy()` on one of these gives a normal dictionary so the special-effects can change it
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    return value
+
+
+class CompiledMove(Mapping):
+    __slots__ = ("values", "flag_bits", "stages")
+
+    def __init__(self, move_json):
+        self.values = {k: freeze(v) for k, v in move_json.items()}
+        self.flag_bits = get_flag_bits(move_json.get(constants.FLAGS, ()))
+
+        # the stages the move goes through when it is used, set by `move_stages.get_move_stages`
+        self.stages = None
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def has_flag(self, flag):
+        return bool(self.flag_bits & FLAG_BITS.get(flag, 0))
+
+    def copy(self):
+        return MoveOverlay(self, {})
+
+    def __deepcopy__(self, memo):
+        # nothing in a CompiledMove can be changed so it is safe to share
+        return self
+
+    def __repr__(self):
+        return "CompiledMove({})".format(self.values[constants.ID])
+
+
+class MoveOverlay(MutableMapping):
+    __slots__ = ("base", "changes")
+
+    def __init__(self, base, changes):
+        self.base = base
+        self.changes = changes
+
+    def __getitem__(self, key):
+        if key in self.changes:
+            value = self.changes[key]
+            if value is REMOVED:
+                raise KeyError(key)
+            return value
+        return self.base[key]
+
+    def __setitem__(self, key, value):
+        self.changes[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.changes[key] = REMOVED
+
+    def __contains__(self, key):
+        if key in self.changes:
+            return self.changes[key] is not REMOVED
+        return key in self.base
+
+    def __iter__(self):
+        for key in self.base:
+            if key not in self.changes or self.changes[key] is not REMOVED:
+                yield key
+        for key, value in self.changes.items():
+            if key not in self.base and value is not REMOVED:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    @property
+    def flag_bits(self):
+        if constants.FLAGS in self.changes:
+            return get_flag_bits(self.get(constants.FLAGS, ()))
+        return self.base.flag_bits
+
+    def has_flag(self, flag):
+        return bool(self.flag_bits & FLAG_BITS.get(flag, 0))
+
+    def copy(self):
+        # the copy shares the CompiledMove and only copies the changes
+        return MoveOverlay(self.base, self.changes.copy())
+
+    def __repr__(self):
+        return "MoveOverlay({}, {})".format(self.base, self.changes)
+
+
+def compile_moves(move_json):
+    return {name: CompiledMove(move) for name, move in move_json.items()}
+
+
+# the compiled moves of the generation whose data is in the data module
+# the data mods change this in place, the same as `all_move_json`
+compiled_moves = compile_moves(all_move_json)
@@ -1,10 +1,13 @@
+from collections.abc import Mapping
 from copy import copy
-from copy import deepcopy
 
 import constants
-from data import all_move_json
 from data import pokedex
 
+from .bounded_cache import BoundedCache
+from .compiled_move import compiled_moves
+
+DEFAULT_DAMAGE_CACHE_SIZE = 20000
 
 pokemon_type_indicies = {
     "normal": 0,
@@ -160,6 +163,114 @@ def _calculate_damage(attacker, defender, move, conditions=None, calc_type="aver
     if conditions is None:
         conditions = {}
 
+    attacking_stat, defending_stat = get_damage_stats(
+        attacker, defender, attacking_move, attack, defense, conditions
+    )
+    defending_types = get_defending_types(defender, attacking_move)
+
+    damage = (
+        int(int((2 * attacker.level) / 5) + 2) * attacking_move[constants.BASE_POWER]
+    )
+    damage = int(damage * attacking_stat / defending_stat)
+    damage = int(damage / 50) + 2
+    damage *= calculate_modifier(
+        attacker, defender, defending_types, attacking_move, conditions
+    )
+
+    damage_rolls = get_damage_rolls(damage, calc_type)
+
+    return list(set(damage_rolls))
+
+
+def get_damage_fingerprint(pkmn):
+    # everything about a pokemon that `_calculate_damage` uses, whether it is attacking or defending
+    return (
+        pkmn.id,
+        pkmn.level,
+        tuple(pkmn.types),
+        pkmn.terastallized,
+        pkmn.ability,
+        pkmn.item,
+        pkmn.status,
+        pkmn.hp,
+        pkmn.attack,
+        pkmn.defense,
+        pkmn.special_attack,
+        pkmn.special_defense,
+        pkmn.attack_boost,
+        pkmn.defense_boost,
+        pkmn.special_attack_boost,
+        pkmn.special_defense_boost,
+        frozenset(pkmn.volatile_status),
+    )
+
+
+def get_move_fingerprint(move):
+    # the parts of a move that `_calculate_damage` uses
+    return (
+        move[constants.ID],
+        move[constants.TYPE],
+        move[constants.CATEGORY],
+        move.get(constants.BASE_POWER),
+        move.get(constants.PRIORITY),
+    )
+
+
+def get_conditions_fingerprint(conditions):
+    if conditions is None:
+        return None
+    return (
+        conditions.get(constants.WEATHER),
+        conditions.get(constants.TERRAIN),
+        conditions.get(constants.REFLECT),
+        conditions.get(constants.LIGHT_SCREEN),
+        conditions.get(constants.AURORA_VEIL),
+    )
+
+
+_MISSING = object()
+
+
+class DamageCache(BoundedCache):
+    """The results of `_calculate_damage` looked up by a fingerprint of the attacker, defender, move and conditions
+
+    The same move is used by the same pokemon against the same pokemon at many nodes of a search,
+    and only the hp, status or boosts that changed make it a different calculation.
+    The move and pokedex data of the generation are not part of the fingerprint.
+    Callers get their own copy of the damage rolls"""
+
+    def __init__(self, max_size=DEFAULT_DAMAGE_CACHE_SIZE):
+        super().__init__(max_size)
+
+    def calculate_damage(
+        self, attacker, defender, move, conditions=None, calc_type="average"
+    ):
+        attacking_move = get_move(move)
+        if attacking_move is None:
+            # `_calculate_damage` raises the error for an invalid move
+            return _calculate_damage(attacker, defender, move, conditions, calc_type)
+
+        key = (
+            get_damage_fingerprint(attacker),
+            get_damage_fingerprint(defender),
+            get_move_fingerprint(attacking_move),
+            get_conditions_fingerprint(conditions),
+            calc_type,
+        )
+        damage_rolls = self.get(key, _MISSING)
+        if damage_rolls is _MISSING:
+            damage_rolls = _calculate_damage(
+                attacker, defender, attacking_move, conditions, calc_type
+            )
+            self.put(key, damage_rolls)
+
+        if damage_rolls is None:
+            return None
+        return list(damage_rolls)
+
+
+def get_damage_stats(attacker, defender, attacking_move, attack, defense, conditions):
+    # the attacking and defending stats used for `attacking_move` after every modifier to them
     attacking_stats = attacker.calculate_boosted_stats()
     defending_stats = defender.calculate_boosted_stats()
 
@@ -174,20 +285,6 @@ def _calculate_damage(attacker, defender, move, conditions=None, calc_type="aver
         elif defense == constants.SPECIAL_ATTACK:
             attacking_stats[attack] = attacker.special_attack
 
-    defending_types = defender.types
-    if attacking_move[constants.ID] == "thousandarrows" and "flying" in defending_types:
-        defending_types = copy(defender.types)
-        defending_types.remove("flying")
-    if (
-        attacking_move[constants.TYPE] == "ground"
-        and constants.ROOST in defender.volatile_status
-    ):
-        defending_types = copy(defender.types)
-        try:
-            defending_types.remove("flying")
-        except ValueError:
-            pass
-
     # rock types get 1.5x SPDEF in sand
     # ice types get 1.5x DEF in snow
     try:
@@ -213,18 +310,24 @@ def _calculate_damage(attacker, defender, move, conditions=None, calc_type="aver
     elif attacker.ability == "beadsofruin":
         defending_stats[constants.SPECIAL_DEFENSE] *= 0.75
 
-    damage = (
-        int(int((2 * attacker.level) / 5) + 2) * attacking_move[constants.BASE_POWER]
-    )
-    damage = int(damage * attacking_stats[attack] / defending_stats[defense])
-    damage = int(damage / 50) + 2
-    damage *= calculate_modifier(
-        attacker, defender, defending_types, attacking_move, conditions
-    )
+    return attacking_stats[attack], defending_stats[defense]
 
-    damage_rolls = get_damage_rolls(damage, calc_type)
 
-    return list(set(damage_rolls))
+def get_defending_types(defender, attacking_move):
+    defending_types = defender.types
+    if attacking_move[constants.ID] == "thousandarrows" and "flying" in defending_types:
+        defending_types = copy(defender.types)
+        defending_types.remove("flying")
+    if (
+        attacking_move[constants.TYPE] == "ground"
+        and constants.ROOST in defender.volatile_status
+    ):
+        defending_types = copy(defender.types)
+        try:
+            defending_types.remove("flying")
+        except ValueError:
+            pass
+    return defending_types
 
 
 def is_super_effective(move_type, defending_pokemon_types):
@@ -242,6 +345,19 @@ def calculate_modifier(attacker, defender, defending_types, attacking_move, cond
     modifier *= type_effectiveness_modifier(
         attacking_move[constants.TYPE], defending_types
     )
+
+    # type effectiveness is always 0 or a power of 2
+    # so multiplying it by the other modifiers gives exactly the same result as multiplying them one at a time
+    modifier *= calculate_modifier_without_type_effectiveness(
+        attacker, defender, attacking_move, conditions
+    )
+    return modifier
+
+
+def calculate_modifier_without_type_effectiveness(
+    attacker, defender, attacking_move, conditions
+):
+    modifier = 1
     modifier *= weather_modifier(attacking_move, conditions.get(constants.WEATHER))
     modifier *= stab_modifier(attacker, attacking_move)
     modifier *= burn_modifier(attacker, attacking_move)
@@ -261,10 +377,10 @@ def calculate_modifier(attacker, defender, defending_types, attacking_move, cond
 
 
 def get_move(move):
-    if isinstance(move, dict):
+    if isinstance(move, Mapping):
         return move
     if isinstance(move, str):
-        return deepcopy(all_move_json.get(move, None))
+        return compiled_moves.get(move)
     else:
         return None
 
@@ -553,9 +669,12 @@ def calculate_damage(
         state, attacking_move_dict, defending_move_dict
     )
 
-    if constants.CHARGE in attacking_move_dict[constants.FLAGS]:
+    if attacking_move_dict.has_flag(constants.CHARGE):
         attacking_move_dict = attacking_move_dict.copy()
         # a charge move doesn't need to charge when only calculating damage
+        attacking_move_dict[constants.FLAGS] = attacking_move_dict[
+            constants.FLAGS
+        ].copy()
         attacking_move_dict[constants.FLAGS].pop(constants.CHARGE, None)
 
     attacking_move_dict = update_attacking_move(
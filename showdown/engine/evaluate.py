@@ -1,6 +1,10 @@
 import constants
 from data import effectiveness
 
+from .bounded_cache import BoundedCache
+
+DEFAULT_POKEMON_SCORE_CACHE_SIZE = 10000
+
 
 class Scoring:
     POKEMON_ALIVE_STATIC = 75
@@ -122,6 +126,60 @@ def evaluate_pokemon(pkmn):
     return round(score)
 
 
+def get_pokemon_signature(pkmn):
+    # everything `evaluate_pokemon` uses to score a pokemon
+    # every fainted pokemon has a score of 0 so they share a signature
+    if pkmn.hp <= 0:
+        return None
+    return (
+        pkmn.hp,
+        pkmn.maxhp,
+        pkmn.attack_boost,
+        pkmn.defense_boost,
+        pkmn.special_attack_boost,
+        pkmn.special_defense_boost,
+        pkmn.speed_boost,
+        pkmn.accuracy_boost,
+        pkmn.evasion_boost,
+        pkmn.status,
+        pkmn.burn_multiplier,
+        frozenset(pkmn.volatile_status),
+    )
+
+
+class PokemonScoreCache(BoundedCache):
+    """The results of `evaluate_pokemon` looked up by the signature of the pokemon
+
+    The reserves of both sides, and the active pokemon in sibling branches of a search,
+    are scored in the same condition many times over.
+    The Scoring weights are not part of the signature"""
+
+    def __init__(self, max_size=DEFAULT_POKEMON_SCORE_CACHE_SIZE):
+        super().__init__(max_size)
+
+    def get_score(self, pkmn):
+        signature = get_pokemon_signature(pkmn)
+        score = self.get(signature)
+        if score is None:
+            score = evaluate_pokemon(pkmn)
+            self.put(signature, score)
+        return score
+
+
+def evaluate_side_conditions(side, alive_reserve_count):
+    score = 0
+    for condition, count in side.side_conditions.items():
+        if condition in Scoring.STATIC_SCORED_SIDE_CONDITIONS:
+            score += count * Scoring.STATIC_SCORED_SIDE_CONDITIONS[condition]
+        elif condition in Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS:
+            score += (
+                count
+                * Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS[condition]
+                * alive_reserve_count
+            )
+    return score
+
+
 def evaluate(state):
     score = 0
 
@@ -145,27 +203,9 @@ def evaluate(state):
         this_pkmn_score = evaluate_pokemon(pkmn)
         score -= this_pkmn_score
 
-    # evaluate the side-conditions for the bot
-    for condition, count in state.user.side_conditions.items():
-        if condition in Scoring.STATIC_SCORED_SIDE_CONDITIONS:
-            score += count * Scoring.STATIC_SCORED_SIDE_CONDITIONS[condition]
-        elif condition in Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS:
-            score += (
-                count
-                * Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS[condition]
-                * bot_alive_reserve_count
-            )
-
-    # evaluate the side-conditions for the opponent
-    for condition, count in state.opponent.side_conditions.items():
-        if condition in Scoring.STATIC_SCORED_SIDE_CONDITIONS:
-            score -= count * Scoring.STATIC_SCORED_SIDE_CONDITIONS[condition]
-        elif condition in Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS:
-            score -= (
-                count
-                * Scoring.POKEMON_COUNT_SCORED_SIDE_CONDITIONS[condition]
-                * opponent_alive_reserves_count
-            )
+    # evaluate the side-conditions
+    score += evaluate_side_conditions(state.user, bot_alive_reserve_count)
+    score -= evaluate_side_conditions(state.opponent, opponent_alive_reserves_count)
 
     try:
         matchup_score = (
@@ -181,3 +221,194 @@ def evaluate(state):
         pass
 
     return int(score)
+
+
+# the instructions that change the score of the active pokemon of the side they are applied to
+POKEMON_SCORE_INSTRUCTIONS = frozenset(
+    {
+        constants.MUTATOR_DAMAGE,
+        constants.MUTATOR_HEAL,
+        constants.MUTATOR_BOOST,
+        constants.MUTATOR_UNBOOST,
+        constants.MUTATOR_APPLY_STATUS,
+        constants.MUTATOR_REMOVE_STATUS,
+        constants.MUTATOR_APPLY_VOLATILE_STATUS,
+        constants.MUTATOR_REMOVE_VOLATILE_STATUS,
+        constants.MUTATOR_CHANGE_STATS,
+    }
+)
+
+# the instructions that change the score of the side-conditions of the side they are applied to
+SIDE_SCORE_INSTRUCTIONS = frozenset(
+    {
+        constants.MUTATOR_SIDE_START,
+        constants.MUTATOR_SIDE_END,
+    }
+)
+
+
+class IncrementalEvaluator:
+    """Gives the same score as `evaluate` for the state of a StateMutator without rescanning the whole state
+
+    The score of every pokemon, the side-conditions of each side, and the matchup of the active pokemon are kept.
+    When the state is scored, the undo log of the mutator is compared with the undo log from the last time:
+    only the parts of the score that the instructions reversed or applied since then can change are scored again.
+    The state must only be modified through the mutator for this to hold - `recalculate` scores everything again
+    """
+
+    def __init__(self, mutator, verify=False, pokemon_score_cache=None):
+        self.mutator = mutator
+        self.state = mutator.state
+        self.sides = {
+            constants.USER: mutator.state.user,
+            constants.OPPONENT: mutator.state.opponent,
+        }
+        self.initialized = False
+
+        if pokemon_score_cache is None:
+            pokemon_score_cache = PokemonScoreCache()
+        self.pokemon_score_cache = pokemon_score_cache
+
+        # debug mode: check the score against `evaluate` every time it is calculated
+        self.verify = verify
+
+        # the undo log of the mutator the last time the state was scored
+        self.evaluated_log = []
+
+        self.pokemon_scores = {constants.USER: dict(), constants.OPPONENT: dict()}
+        self.pokemon_score = 0
+        self.side_scores = {constants.USER: 0, constants.OPPONENT: 0}
+        self.matchup_score = 0
+
+        self.dirty_pokemon = set()
+        self.dirty_sides = set()
+        self.dirty_matchup = False
+
+    def touch(self, instructions):
+        # marks the parts of the score `instructions` can change
+        # a pokemon is found by the active pokemon of the side now, not when the instruction was applied
+        # if those are different the pokemon was switched, and the switch instruction marks both pokemon
+        for instruction in instructions:
+            operation = instruction[0]
+            if operation in POKEMON_SCORE_INSTRUCTIONS:
+                side_string = instruction[1]
+                self.dirty_pokemon.add((side_string, self.sides[side_string].active.id))
+            elif operation in SIDE_SCORE_INSTRUCTIONS:
+                self.dirty_sides.add(instruction[1])
+            elif operation == constants.MUTATOR_SWITCH:
+                side_string = instruction[1]
+                self.dirty_pokemon.add((side_string, instruction[2]))
+                self.dirty_pokemon.add((side_string, instruction[3]))
+                self.dirty_sides.add(side_string)
+                self.dirty_matchup = True
+
+    def touch_changes(self):
+        # the state is the same as when it was last scored up to where the two undo logs stop sharing instructions
+        undo_log = self.mutator.undo_log
+        evaluated_log = self.evaluated_log
+        common = 0
+        for evaluated_instruction, instruction in zip(evaluated_log, undo_log):
+            if evaluated_instruction is not instruction:
+                break
+            common += 1
+
+        self.touch(evaluated_log[common:])
+        self.touch(undo_log[common:])
+        self.evaluated_log = undo_log[:]
+
+    def recalculate(self):
+        for side_string, side in self.sides.items():
+            pokemon_scores = self.pokemon_scores[side_string]
+            pokemon_scores.clear()
+            pokemon_scores[side.active.id] = self.pokemon_score_cache.get_score(
+                side.active
+            )
+            for pkmn in side.reserve.values():
+                pokemon_scores[pkmn.id] = self.pokemon_score_cache.get_score(pkmn)
+            self.side_scores[side_string] = self.evaluate_side(side_string)
+
+        self.pokemon_score = sum(self.pokemon_scores[constants.USER].values()) - sum(
+            self.pokemon_scores[constants.OPPONENT].values()
+        )
+        self.matchup_score = self.evaluate_matchup()
+
+        self.dirty_pokemon.clear()
+        self.dirty_sides.clear()
+        self.dirty_matchup = False
+        self.evaluated_log = self.mutator.undo_log[:]
+        self.initialized = True
+
+    def evaluate_side(self, side_string):
+        side = self.sides[side_string]
+        if side_string == constants.USER:
+            alive_reserve_count = len([p.hp for p in side.reserve.values() if p.hp > 0])
+        else:
+            alive_reserve_count = len(
+                [p for p in side.reserve.values() if p.hp > 0]
+            ) + (6 - (len(side.reserve) + 1))
+        return evaluate_side_conditions(side, alive_reserve_count)
+
+    def evaluate_matchup(self):
+        user_active_id = self.state.user.active.id
+        opponent_active_id = self.state.opponent.active.id
+        try:
+            matchup_score = (
+                Scoring.MATCHUP_BONUS
+                * effectiveness[user_active_id][opponent_active_id]
+            )
+            matchup_score -= (
+                Scoring.MATCHUP_BONUS
+                * effectiveness[opponent_active_id][user_active_id]
+            )
+        except KeyError:
+            return 0
+        return matchup_score
+
+    def update(self):
+        for side_string, pkmn_id in self.dirty_pokemon:
+            side = self.sides[side_string]
+            pkmn = side.active if side.active.id == pkmn_id else side.reserve[pkmn_id]
+            pokemon_scores = self.pokemon_scores[side_string]
+            pkmn_score = self.pokemon_score_cache.get_score(pkmn)
+            if side_string == constants.USER:
+                self.pokemon_score += pkmn_score - pokemon_scores[pkmn_id]
+            else:
+                self.pokemon_score -= pkmn_score - pokemon_scores[pkmn_id]
+            pokemon_scores[pkmn_id] = pkmn_score
+        self.dirty_pokemon.clear()
+
+        for side_string in self.dirty_sides:
+            self.side_scores[side_string] = self.evaluate_side(side_string)
+        self.dirty_sides.clear()
+
+        if self.dirty_matchup:
+            self.matchup_score = self.evaluate_matchup()
+            self.dirty_matchup = False
+
+    def evaluate(self):
+        if self.initialized:
+            self.touch_changes()
+            self.update()
+        else:
+            self.recalculate()
+
+        # the pokemon and side-condition scores are whole numbers so only the matchup can be a fraction
+        # it is added last, the same as in `evaluate`, so the two give exactly the same result
+        score = (
+            self.pokemon_score
+            + self.side_scores[constants.USER]
+            - self.side_scores[constants.OPPONENT]
+        )
+        score += self.matchup_score
+        score = int(score)
+
+        if self.verify:
+            full_score = evaluate(self.state)
+            if score != full_score:
+                raise ValueError(
+                    "Incremental evaluation {} does not match full evaluation {}".format(
+                        score, full_score
+                    )
+                )
+
+        return score
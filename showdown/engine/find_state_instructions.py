@@ -2,10 +2,11 @@ from copy import copy
 
 import constants
 from config import ShowdownConfig
-from data import all_move_json
-
 from . import instruction_generator
+from .compiled_move import compiled_moves
 from .damage_calculator import _calculate_damage
+from .move_stages import MoveContext
+from .move_stages import run_move_stages
 from .objects import TransposeInstruction
 from .special_effects.abilities.modify_attack_against import (
     ability_modify_attack_against,
@@ -19,6 +20,7 @@ from .special_effects.items.modify_attack_being_used import (
 )
 from .special_effects.moves.modify_move import modify_attack_being_used
 from .special_effects.abilities.before_move import ability_before_move
+from .special_effects import hooks
 from .switch_out_moves import switch_out_move_triggered
 from .switch_out_moves import get_best_switch_pokemon
 
@@ -29,11 +31,18 @@ def lookup_move(move_name):
         assert len(split_move) == 2, "Invalid switch string: {}".format(split_move)
         return {constants.SWITCH_STRING: split_move[1]}
 
-    return all_move_json[move_name.lower()]
+    return compiled_moves[move_name.lower()]
 
 
 def get_effective_speed(state, side):
-    boosted_speed = side.active.calculate_boosted_stats()[constants.SPEED]
+    # kept on the side until the StateMutator applies an instruction that can change it
+    if side.effective_speed is None:
+        side.effective_speed = calculate_effective_speed(state, side)
+    return side.effective_speed
+
+
+def calculate_effective_speed(state, side):
+    boosted_speed = side.active.get_boosted_stats()[constants.SPEED]
 
     if state.weather == constants.SUN and side.active.ability == "chlorophyll":
         boosted_speed *= 2
@@ -64,10 +73,7 @@ def get_effective_speed(state, side):
     if constants.PARALYZED == side.active.status and side.active.ability != "quickfeet":
         boosted_speed *= 0.5
 
-    if any(
-        vs in side.active.volatile_status
-        for vs in ["quarkdrivespe", "protosynthesisspe"]
-    ):
+    if not constants.SPEED_VOLATILE_STATUSES.isdisjoint(side.active.volatile_status):
         boosted_speed *= 1.5
 
     return int(boosted_speed)
@@ -150,41 +156,61 @@ def update_attacking_move(
     #   - items
     #   - protect
 
-    attacking_move = modify_attack_being_used(
-        attacking_side,
-        attacking_move,
-        defending_move,
-        attacking_pokemon,
-        defending_pokemon,
-        first_move,
-        weather,
-        terrain,
+    attacker_ability_hooks = hooks.ability_hooks.get(
+        attacking_pokemon.ability, hooks.NO_HOOKS
     )
-
-    attacking_move = ability_modify_attack_being_used(
-        attacking_pokemon.ability,
-        attacking_move,
-        defending_move,
-        attacking_pokemon,
-        defending_pokemon,
-        first_move,
-        weather,
+    attacker_item_hooks = hooks.item_hooks.get(attacking_pokemon.item, hooks.NO_HOOKS)
+    defender_ability_hooks = hooks.ability_hooks.get(
+        defending_pokemon.ability, hooks.NO_HOOKS
     )
+    defender_item_hooks = hooks.item_hooks.get(defending_pokemon.item, hooks.NO_HOOKS)
 
-    attacking_move = item_modify_attack_being_used(
-        attacking_pokemon.item, attacking_move, attacking_pokemon, defending_pokemon
-    )
+    if (
+        hooks.move_hooks.get(attacking_move[constants.ID], hooks.NO_HOOKS)
+        & hooks.MODIFY_ATTACK_BEING_USED
+    ):
+        attacking_move = modify_attack_being_used(
+            attacking_side,
+            attacking_move,
+            defending_move,
+            attacking_pokemon,
+            defending_pokemon,
+            first_move,
+            weather,
+            terrain,
+        )
 
-    attacking_move = ability_modify_attack_against(
-        defending_pokemon.ability, attacking_move, attacking_pokemon, defending_pokemon
-    )
+    if attacker_ability_hooks & hooks.MODIFY_ATTACK_BEING_USED:
+        attacking_move = ability_modify_attack_being_used(
+            attacking_pokemon.ability,
+            attacking_move,
+            defending_move,
+            attacking_pokemon,
+            defending_pokemon,
+            first_move,
+            weather,
+        )
 
-    attacking_move = item_modify_attack_against(
-        defending_pokemon.item, attacking_move, attacking_pokemon, defending_pokemon
-    )
+    if attacker_item_hooks & hooks.MODIFY_ATTACK_BEING_USED:
+        attacking_move = item_modify_attack_being_used(
+            attacking_pokemon.item, attacking_move, attacking_pokemon, defending_pokemon
+        )
+
+    if defender_ability_hooks & hooks.MODIFY_ATTACK_AGAINST:
+        attacking_move = ability_modify_attack_against(
+            defending_pokemon.ability,
+            attacking_move,
+            attacking_pokemon,
+            defending_pokemon,
+        )
+
+    if defender_item_hooks & hooks.MODIFY_ATTACK_AGAINST:
+        attacking_move = item_modify_attack_against(
+            defending_pokemon.item, attacking_move, attacking_pokemon, defending_pokemon
+        )
 
     if (
-        constants.CHARGE in attacking_move[constants.FLAGS]
+        attacking_move.has_flag(constants.CHARGE)
         and attacking_move[constants.ID] not in attacking_pokemon.volatile_status
     ):
         attacking_move = attacking_move.copy()
@@ -195,14 +221,14 @@ def update_attacking_move(
         attacking_move[constants.CATEGORY] = constants.STATUS
 
     if (
-        constants.PROTECT in attacking_move[constants.FLAGS]
+        attacking_move.has_flag(constants.PROTECT)
         and any(
             vs in constants.PROTECT_VOLATILE_STATUSES
             for vs in defending_pokemon.volatile_status
         )
         and not (
             attacking_pokemon.ability == "unseenfist"
-            and constants.CONTACT in attacking_move[constants.FLAGS]
+            and attacking_move.has_flag(constants.CONTACT)
         )
     ):
         attacking_move = attacking_move.copy()
@@ -262,7 +288,7 @@ def cannot_use_move(attacking_pokemon, attacking_move):
     )
 
 
-def get_state_instructions_from_move(
+def _get_state_instructions_from_move(
     mutator,
     attacking_move,
     defending_move,
@@ -270,6 +296,7 @@ def get_state_instructions_from_move(
     defender,
     first_move,
     instructions,
+    run_stages,
 ):
     instructions.frozen = False
 
@@ -285,7 +312,7 @@ def get_state_instructions_from_move(
     if not first_move and constants.DRAG in defending_move.get(constants.FLAGS, {}):
         return [instructions]
 
-    mutator.apply(instructions.instructions)
+    mutator.move_to(instructions.instructions)
     attacking_side = instruction_generator.get_side_from_state(mutator.state, attacker)
     defending_side = instruction_generator.get_side_from_state(mutator.state, defender)
     attacking_pokemon = attacking_side.active
@@ -309,7 +336,6 @@ def get_state_instructions_from_move(
         instructions = instruction_generator.get_instructions_from_flinched(
             mutator, attacker, instructions
         )
-        mutator.reverse(instructions.instructions)
         return [instructions]
 
     attacking_move = update_attacking_move(
@@ -327,17 +353,90 @@ def get_state_instructions_from_move(
         mutator, attacker, instructions
     )
 
-    ability_before_move_instructions = ability_before_move(
-        attacking_pokemon.ability,
-        mutator.state,
+    if (
+        hooks.ability_hooks.get(attacking_pokemon.ability, hooks.NO_HOOKS)
+        & hooks.BEFORE_MOVE
+    ):
+        ability_before_move_instructions = ability_before_move(
+            attacking_pokemon.ability,
+            mutator.state,
+            attacker,
+            attacking_move,
+            attacking_pokemon,
+            defending_pokemon,
+        )
+        if ability_before_move_instructions is not None and not instructions.frozen:
+            mutator.apply(ability_before_move_instructions)
+            instructions.add_instructions(ability_before_move_instructions)
+
+    ctx = MoveContext(
+        mutator,
         attacker,
-        attacking_move,
+        defender,
+        attacking_side,
         attacking_pokemon,
         defending_pokemon,
+        attacking_move,
+        defending_move,
+        first_move,
     )
-    if ability_before_move_instructions is not None and not instructions.frozen:
-        mutator.apply(ability_before_move_instructions)
-        instructions.instructions += ability_before_move_instructions
+    return run_stages(ctx, conditions, instructions)
+
+
+def get_state_instructions_from_move(
+    mutator,
+    attacking_move,
+    defending_move,
+    attacker,
+    defender,
+    first_move,
+    instructions,
+):
+    return _get_state_instructions_from_move(
+        mutator,
+        attacking_move,
+        defending_move,
+        attacker,
+        defender,
+        first_move,
+        instructions,
+        run_move_stages,
+    )
+
+
+def get_state_instructions_from_move_reference(
+    mutator,
+    attacking_move,
+    defending_move,
+    attacker,
+    defender,
+    first_move,
+    instructions,
+):
+    # works out the stages of the move every time it is used
+    # `get_state_instructions_from_move` must give the same instructions as this
+    return _get_state_instructions_from_move(
+        mutator,
+        attacking_move,
+        defending_move,
+        attacker,
+        defender,
+        first_move,
+        instructions,
+        run_move_stages_reference,
+    )
+
+
+def run_move_stages_reference(ctx, conditions, instructions):
+    mutator = ctx.mutator
+    attacker = ctx.attacker
+    defender = ctx.defender
+    attacking_side = ctx.attacking_side
+    attacking_pokemon = ctx.attacking_pokemon
+    defending_pokemon = ctx.defending_pokemon
+    attacking_move = ctx.attacking_move
+    defending_move = ctx.defending_move
+    first_move = ctx.first_move
 
     damage_amounts = None
     move_status_effect = None
@@ -436,8 +535,6 @@ def get_state_instructions_from_move(
             )
             boosts_chance = attacking_move[constants.ACCURACY]
 
-    mutator.reverse(instructions.instructions)
-
     all_instructions = (
         instruction_generator.get_instructions_from_statuses_that_freeze_the_state(
             mutator, attacker, defender, attacking_move, defending_move, instructions
@@ -589,6 +686,8 @@ def get_state_instructions_from_move(
     if switch_out_move_triggered(attacking_move, damage_amounts):
         temp_instructions = []
         for i in all_instructions:
+            # the best switch is picked from the state at the start of the turn
+            mutator.rollback(mutator.base_checkpoint)
             best_switch = get_best_switch_pokemon(
                 mutator, i, attacker, attacking_side, defending_move, first_move
             )
@@ -606,17 +705,38 @@ def get_state_instructions_from_move(
     return all_instructions
 
 
-def remove_duplicate_instructions(list_of_instructions):
-    new_instructions = [list_of_instructions[0]]
-    for instruction_1 in list_of_instructions[1:]:
-        for instruction_2 in new_instructions:
-            if instruction_1.has_same_instructions_as(instruction_2):
-                instruction_2.percentage += instruction_1.percentage
-                break
+def get_instructions_key(instructions):
+    # a hashable key that is the same for equal lists of instructions
+    # a few instructions hold lists (the types in `change_type`, for example) which are made into tuples
+    key = tuple(instructions)
+    try:
+        hash(key)
+    except TypeError:
+        key = tuple(
+            tuple(tuple(v) if isinstance(v, list) else v for v in instruction)
+            for instruction in instructions
+        )
+    return key
+
+
+def remove_duplicate_instructions(list_of_instructions, mutator=None):
+    # branches with the same instructions are merged into the first of them
+    # if a mutator is given, branches that lead to the same state are merged even if their instructions differ
+    merged_instructions = {}
+    for instruction in list_of_instructions:
+        if mutator is None:
+            key = get_instructions_key(instruction.instructions)
+        else:
+            mutator.move_to(instruction.instructions)
+            key = mutator.state_hash
+
+        existing_instruction = merged_instructions.get(key)
+        if existing_instruction is None:
+            merged_instructions[key] = instruction
         else:
-            new_instructions.append(instruction_1)
+            existing_instruction.percentage += instruction.percentage
 
-    return new_instructions
+    return list(merged_instructions.values())
 
 
 def end_of_turn_triggered(user_move, opponent_move):
@@ -634,7 +754,35 @@ def end_of_turn_triggered(user_move, opponent_move):
     return True
 
 
-def get_all_state_instructions(mutator, user_move_string, opponent_move_string):
+def get_all_state_instructions(
+    mutator, user_move_string, opponent_move_string, instruction_cache=None
+):
+    # the instructions for every branch start from the state as it is now
+    # the generators move the state between branches with `mutator.move_to` and it is put back at the end
+    # an InstructionCache remembers the result for the state so it is only generated once
+    if instruction_cache is not None:
+        cache_key = (mutator.state_hash, user_move_string, opponent_move_string)
+        cached_instructions = instruction_cache.get(cache_key)
+        if cached_instructions is not None:
+            return cached_instructions
+
+    previous_base_checkpoint = mutator.base_checkpoint
+    mutator.base_checkpoint = mutator.checkpoint()
+    try:
+        all_instructions = _get_all_state_instructions(
+            mutator, user_move_string, opponent_move_string
+        )
+    finally:
+        mutator.rollback(mutator.base_checkpoint)
+        mutator.base_checkpoint = previous_base_checkpoint
+
+    if instruction_cache is not None:
+        instruction_cache.put(cache_key, all_instructions)
+
+    return all_instructions
+
+
+def _get_all_state_instructions(mutator, user_move_string, opponent_move_string):
     user_move = lookup_move(user_move_string)
     opponent_move = lookup_move(opponent_move_string)
 
@@ -692,6 +840,9 @@ def get_all_state_instructions(mutator, user_move_string, opponent_move_string):
             )
         all_instructions = temp_instructions
 
-    all_instructions = remove_duplicate_instructions(all_instructions)
+    all_instructions = remove_duplicate_instructions(
+        all_instructions,
+        mutator if ShowdownConfig.merge_equivalent_states else None,
+    )
 
     return all_instructions
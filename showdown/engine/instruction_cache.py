@@ -0,0 +1,26 @@
+from copy import copy
+
+from .bounded_cache import BoundedCache
+
+DEFAULT_INSTRUCTION_CACHE_SIZE = 20000
+
+
+class InstructionCache(BoundedCache):
+    """The lists of TransposeInstructions produced by `get_all_state_instructions`
+
+    The same State is reached many times in a search and the same pair of moves is tried in it each time,
+    so the instructions are looked up by the hash of the State and the two move strings.
+    Callers get their own copies of the TransposeInstructions - the tuples of instructions are shared
+    """
+
+    def __init__(self, max_size=DEFAULT_INSTRUCTION_CACHE_SIZE):
+        super().__init__(max_size)
+
+    def get(self, key):
+        state_instructions = super().get(key)
+        if state_instructions is None:
+            return None
+        return [copy(instructions) for instructions in state_instructions]
+
+    def put(self, key, state_instructions):
+        super().put(key, [copy(instructions) for instructions in state_instructions])
@@ -10,6 +10,7 @@ from .special_effects.items.end_of_turn import item_end_of_turn
 from .special_effects.abilities.end_of_turn import ability_end_of_turn
 from .special_effects.moves.after_move import after_move
 from .special_effects.moves import move_special_effect
+from .special_effects import hooks
 
 logger = logging.getLogger(__name__)
 
@@ -63,7 +64,7 @@ def get_instructions_from_move_special_effect(
     except AttributeError:
         new_instructions = list()
     else:
-        mutator.apply(instructions.instructions)
+        mutator.move_to(instructions.instructions)
         new_instructions = special_logic_move_function(
             mutator,
             attacking_side,
@@ -72,7 +73,6 @@ def get_instructions_from_move_special_effect(
             defending_pokemon,
         )
         new_instructions = new_instructions or list()
-        mutator.reverse(instructions.instructions)
 
     for i in new_instructions:
         instructions.add_instruction(i)
@@ -95,9 +95,8 @@ def get_instructions_from_volatile_statuses(
         return [instruction]
 
     side = get_side_from_state(mutator.state, affected_side)
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction.instructions)
     if volatile_status in side.active.volatile_status:
-        mutator.reverse(instruction.instructions)
         return [instruction]
 
     if (
@@ -109,14 +108,11 @@ def get_instructions_from_volatile_statuses(
             affected_side,
             volatile_status,
         )
-        mutator.reverse(instruction.instructions)
         instruction.add_instruction(apply_status_instruction)
         if volatile_status == constants.SUBSTITUTE:
             instruction.add_instruction(
                 (constants.MUTATOR_DAMAGE, affected_side, side.active.maxhp * 0.25)
             )
-    else:
-        mutator.reverse(instruction.instructions)
 
     return [instruction]
 
@@ -129,7 +125,7 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
 
     attacking_side = get_side_from_state(mutator.state, attacker)
     defending_side = get_side_from_state(mutator.state, opposite_side[attacker])
-    mutator.apply(instructions.instructions)
+    mutator.move_to(instructions.instructions)
     instruction_additions = remove_volatile_status_and_boosts_instructions(
         attacking_side, attacker
     )
@@ -252,35 +248,38 @@ def get_instructions_from_switch(mutator, attacker, switch_pokemon_name, instruc
                 instruction_additions.append(toxic_spike_instruction)
 
     # account for switch-in abilities
-    ability_switch_in_instructions = ability_on_switch_in(
-        switch_pkmn.ability,
-        mutator.state,
-        attacker,
-        attacking_side.active,
-        opposite_side[attacker],
-        defending_side.active,
-    )
-    if ability_switch_in_instructions is not None:
-        for i in ability_switch_in_instructions:
-            mutator.apply_one(i)
-            instruction_additions.append(i)
+    if (
+        hooks.ability_hooks.get(switch_pkmn.ability, hooks.NO_HOOKS)
+        & hooks.ON_SWITCH_IN
+    ):
+        ability_switch_in_instructions = ability_on_switch_in(
+            switch_pkmn.ability,
+            mutator.state,
+            attacker,
+            attacking_side.active,
+            opposite_side[attacker],
+            defending_side.active,
+        )
+        if ability_switch_in_instructions is not None:
+            for i in ability_switch_in_instructions:
+                mutator.apply_one(i)
+                instruction_additions.append(i)
 
     # account for switch-in items
-    item_switch_in_instructions = item_on_switch_in(
-        switch_pkmn.item,
-        mutator.state,
-        attacker,
-        attacking_side.active,
-        opposite_side[attacker],
-        defending_side.active,
-    )
-    if item_switch_in_instructions is not None:
-        for i in item_switch_in_instructions:
-            mutator.apply_one(i)
-            instruction_additions.append(i)
+    if hooks.item_hooks.get(switch_pkmn.item, hooks.NO_HOOKS) & hooks.ON_SWITCH_IN:
+        item_switch_in_instructions = item_on_switch_in(
+            switch_pkmn.item,
+            mutator.state,
+            attacker,
+            attacking_side.active,
+            opposite_side[attacker],
+            defending_side.active,
+        )
+        if item_switch_in_instructions is not None:
+            for i in item_switch_in_instructions:
+                mutator.apply_one(i)
+                instruction_additions.append(i)
 
-    mutator.reverse(instruction_additions)
-    mutator.reverse(instructions.instructions)
     for i in instruction_additions:
         instructions.add_instruction(i)
 
@@ -316,7 +315,7 @@ def get_instructions_from_statuses_that_freeze_the_state(
     attacker_side = get_side_from_state(mutator.state, attacker)
     defender_side = get_side_from_state(mutator.state, defender)
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction.instructions)
 
     if constants.PARALYZED == attacker_side.active.status:
         fully_paralyzed_instruction = copy(instruction)
@@ -359,8 +358,6 @@ def get_instructions_from_statuses_that_freeze_the_state(
     if move[constants.TYPE] == "electric" and "ground" in defender_side.active.types:
         instruction.frozen = True
 
-    mutator.reverse(instruction.instructions)
-
     return instructions
 
 
@@ -381,7 +378,7 @@ def get_instructions_from_damage(
     drain = attacking_move.get(constants.DRAIN)
     move_flags = attacking_move.get(constants.FLAGS, {})
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction.instructions)
 
     if accuracy is True or "glaiverush" in damage_side.active.volatile_status:
         accuracy = 100
@@ -408,10 +405,7 @@ def get_instructions_from_damage(
                     attacker_side.active.hp,
                 ),
             )
-            mutator.reverse(instruction.instructions)
             instruction.add_instruction(crash_instruction)
-        else:
-            mutator.reverse(instruction.instructions)
         instruction.frozen = True
         return [instruction]
 
@@ -420,6 +414,11 @@ def get_instructions_from_damage(
             "attacker parameter must be one of: {}".format(", ".join(opposite_side))
         )
 
+    has_after_move = (
+        hooks.move_hooks.get(attacking_move[constants.ID], hooks.NO_HOOKS)
+        & hooks.AFTER_MOVE
+    )
+
     instructions = []
     instruction_additions = []
     move_missed_instruction = copy(instruction)
@@ -494,17 +493,17 @@ def get_instructions_from_damage(
             )
             instruction_additions.append(recoil_instruction)
 
-        after_move_instructions = after_move(
-            attacking_move[constants.ID],
-            mutator.state,
-            attacker,
-            defender,
-            attacker_side,
-            damage_side,
-            True,
-            hit_sub,
-        )
-        instruction_additions += after_move_instructions
+        if has_after_move:
+            instruction_additions += after_move(
+                attacking_move[constants.ID],
+                mutator.state,
+                attacker,
+                defender,
+                attacker_side,
+                damage_side,
+                True,
+                hit_sub,
+            )
 
         instructions.append(instruction)
 
@@ -534,22 +533,22 @@ def get_instructions_from_damage(
                 blunder_policy_increase_speed_instruction
             )
 
-        after_move_instructions = after_move(
-            attacking_move[constants.ID],
-            mutator.state,
-            attacker,
-            defender,
-            attacker_side,
-            damage_side,
-            False,
-            False,
-        )
-        for i in after_move_instructions:
-            move_missed_instruction.add_instruction(i)
+        if has_after_move:
+            move_missed_instruction.add_instructions(
+                after_move(
+                    attacking_move[constants.ID],
+                    mutator.state,
+                    attacker,
+                    defender,
+                    attacker_side,
+                    damage_side,
+                    False,
+                    False,
+                )
+            )
 
         instructions.append(move_missed_instruction)
 
-    mutator.reverse(instruction.instructions)
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -608,7 +607,7 @@ def get_instructions_from_side_conditions(
 
     instruction_additions = []
     side = get_side_from_state(mutator.state, side_string)
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction.instructions)
 
     if condition == constants.WISH:
         if side.wish[0] == 0:
@@ -636,7 +635,6 @@ def get_instructions_from_side_conditions(
                 (constants.MUTATOR_SIDE_START, side_string, condition, 1)
             )
 
-    mutator.reverse(instruction.instructions)
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -657,7 +655,7 @@ def get_instructions_from_hazard_clearing_moves(
     defender_string = opposite_side[attacker_string]
 
     instruction_additions = []
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction.instructions)
 
     attacker_side = get_side_from_state(mutator.state, attacker_string)
     defender_side = get_side_from_state(mutator.state, defender_string)
@@ -736,7 +734,6 @@ def get_instructions_from_hazard_clearing_moves(
     else:
         raise ValueError("{} is not a hazard clearing move".format(move[constants.ID]))
 
-    mutator.reverse(instruction.instructions)
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -760,19 +757,17 @@ def get_instructions_from_status_effects(
         accuracy = 100
     percent_hit = accuracy / 100
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction.instructions)
     instruction_additions = []
     defending_side = get_side_from_state(mutator.state, defender)
     attacking_side = get_side_from_state(mutator.state, opposite_side[defender])
 
     if sleep_clause_activated(defending_side, status):
-        mutator.reverse(instruction.instructions)
         return [instruction]
 
     if immune_to_status(
         mutator.state, defending_side.active, attacking_side.active, status
     ):
-        mutator.reverse(instruction.instructions)
         return [instruction]
 
     move_missed_instruction = copy(instruction)
@@ -798,7 +793,6 @@ def get_instructions_from_status_effects(
             )
         instructions.append(move_missed_instruction)
 
-    mutator.reverse(instruction.instructions)
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -821,7 +815,7 @@ def get_instructions_from_boosts(mutator, side_string, boosts, accuracy, instruc
         accuracy = 100
     percent_hit = accuracy / 100
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction.instructions)
     side = get_side_from_state(mutator.state, side_string)
 
     instruction_additions = []
@@ -862,7 +856,6 @@ def get_instructions_from_boosts(mutator, side_string, boosts, accuracy, instruc
         move_missed_instruction.update_percentage(1 - percent_hit)
         instructions.append(move_missed_instruction)
 
-    mutator.reverse(instruction.instructions)
     for i in instruction_additions:
         instruction.add_instruction(i)
 
@@ -907,7 +900,7 @@ def get_instructions_from_attacker_recovery(
     if instruction.frozen:
         return [instruction]
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction.instructions)
 
     target = move[constants.HEAL_TARGET]
     if target in opposing_side_strings:
@@ -924,7 +917,6 @@ def get_instructions_from_attacker_recovery(
         health_recovered = 0
 
     if health_recovered == 0:
-        mutator.reverse(instruction.instructions)
         return [instruction]
 
     final_health = pkmn.hp + health_recovered
@@ -935,8 +927,6 @@ def get_instructions_from_attacker_recovery(
 
     heal_instruction = (constants.MUTATOR_HEAL, side_string, health_recovered)
 
-    mutator.reverse(instruction.instructions)
-
     if health_recovered:
         instruction.add_instruction(heal_instruction)
 
@@ -952,7 +942,7 @@ def get_end_of_turn_instructions(
     else:
         sides = [constants.OPPONENT, constants.USER]
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction.instructions)
 
     # weather damage - sand and hail
     for attacker in sides:
@@ -1035,19 +1025,21 @@ def get_end_of_turn_instructions(
         pkmn = side.active
         defending_pkmn = defending_side.active
 
-        item_instruction = item_end_of_turn(
-            side.active.item, mutator.state, attacker, pkmn, defender, defending_pkmn
-        )
-        if item_instruction is not None:
-            mutator.apply_one(item_instruction)
-            instruction.add_instruction(item_instruction)
+        if hooks.item_hooks.get(pkmn.item, hooks.NO_HOOKS) & hooks.END_OF_TURN:
+            item_instruction = item_end_of_turn(
+                pkmn.item, mutator.state, attacker, pkmn, defender, defending_pkmn
+            )
+            if item_instruction is not None:
+                mutator.apply_one(item_instruction)
+                instruction.add_instruction(item_instruction)
 
-        ability_instruction = ability_end_of_turn(
-            side.active.ability, mutator.state, attacker, pkmn, defender, defending_pkmn
-        )
-        if ability_instruction is not None:
-            mutator.apply_one(ability_instruction)
-            instruction.add_instruction(ability_instruction)
+        if hooks.ability_hooks.get(pkmn.ability, hooks.NO_HOOKS) & hooks.END_OF_TURN:
+            ability_instruction = ability_end_of_turn(
+                pkmn.ability, mutator.state, attacker, pkmn, defender, defending_pkmn
+            )
+            if ability_instruction is not None:
+                mutator.apply_one(ability_instruction)
+                instruction.add_instruction(ability_instruction)
 
     # poison, toxic, and burn damage
     for attacker in sides:
@@ -1248,8 +1240,6 @@ def get_end_of_turn_instructions(
                 mutator.apply_one(disable_instruction)
                 instruction.add_instruction(disable_instruction)
 
-    mutator.reverse(instruction.instructions)
-
     return [instruction]
 
 
@@ -1272,10 +1262,9 @@ def get_instructions_from_drag(
     else:
         raise ValueError("Invalid value for move_target: {}".format(move_target))
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction.instructions)
     alive_reserves = [s.id for s in affected_side.reserve.values() if s.hp > 0]
     num_reserve_alive = len(alive_reserves)
-    mutator.reverse(instruction.instructions)
     if num_reserve_alive == 0:
         return [instruction]
 
@@ -1299,7 +1288,7 @@ def get_instructions_from_boost_reset_moves(
     defending_side_string = opposite_side[attacking_side_string]
     defending_side = get_side_from_state(mutator.state, defending_side_string)
 
-    mutator.apply(instruction.instructions)
+    mutator.move_to(instruction.instructions)
     new_instructions = []
     if attacking_move[constants.TARGET] in constants.MOVE_TARGET_SELF:
         new_instructions += remove_volatile_status_and_boosts_instructions(
@@ -1309,7 +1298,6 @@ def get_instructions_from_boost_reset_moves(
         new_instructions += remove_volatile_status_and_boosts_instructions(
             defending_side, defending_side_string
         )
-    mutator.reverse(instruction.instructions)
 
     for new_instruction in new_instructions:
         instruction.add_instruction(new_instruction)
@@ -0,0 +1,398 @@
+from copy import copy
+
+import constants
+from config import ShowdownConfig
+
+from . import instruction_generator
+from .compiled_move import CompiledMove
+from .special_effects.moves import move_special_effect
+from .switch_out_moves import get_best_switch_pokemon
+from .switch_out_moves import switch_out_move_triggered
+
+# `get_state_instructions_from_move` finds the instructions of a move by running them through a list of stages
+# Which stages a move needs - and what it boosts, which status it causes, and so on - is decided once by MoveStages
+# A CompiledMove keeps its MoveStages so the move is only looked at the first time it is used
+# A move that was changed by a special-effect is looked at every time because it can be different each time
+
+
+class MoveContext:
+    """Everything about the turn that the stages of a move need"""
+
+    __slots__ = (
+        "mutator",
+        "attacker",
+        "defender",
+        "attacking_side",
+        "attacking_pokemon",
+        "defending_pokemon",
+        "attacking_move",
+        "defending_move",
+        "first_move",
+        "damage_amounts",
+    )
+
+    def __init__(
+        self,
+        mutator,
+        attacker,
+        defender,
+        attacking_side,
+        attacking_pokemon,
+        defending_pokemon,
+        attacking_move,
+        defending_move,
+        first_move,
+    ):
+        self.mutator = mutator
+        self.attacker = attacker
+        self.defender = defender
+        self.attacking_side = attacking_side
+        self.attacking_pokemon = attacking_pokemon
+        self.defending_pokemon = defending_pokemon
+        self.attacking_move = attacking_move
+        self.defending_move = defending_move
+        self.first_move = first_move
+        self.damage_amounts = None
+
+
+class MoveStages:
+    """The stages a move goes through and the values they use, in the order they are run"""
+
+    def __init__(self, move, first_move):
+        self.move_id = move[constants.ID]
+        self.damaging = move[constants.CATEGORY] in constants.DAMAGING_CATEGORIES
+        self.volatile_status = move.get(constants.VOLATILE_STATUS)
+        self.move_accuracy = min(100, move[constants.ACCURACY])
+        self.move_status_accuracy = self.move_accuracy
+        self.move_target = move[constants.TARGET]
+        self.move_status_target_is_attacker = self.move_target == constants.SELF
+        self.side_condition = move.get(constants.SIDE_CONDITIONS)
+        self.move_status_effect = None
+        self.flinch_accuracy = None
+        self.boosts = None
+        self.boosts_target_is_attacker = None
+        self.boosts_chance = None
+
+        if self.damaging:
+            self.set_damaging_move_effects(move, first_move)
+        else:
+            self.move_status_effect = move.get(constants.STATUS)
+
+            # boosts from moves that only boost (dragon dance)
+            if move.get(constants.BOOSTS) is not None:
+                self.boosts = move[constants.BOOSTS]
+                self.boosts_target_is_attacker = (
+                    move[constants.TARGET] in constants.MOVE_TARGET_SELF
+                )
+                self.boosts_chance = move[constants.ACCURACY]
+
+        stages = []
+        if hasattr(move_special_effect, self.move_id):
+            stages.append(self.move_special_effect)
+        if self.damaging:
+            stages.append(self.damage)
+        defenders_ability_index = len(stages)
+        if self.side_condition is not None:
+            stages.append(self.side_conditions)
+        if self.move_id in constants.HAZARD_CLEARING_MOVES:
+            stages.append(self.hazard_clearing)
+        if self.volatile_status is not None:
+            stages.append(self.volatile_statuses)
+        if self.move_status_effect is not None:
+            stages.append(self.status_effects)
+        if self.boosts is not None:
+            stages.append(self.boost)
+        if self.move_id in constants.BOOST_RESET_MOVES:
+            stages.append(self.boost_reset)
+        if move.get(constants.HEAL) is not None:
+            stages.append(self.attacker_recovery)
+        if self.flinch_accuracy is not None:
+            stages.append(self.flinch)
+        if constants.DRAG in move[constants.FLAGS] and move[constants.ACCURACY]:
+            stages.append(self.drag)
+        if self.move_id in constants.SWITCH_OUT_MOVES:
+            stages.append(self.switch_out)
+
+        # the defender's ability is only known when the move is used
+        # so there is a list for when it has an ability that does something after a move and one for when it does not
+        self.stages = (
+            tuple(stages),
+            tuple(
+                stages[:defenders_ability_index]
+                + [self.defenders_ability_after_move]
+                + stages[defenders_ability_index:]
+            ),
+        )
+
+    def set_damaging_move_effects(self, move, first_move):
+        attacking_move_secondary = move[constants.SECONDARY]
+        attacking_move_self = move.get(constants.SELF)
+        if attacking_move_secondary:
+            # flinching (iron head)
+            if (
+                attacking_move_secondary.get(constants.VOLATILE_STATUS)
+                == constants.FLINCH
+                and first_move
+            ):
+                self.flinch_accuracy = attacking_move_secondary.get(constants.CHANCE)
+
+            # secondary status effects (thunderbolt paralyzing)
+            elif attacking_move_secondary.get(constants.STATUS) is not None:
+                self.move_status_effect = attacking_move_secondary[constants.STATUS]
+                self.move_status_accuracy = attacking_move_secondary[constants.CHANCE]
+
+            # boosts from moves that boost in secondary (charge beam)
+            elif attacking_move_secondary.get(constants.SELF) is not None:
+                if constants.BOOSTS in attacking_move_secondary[constants.SELF]:
+                    self.boosts = attacking_move_secondary[constants.SELF][
+                        constants.BOOSTS
+                    ]
+                    self.boosts_target_is_attacker = True
+                    self.boosts_chance = attacking_move_secondary[constants.CHANCE]
+
+            # boosts from secondary, but to the defender (crunch)
+            elif attacking_move_secondary.get(constants.BOOSTS) is not None:
+                self.boosts = attacking_move_secondary[constants.BOOSTS]
+                self.boosts_target_is_attacker = False
+                self.boosts_chance = attacking_move_secondary[constants.CHANCE]
+
+        # boosts from secondary, but it is a guaranteed boost (dracometeor)
+        elif attacking_move_self:
+            if constants.BOOSTS in attacking_move_self:
+                self.boosts = attacking_move_self[constants.BOOSTS]
+                self.boosts_target_is_attacker = True
+                self.boosts_chance = 100
+
+        # guaranteed boosts from a damaging move (none in the moves JSON but items/abilities can cause this)
+        elif constants.BOOSTS in move:
+            self.boosts = move[constants.BOOSTS]
+            self.boosts_target_is_attacker = (
+                move[constants.TARGET] in constants.MOVE_TARGET_SELF
+            )
+            self.boosts_chance = 100
+
+    def move_special_effect(self, ctx, all_instructions):
+        temp_instructions = []
+        for instruction_set in all_instructions:
+            temp_instructions += (
+                instruction_generator.get_instructions_from_move_special_effect(
+                    ctx.mutator,
+                    ctx.attacker,
+                    ctx.attacking_pokemon,
+                    ctx.defending_pokemon,
+                    self.move_id,
+                    instruction_set,
+                )
+            )
+        return temp_instructions
+
+    def damage(self, ctx, all_instructions):
+        damage_amounts = ctx.damage_amounts
+        if damage_amounts is None:
+            return all_instructions
+
+        temp_instructions = []
+        amount_of_damage_rolls = len(damage_amounts)
+        for instruction_set in all_instructions:
+            for dmg in damage_amounts:
+                these_instructions = copy(instruction_set)
+                these_instructions.update_percentage(1 / amount_of_damage_rolls)
+                temp_instructions += instruction_generator.get_instructions_from_damage(
+                    ctx.mutator,
+                    ctx.defender,
+                    dmg,
+                    self.move_accuracy,
+                    ctx.attacking_move,
+                    these_instructions,
+                )
+        return temp_instructions
+
+    def defenders_ability_after_move(self, ctx, all_instructions):
+        temp_instructions = []
+        for instruction_set in all_instructions:
+            temp_instructions += instruction_generator.get_instructions_from_defenders_ability_after_move(
+                ctx.mutator,
+                ctx.attacking_move,
+                ctx.defending_pokemon.ability,
+                ctx.attacking_pokemon,
+                ctx.attacker,
+                instruction_set,
+            )
+        return temp_instructions
+
+    def side_conditions(self, ctx, all_instructions):
+        temp_instructions = []
+        for instruction_set in all_instructions:
+            temp_instructions += (
+                instruction_generator.get_instructions_from_side_conditions(
+                    ctx.mutator,
+                    ctx.attacker,
+                    self.move_target,
+                    self.side_condition,
+                    instruction_set,
+                )
+            )
+        return temp_instructions
+
+    def hazard_clearing(self, ctx, all_instructions):
+        temp_instructions = []
+        for instruction_set in all_instructions:
+            temp_instructions += (
+                instruction_generator.get_instructions_from_hazard_clearing_moves(
+                    ctx.mutator, ctx.attacker, ctx.attacking_move, instruction_set
+                )
+            )
+        return temp_instructions
+
+    def volatile_statuses(self, ctx, all_instructions):
+        temp_instructions = []
+        for instruction_set in all_instructions:
+            temp_instructions += (
+                instruction_generator.get_instructions_from_volatile_statuses(
+                    ctx.mutator,
+                    self.volatile_status,
+                    ctx.attacker,
+                    self.move_target,
+                    ctx.first_move,
+                    instruction_set,
+                )
+            )
+        return temp_instructions
+
+    def status_effects(self, ctx, all_instructions):
+        if self.move_status_target_is_attacker:
+            move_status_target = ctx.attacker
+        else:
+            move_status_target = ctx.defender
+
+        temp_instructions = []
+        for instruction_set in all_instructions:
+            temp_instructions += (
+                instruction_generator.get_instructions_from_status_effects(
+                    ctx.mutator,
+                    move_status_target,
+                    self.move_status_effect,
+                    self.move_status_accuracy,
+                    instruction_set,
+                )
+            )
+        return temp_instructions
+
+    def boost(self, ctx, all_instructions):
+        boosts_target = ctx.attacker if self.boosts_target_is_attacker else ctx.defender
+        temp_instructions = []
+        for instruction_set in all_instructions:
+            temp_instructions += instruction_generator.get_instructions_from_boosts(
+                ctx.mutator,
+                boosts_target,
+                self.boosts,
+                self.boosts_chance,
+                instruction_set,
+            )
+        return temp_instructions
+
+    def boost_reset(self, ctx, all_instructions):
+        temp_instructions = []
+        for instruction_set in all_instructions:
+            temp_instructions += (
+                instruction_generator.get_instructions_from_boost_reset_moves(
+                    ctx.mutator, ctx.attacking_move, ctx.attacker, instruction_set
+                )
+            )
+        return temp_instructions
+
+    def attacker_recovery(self, ctx, all_instructions):
+        temp_instructions = []
+        for instruction_set in all_instructions:
+            temp_instructions += (
+                instruction_generator.get_instructions_from_attacker_recovery(
+                    ctx.mutator, ctx.attacker, ctx.attacking_move, instruction_set
+                )
+            )
+        return temp_instructions
+
+    def flinch(self, ctx, all_instructions):
+        temp_instructions = []
+        for instruction_set in all_instructions:
+            temp_instructions += (
+                instruction_generator.get_instructions_from_flinching_moves(
+                    ctx.defender, self.flinch_accuracy, ctx.first_move, instruction_set
+                )
+            )
+        return temp_instructions
+
+    def drag(self, ctx, all_instructions):
+        temp_instructions = []
+        for instruction_set in all_instructions:
+            temp_instructions += instruction_generator.get_instructions_from_drag(
+                ctx.mutator, ctx.attacker, self.move_target, instruction_set
+            )
+        return temp_instructions
+
+    def switch_out(self, ctx, all_instructions):
+        if not switch_out_move_triggered(ctx.attacking_move, ctx.damage_amounts):
+            return all_instructions
+
+        mutator = ctx.mutator
+        temp_instructions = []
+        for i in all_instructions:
+            # the best switch is picked from the state at the start of the turn
+            mutator.rollback(mutator.base_checkpoint)
+            best_switch = get_best_switch_pokemon(
+                mutator,
+                i,
+                ctx.attacker,
+                ctx.attacking_side,
+                ctx.defending_move,
+                ctx.first_move,
+            )
+            if best_switch is not None:
+                temp_instructions.append(
+                    instruction_generator.get_instructions_from_switch(
+                        mutator, ctx.attacker, best_switch, i
+                    )
+                )
+            else:
+                temp_instructions.append(i)
+        return temp_instructions
+
+
+def get_move_stages(move, first_move):
+    if type(move) is CompiledMove:
+        if move.stages is None:
+            move.stages = (MoveStages(move, False), MoveStages(move, True))
+        return move.stages[1 if first_move else 0]
+
+    return MoveStages(move, first_move)
+
+
+def run_move_stages(ctx, conditions, instructions):
+    move_stages = get_move_stages(ctx.attacking_move, ctx.first_move)
+
+    if move_stages.damaging:
+        ctx.damage_amounts = ctx.mutator.damage_cache.calculate_damage(
+            ctx.attacking_pokemon,
+            ctx.defending_pokemon,
+            ctx.attacking_move,
+            conditions=conditions,
+            calc_type=ShowdownConfig.damage_calc_type,
+        )
+
+    all_instructions = (
+        instruction_generator.get_instructions_from_statuses_that_freeze_the_state(
+            ctx.mutator,
+            ctx.attacker,
+            ctx.defender,
+            ctx.attacking_move,
+            ctx.defending_move,
+            instructions,
+        )
+    )
+
+    defenders_ability_after_move = (
+        ctx.defending_pokemon.ability in constants.ABILITY_AFTER_MOVE
+    )
+    for stage in move_stages.stages[defenders_ability_after_move]:
+        all_instructions = stage(ctx, all_instructions)
+
+    return all_instructions
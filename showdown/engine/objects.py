@@ -3,6 +3,8 @@ from copy import copy
 
 import constants
 from data import all_move_json
+from .damage_calculator import DamageCache
+from .evaluate import IncrementalEvaluator
 
 
 boost_multiplier_lookup = {
@@ -22,6 +24,29 @@ boost_multiplier_lookup = {
 }
 
 
+BOOSTABLE_STATS = (
+    constants.ATTACK,
+    constants.DEFENSE,
+    constants.SPECIAL_ATTACK,
+    constants.SPECIAL_DEFENSE,
+    constants.SPEED,
+    constants.ACCURACY,
+    constants.EVASION,
+)
+
+
+ZOBRIST_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def zobrist_component(*key):
+    """A pseudo-random 64-bit value for one feature of a State
+
+    A State's hash is the XOR of the components of everything in it,
+    so two States holding the same things hash the same regardless of how they were reached
+    """
+    return hash(key) & ZOBRIST_MASK
+
+
 class State(object):
     __slots__ = ("user", "opponent", "weather", "field", "trick_room")
 
@@ -125,6 +150,15 @@ class State(object):
 
         return False
 
+    def get_hash(self):
+        return (
+            self.user.get_hash(constants.USER)
+            ^ self.opponent.get_hash(constants.OPPONENT)
+            ^ zobrist_component(constants.WEATHER, self.weather)
+            ^ zobrist_component(constants.FIELD, self.field)
+            ^ zobrist_component(constants.TRICK_ROOM, self.trick_room)
+        )
+
     @classmethod
     def from_dict(cls, state_dict):
         return State(
@@ -148,7 +182,14 @@ class State(object):
 
 
 class Side(object):
-    __slots__ = ("active", "reserve", "wish", "side_conditions", "future_sight")
+    __slots__ = (
+        "active",
+        "reserve",
+        "wish",
+        "side_conditions",
+        "future_sight",
+        "effective_speed",
+    )
 
     def __init__(self, active, reserve, wish, side_conditions, future_sight):
         self.active = active
@@ -157,6 +198,10 @@ class Side(object):
         self.side_conditions = side_conditions
         self.future_sight = future_sight
 
+        # the speed of the active pokemon after everything that modifies it, set by `get_effective_speed`
+        # the StateMutator clears it when an instruction changes anything it depends on
+        self.effective_speed = None
+
     def get_switches(self):
         switches = []
         for pkmn_name, pkmn in self.reserve.items():
@@ -178,6 +223,22 @@ class Side(object):
         else:
             return False
 
+    def get_hash(self, side_string):
+        side_hash = (
+            zobrist_component(side_string, constants.ACTIVE, self.active.id)
+            ^ self.active.get_hash(side_string)
+            ^ zobrist_component(side_string, constants.WISH, self.wish)
+            ^ zobrist_component(side_string, constants.FUTURE_SIGHT, self.future_sight)
+        )
+        for pkmn in self.reserve.values():
+            side_hash ^= pkmn.get_hash(side_string)
+        for condition, count in self.side_conditions.items():
+            if count:
+                side_hash ^= zobrist_component(
+                    side_string, constants.SIDE_CONDITIONS, condition, count
+                )
+        return side_hash
+
     @classmethod
     def from_dict(cls, side_dict):
         return Side(
@@ -231,6 +292,7 @@ class Pokemon(object):
         "moves",
         "terastallized",
         "burn_multiplier",
+        "boosted_stats",
     )
 
     def __init__(
@@ -291,6 +353,9 @@ class Pokemon(object):
         # it is calculated here to save time during evaluation
         self.burn_multiplier = self.calculate_burn_multiplier()
 
+        # set by `get_boosted_stats` and cleared by the StateMutator when a boost or stat changes
+        self.boosted_stats = None
+
     def calculate_burn_multiplier(self):
         # this will result in a positive evaluation for a burned pokemon
         if self.ability in ["guts", "marvelscale", "quickfeet"]:
@@ -315,6 +380,61 @@ class Pokemon(object):
 
         return burn_multiplier
 
+    def get_hash(self, side_string):
+        # attributes that instructions cannot change are hashed together
+        # everything an instruction can change is its own component
+        pkmn_hash = zobrist_component(
+            side_string,
+            self.id,
+            self.level,
+            self.ability,
+            self.nature,
+            tuple(self.evs),
+            self.terastallized,
+            self.burn_multiplier,
+            # a disabled move is only enabled again if it has pp left
+            tuple(
+                (m[constants.ID], bool(m.get(constants.CURRENT_PP))) for m in self.moves
+            ),
+        )
+        pkmn_hash ^= zobrist_component(
+            side_string, self.id, constants.HITPOINTS, self.hp
+        )
+        pkmn_hash ^= zobrist_component(
+            side_string,
+            self.id,
+            constants.STATS,
+            (
+                self.maxhp,
+                self.attack,
+                self.defense,
+                self.special_attack,
+                self.special_defense,
+                self.speed,
+            ),
+        )
+        pkmn_hash ^= zobrist_component(
+            side_string, self.id, constants.TYPES, tuple(self.types)
+        )
+        pkmn_hash ^= zobrist_component(side_string, self.id, constants.ITEM, self.item)
+        pkmn_hash ^= zobrist_component(
+            side_string, self.id, constants.STATUS, self.status
+        )
+        for stat in BOOSTABLE_STATS:
+            pkmn_hash ^= zobrist_component(
+                side_string, self.id, stat, self.get_boost_from_boost_string(stat)
+            )
+        for volatile_status in self.volatile_status:
+            pkmn_hash ^= zobrist_component(
+                side_string, self.id, constants.VOLATILE_STATUS, volatile_status
+            )
+        for move in self.moves:
+            if move[constants.DISABLED]:
+                pkmn_hash ^= zobrist_component(
+                    side_string, self.id, constants.DISABLED, move[constants.ID]
+                )
+        return pkmn_hash
+
     def get_highest_stat(self):
         return max(
             {
@@ -444,7 +564,15 @@ class Pokemon(object):
             d[constants.MOVES],
         )
 
+    def get_boosted_stats(self):
+        # the dictionary is shared, callers that modify it should use `calculate_boosted_stats`
+        if self.boosted_stats is None:
+            self.boosted_stats = self.calculate_boosted_stats()
+        return self.boosted_stats
+
     def calculate_boosted_stats(self):
+        if self.boosted_stats is not None:
+            return self.boosted_stats.copy()
         return {
             constants.ATTACK: boost_multiplier_lookup[self.attack_boost] * self.attack,
             constants.DEFENSE: boost_multiplier_lookup[self.defense_boost]
@@ -500,26 +628,38 @@ class Pokemon(object):
 
 
 class TransposeInstruction:
-    __slots__ = ("percentage", "instructions", "frozen")
+    # the instructions are a tuple so copies can share them: adding an instruction makes a new tuple
+    # most branches are copied from one another and only some of them are changed afterwards,
+    # so nothing is copied for a branch that is never changed
+    __slots__ = ("percentage", "_instructions", "frozen")
 
     def __init__(self, percentage, instructions, frozen=False):
         self.percentage = percentage
-        self.instructions = instructions
+        self._instructions = tuple(instructions)
         self.frozen = frozen
 
+    @property
+    def instructions(self):
+        return self._instructions
+
+    @instructions.setter
+    def instructions(self, instructions):
+        self._instructions = tuple(instructions)
+
     def update_percentage(self, modifier):
         self.percentage *= modifier
 
     def add_instruction(self, instruction):
-        self.instructions.append(instruction)
+        self._instructions += (instruction,)
+
+    def add_instructions(self, instructions):
+        self._instructions += tuple(instructions)
 
     def has_same_instructions_as(self, other):
-        return self.instructions == other.instructions
+        return self._instructions == other._instructions
 
     def __copy__(self):
-        return TransposeInstruction(
-            self.percentage, copy(self.instructions), self.frozen
-        )
+        return TransposeInstruction(self.percentage, self._instructions, self.frozen)
 
     def __repr__(self):
         return "{}: {}".format(self.percentage, str(self.instructions))
@@ -532,9 +672,56 @@ class TransposeInstruction:
         )
 
 
+def to_opcode_instructions(instructions):
+    # instructions written with plain strings, from a file or a test for example, must be converted before they
+    # are given to a StateMutator
+    return [
+        (constants.get_opcode(instruction[0]),) + tuple(instruction[1:])
+        for instruction in instructions
+    ]
+
+
+def check_opcodes(instructions):
+    # a plain string has no `opcode_index`, so it fails in the mutator with an AttributeError that does not say why
+    for instruction in instructions:
+        if not isinstance(instruction[0], constants.Opcode):
+            raise ValueError(
+                "{} is not an Opcode, plain instructions must be converted with `to_opcode_instructions`".format(
+                    instruction
+                )
+            )
+
+
+def to_plain_instructions(instructions):
+    return [
+        (str(instruction[0]),) + tuple(instruction[1:]) for instruction in instructions
+    ]
+
+
 class StateMutator:
-    def __init__(self, state):
+
+    def __init__(
+        self,
+        state,
+        verify_hash=False,
+        verify_evaluation=False,
+        pokemon_score_cache=None,
+        damage_cache=None,
+    ):
         self.state = state
+
+        # `state_hash` is kept equal to `state.get_hash()` as instructions are applied and reversed
+        # the state must only be modified through this mutator for that to hold
+        # instructions XOR their changes into `hash_delta` once the full hash has been calculated
+        # until then the delta is not needed, so no work is done keeping it up to date
+        self.hash_delta = 0
+        self.base_hash = None
+
+        # debug mode: check the incremental hash against a full recompute after every apply/reverse
+        self.verify_hash = verify_hash
+        if verify_hash:
+            self.recalculate_hash()
+
         self.apply_instructions = {
             constants.MUTATOR_SWITCH: self.switch,
             constants.MUTATOR_APPLY_VOLATILE_STATUS: self.apply_volatile_status,
@@ -588,25 +775,140 @@ class StateMutator:
             constants.MUTATOR_CHANGE_STATS: self.reverse_change_stats,
         }
 
+        # the same methods in lists indexed by `Opcode.opcode_index`, which are faster to look up than the dicts
+        self.apply_table = [self.apply_instructions.get(op) for op in constants.OPCODES]
+        self.reverse_table = [
+            self.reverse_instructions.get(op) for op in constants.OPCODES
+        ]
+
+        # the sides of the state are never replaced, only modified
+        self.sides = {constants.USER: state.user, constants.OPPONENT: state.opponent}
+
+        # every instruction that is applied, in order, so they can be undone with `rollback`
+        # instructions must be reversed in the opposite order they were applied for this to hold
+        self.undo_log = []
+
+        # the checkpoint that instruction lists given to `move_to` start from
+        self.base_checkpoint = 0
+
+        # scores the state using only what changed in the undo log since it was last scored
+        # `verify_evaluation` checks it against a full evaluation every time the state is scored
+        # a PokemonScoreCache can be given so the mutators of one decision share it
+        self.evaluator = IncrementalEvaluator(
+            self, verify=verify_evaluation, pokemon_score_cache=pokemon_score_cache
+        )
+
+        # the damage of the moves used in the instruction generator, shared the same way
+        if damage_cache is None:
+            damage_cache = DamageCache()
+        self.damage_cache = damage_cache
+
     def apply_one(self, instruction):
-        method = self.apply_instructions[instruction[0]]
-        method(*instruction[1:])
+        try:
+            self.apply_table[instruction[0].opcode_index](*instruction[1:])
+        except AttributeError:
+            check_opcodes([instruction])
+            raise
+        self.undo_log.append(instruction)
+        if self.verify_hash:
+            self.check_hash([instruction])
 
     def apply(self, instructions):
-        for instruction in instructions:
-            method = self.apply_instructions[instruction[0]]
-            method(*instruction[1:])
+        apply_table = self.apply_table
+        try:
+            for instruction in instructions:
+                apply_table[instruction[0].opcode_index](*instruction[1:])
+        except AttributeError:
+            check_opcodes(instructions)
+            raise
+        self.undo_log.extend(instructions)
+        if self.verify_hash:
+            self.check_hash(instructions)
 
     def reverse(self, instructions):
-        for instruction in reversed(instructions):
-            method = self.reverse_instructions[instruction[0]]
-            method(*instruction[1:])
+        reverse_table = self.reverse_table
+        try:
+            for instruction in reversed(instructions):
+                reverse_table[instruction[0].opcode_index](*instruction[1:])
+        except AttributeError:
+            check_opcodes(instructions)
+            raise
+        del self.undo_log[max(0, len(self.undo_log) - len(instructions)) :]
+        if self.verify_hash:
+            self.check_hash(instructions)
+
+    def checkpoint(self):
+        return len(self.undo_log)
+
+    def evaluate(self):
+        # the same score as `evaluate(self.state)`
+        return self.evaluator.evaluate()
+
+    def rollback(self, checkpoint):
+        # reverses everything applied since the checkpoint was made
+        if checkpoint < len(self.undo_log):
+            self.reverse(self.undo_log[checkpoint:])
+
+    def move_to(self, instructions):
+        # makes `instructions` the instructions applied since `base_checkpoint`
+        # only the instructions after the start they have in common with the ones already applied are reversed
+        # and applied, so moving between branches that share most of their instructions is cheap
+        applied = self.undo_log[self.base_checkpoint :]
+        common = 0
+        for applied_instruction, instruction in zip(applied, instructions):
+            if applied_instruction is not instruction:
+                break
+            common += 1
+
+        self.rollback(self.base_checkpoint + common)
+        if common < len(instructions):
+            self.apply(instructions[common:])
+
+    @property
+    def state_hash(self):
+        if self.base_hash is None:
+            self.recalculate_hash()
+        return (self.base_hash ^ self.hash_delta) & ZOBRIST_MASK
+
+    def recalculate_hash(self):
+        # required if the state was modified without using this mutator
+        self.base_hash = self.state.get_hash() ^ self.hash_delta
+
+    def check_hash(self, instructions):
+        full_hash = self.state.get_hash()
+        if self.state_hash != full_hash:
+            raise ValueError(
+                "Incremental state hash {} does not match recomputed hash {} after {}".format(
+                    self.state_hash, full_hash, instructions
+                )
+            )
+
+    # the keys passed to these are the same ones given to `zobrist_component` in the `get_hash` methods
+    # masking is done once when `state_hash` is read instead of for every component
+    def toggle_hash(self, key):
+        if self.base_hash is not None:
+            self.hash_delta ^= hash(key)
+
+    def update_hash(self, old_key, new_key):
+        if self.base_hash is not None:
+            self.hash_delta ^= hash(old_key) ^ hash(new_key)
+
+    def update_pokemon_hash(self, side_string, pkmn, feature, old_value, new_value):
+        if self.base_hash is not None:
+            self.hash_delta ^= hash((side_string, pkmn.id, feature, old_value)) ^ hash(
+                (side_string, pkmn.id, feature, new_value)
+            )
+
+    def clear_effective_speeds(self):
+        # weather and terrain can change the speed of both active pokemon
+        self.state.user.effective_speed = None
+        self.state.opponent.effective_speed = None
 
     def get_side(self, side):
-        return getattr(self.state, side)
+        return self.sides[side]
 
-    def disable_move(self, side, move_name):
-        side = self.get_side(side)
+    def disable_move(self, side_string, move_name):
+        side = self.sides[side_string]
         try:
             move = next(
                 filter(lambda x: x[constants.ID] == move_name, side.active.moves)
@@ -616,10 +918,14 @@ class StateMutator:
                 "{} not in pokemon's moves: {}".format(move_name, side.active.moves)
             )
 
+        if not move[constants.DISABLED]:
+            self.toggle_hash(
+                (side_string, side.active.id, constants.DISABLED, move_name)
+            )
         move[constants.DISABLED] = True
 
-    def enable_move(self, side, move_name):
-        side = self.get_side(side)
+    def enable_move(self, side_string, move_name):
+        side = self.sides[side_string]
         try:
             move = next(
                 filter(lambda x: x[constants.ID] == move_name, side.active.moves)
@@ -629,181 +935,305 @@ class StateMutator:
                 "{} not in pokemon's moves: {}".format(move_name, side.active.moves)
             )
 
+        if move[constants.DISABLED]:
+            self.toggle_hash(
+                (side_string, side.active.id, constants.DISABLED, move_name)
+            )
         move[constants.DISABLED] = False
 
-    def switch(self, side, _, switch_pokemon_name):
+    def switch(self, side_string, _, switch_pokemon_name):
         # the second parameter to this function is the current active pokemon
         # this value must be here for reversing purposes
-        side = self.get_side(side)
+        side = self.sides[side_string]
 
+        self.update_hash(
+            (side_string, constants.ACTIVE, side.active.id),
+            (side_string, constants.ACTIVE, switch_pokemon_name),
+        )
         side.reserve[side.active.id] = side.active
         side.active = side.reserve.pop(switch_pokemon_name)
+        side.effective_speed = None
 
     def reverse_switch(self, side, previous_active, current_active):
         self.switch(side, current_active, previous_active)
 
-    def apply_volatile_status(self, side, volatile_status):
-        side = self.get_side(side)
+    def apply_volatile_status(self, side_string, volatile_status):
+        side = self.sides[side_string]
+        if volatile_status not in side.active.volatile_status:
+            self.toggle_hash(
+                (
+                    side_string,
+                    side.active.id,
+                    constants.VOLATILE_STATUS,
+                    volatile_status,
+                )
+            )
         side.active.volatile_status.add(volatile_status)
+        if volatile_status in constants.SPEED_VOLATILE_STATUSES:
+            side.effective_speed = None
 
-    def remove_volatile_status(self, side, volatile_status):
-        side = self.get_side(side)
+    def remove_volatile_status(self, side_string, volatile_status):
+        side = self.sides[side_string]
         side.active.volatile_status.remove(volatile_status)
+        self.toggle_hash(
+            (side_string, side.active.id, constants.VOLATILE_STATUS, volatile_status)
+        )
+        if volatile_status in constants.SPEED_VOLATILE_STATUSES:
+            side.effective_speed = None
 
-    def damage(self, side, amount):
-        side = self.get_side(side)
+    def damage(self, side_string, amount):
+        side = self.sides[side_string]
+        old_hp = side.active.hp
         side.active.hp -= amount
+        self.update_pokemon_hash(
+            side_string, side.active, constants.HITPOINTS, old_hp, side.active.hp
+        )
 
-    def heal(self, side, amount):
-        side = self.get_side(side)
+    def heal(self, side_string, amount):
+        side = self.sides[side_string]
+        old_hp = side.active.hp
         side.active.hp += amount
+        self.update_pokemon_hash(
+            side_string, side.active, constants.HITPOINTS, old_hp, side.active.hp
+        )
 
-    def boost(self, side, stat, amount):
-        side = self.get_side(side)
+    def boost(self, side_string, stat, amount):
+        side = self.sides[side_string]
         if stat == constants.ATTACK:
             side.active.attack_boost += amount
+            side.active.boosted_stats = None
         elif stat == constants.DEFENSE:
             side.active.defense_boost += amount
+            side.active.boosted_stats = None
         elif stat == constants.SPECIAL_ATTACK:
             side.active.special_attack_boost += amount
+            side.active.boosted_stats = None
         elif stat == constants.SPECIAL_DEFENSE:
             side.active.special_defense_boost += amount
+            side.active.boosted_stats = None
         elif stat == constants.SPEED:
             side.active.speed_boost += amount
+            side.active.boosted_stats = None
+            side.effective_speed = None
         elif stat == constants.ACCURACY:
             side.active.accuracy_boost += amount
         elif stat == constants.EVASION:
             side.active.evasion_boost += amount
         else:
             raise ValueError("Invalid stat: {}".format(stat))
+        new_boost = side.active.get_boost_from_boost_string(stat)
+        self.update_pokemon_hash(
+            side_string, side.active, stat, new_boost - amount, new_boost
+        )
 
     def unboost(self, side, stat, amount):
         self.boost(side, stat, -1 * amount)
 
-    def apply_status(self, side, status):
-        side = self.get_side(side)
+    def apply_status(self, side_string, status):
+        side = self.sides[side_string]
+        self.update_pokemon_hash(
+            side_string, side.active, constants.STATUS, side.active.status, status
+        )
         side.active.status = status
+        side.effective_speed = None
 
     def remove_status(self, side, _):
         # the second parameter of this function is the status being removed
         # this value must be here for reverse purposes
         self.apply_status(side, None)
 
-    def side_start(self, side, effect, amount):
-        side = self.get_side(side)
+    def side_start(self, side_string, effect, amount):
+        side = self.sides[side_string]
+        old_count = side.side_conditions[effect]
         side.side_conditions[effect] += amount
+        if effect == constants.TAILWIND:
+            side.effective_speed = None
+
+        # side conditions with a count of 0 are not part of the hash
+        new_count = side.side_conditions[effect]
+        if old_count:
+            self.toggle_hash(
+                (side_string, constants.SIDE_CONDITIONS, effect, old_count)
+            )
+        if new_count:
+            self.toggle_hash(
+                (side_string, constants.SIDE_CONDITIONS, effect, new_count)
+            )
 
     def reverse_side_start(self, side, effect, amount):
-        side = self.get_side(side)
-        side.side_conditions[effect] -= amount
+        self.side_start(side, effect, -1 * amount)
 
     def side_end(self, side, effect, amount):
-        side = self.get_side(side)
-        side.side_conditions[effect] -= amount
+        self.side_start(side, effect, -1 * amount)
 
     def reverse_side_end(self, side, effect, amount):
         self.side_start(side, effect, amount)
 
+    def set_future_sight(self, side_string, future_sight):
+        side = self.sides[side_string]
+        self.update_hash(
+            (side_string, constants.FUTURE_SIGHT, side.future_sight),
+            (side_string, constants.FUTURE_SIGHT, future_sight),
+        )
+        side.future_sight = future_sight
+
     def start_futuresight(self, side, pkmn_name, _):
         # the second parameter is the current futuresight_amount
         # it is here for reversing purposes
-        side = self.get_side(side)
-        side.future_sight = (3, pkmn_name)
+        self.set_future_sight(side, (3, pkmn_name))
 
     def reverse_start_futuresight(self, side, _, old_pkmn_name):
-        side = self.get_side(side)
-        side.future_sight = (0, old_pkmn_name)
+        self.set_future_sight(side, (0, old_pkmn_name))
+
+    def decrement_futuresight(self, side_string):
+        side = self.sides[side_string]
+        self.set_future_sight(
+            side_string, (side.future_sight[0] - 1, side.future_sight[1])
+        )
 
-    def decrement_futuresight(self, side):
-        side = self.get_side(side)
-        side.future_sight = (side.future_sight[0] - 1, side.future_sight[1])
+    def reverse_decrement_futuresight(self, side_string):
+        side = self.sides[side_string]
+        self.set_future_sight(
+            side_string, (side.future_sight[0] + 1, side.future_sight[1])
+        )
 
-    def reverse_decrement_futuresight(self, side):
-        side = self.get_side(side)
-        side.future_sight = (side.future_sight[0] + 1, side.future_sight[1])
+    def set_wish(self, side_string, wish):
+        side = self.sides[side_string]
+        self.update_hash(
+            (side_string, constants.WISH, side.wish),
+            (side_string, constants.WISH, wish),
+        )
+        side.wish = wish
 
     def start_wish(self, side, health, _):
         # the third parameter is the current wish amount
         # it is here for reversing purposes
-        side = self.get_side(side)
-        side.wish = (2, health)
+        self.set_wish(side, (2, health))
 
     def reserve_start_wish(self, side, _, previous_wish_amount):
-        side = self.get_side(side)
-        side.wish = (0, previous_wish_amount)
+        self.set_wish(side, (0, previous_wish_amount))
 
-    def decrement_wish(self, side):
-        side = self.get_side(side)
-        side.wish = (side.wish[0] - 1, side.wish[1])
+    def decrement_wish(self, side_string):
+        side = self.sides[side_string]
+        self.set_wish(side_string, (side.wish[0] - 1, side.wish[1]))
 
-    def reverse_decrement_wish(self, side):
-        side = self.get_side(side)
-        side.wish = (side.wish[0] + 1, side.wish[1])
+    def reverse_decrement_wish(self, side_string):
+        side = self.sides[side_string]
+        self.set_wish(side_string, (side.wish[0] + 1, side.wish[1]))
+
+    def set_weather(self, weather):
+        self.update_hash(
+            (constants.WEATHER, self.state.weather),
+            (constants.WEATHER, weather),
+        )
+        self.state.weather = weather
+        self.clear_effective_speeds()
 
     def start_weather(self, weather, _):
         # the second parameter is the current weather
         # the value is here for reversing purposes
-        self.state.weather = weather
+        self.set_weather(weather)
 
     def reverse_start_weather(self, _, old_weather):
-        self.state.weather = old_weather
+        self.set_weather(old_weather)
+
+    def set_field(self, field):
+        self.update_hash(
+            (constants.FIELD, self.state.field),
+            (constants.FIELD, field),
+        )
+        self.state.field = field
+        self.clear_effective_speeds()
 
     def start_field(self, field, _):
         # the second parameter is the current field
         # the value is here for reversing purposes
-        self.state.field = field
+        self.set_field(field)
 
     def reverse_start_field(self, _, old_field):
-        self.state.field = old_field
+        self.set_field(old_field)
 
     def end_field(self, _):
         # the second parameter is the current field
         # the value is here for reversing purposes
-        self.state.field = None
+        self.set_field(None)
 
     def reverse_end_field(self, old_field):
-        self.state.field = old_field
+        self.set_field(old_field)
 
     def toggle_trickroom(self):
+        old_trick_room = self.state.trick_room
         self.state.trick_room ^= True
+        self.update_hash(
+            (constants.TRICK_ROOM, old_trick_room),
+            (constants.TRICK_ROOM, self.state.trick_room),
+        )
+
+    def set_types(self, side_string, types):
+        side = self.sides[side_string]
+        self.update_pokemon_hash(
+            side_string,
+            side.active,
+            constants.TYPES,
+            tuple(side.active.types),
+            tuple(types),
+        )
+        side.active.types = types
 
     def change_types(self, side, new_types, _):
         # the third parameter is the current types of the active pokemon
         # they must be here for reversing purposes
-        side = self.get_side(side)
-        side.active.types = new_types
+        self.set_types(side, new_types)
 
     def reverse_change_types(self, side, _, old_types):
-        side = self.get_side(side)
-        side.active.types = old_types
+        self.set_types(side, old_types)
+
+    def set_item(self, side_string, item):
+        side = self.sides[side_string]
+        self.update_pokemon_hash(
+            side_string, side.active, constants.ITEM, side.active.item, item
+        )
+        side.active.item = item
+        side.effective_speed = None
 
     def change_item(self, side, new_item, _):
         # the third parameter is the current item
         # it must be here for reversing purposes
-        side = self.get_side(side)
-        side.active.item = new_item
+        self.set_item(side, new_item)
 
     def reverse_change_item(self, side, _, old_item):
-        side = self.get_side(side)
-        side.active.item = old_item
+        self.set_item(side, old_item)
+
+    def set_stats(self, side_string, stats):
+        side = self.sides[side_string]
+        self.update_pokemon_hash(
+            side_string,
+            side.active,
+            constants.STATS,
+            (
+                side.active.maxhp,
+                side.active.attack,
+                side.active.defense,
+                side.active.special_attack,
+                side.active.special_defense,
+                side.active.speed,
+            ),
+            tuple(stats),
+        )
+        side.active.maxhp = stats[0]
+        side.active.attack = stats[1]
+        side.active.defense = stats[2]
+        side.active.special_attack = stats[3]
+        side.active.special_defense = stats[4]
+        side.active.speed = stats[5]
+        side.active.boosted_stats = None
+        side.effective_speed = None
 
     def change_stats(self, side, new_stats, _):
         # the third parameter is the old stats
         # is must be here for reversing purposes
-        side = self.get_side(side)
-        side.active.maxhp = new_stats[0]
-        side.active.attack = new_stats[1]
-        side.active.defense = new_stats[2]
-        side.active.special_attack = new_stats[3]
-        side.active.special_defense = new_stats[4]
-        side.active.speed = new_stats[5]
+        self.set_stats(side, new_stats)
 
     def reverse_change_stats(self, side, _, old_stats):
         # the second parameter are the new stats
-        side = self.get_side(side)
-        side.active.maxhp = old_stats[0]
-        side.active.attack = old_stats[1]
-        side.active.defense = old_stats[2]
-        side.active.special_attack = old_stats[3]
-        side.active.special_defense = old_stats[4]
-        side.active.speed = old_stats[5]
+        self.set_stats(side, old_stats)
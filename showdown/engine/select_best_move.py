@@ -1,15 +1,20 @@
 import math
+import time
 from collections import defaultdict
 
 import constants
 
-from .evaluate import evaluate
+from .batch_evaluate import evaluate_leaves
 from .find_state_instructions import get_all_state_instructions
 
 
 WON_BATTLE = 100
 
 
+class SearchTimeout(Exception):
+    pass
+
+
 def remove_guaranteed_opponent_moves(score_lookup):
     """This method removes enemy moves from the score-lookup that do not give the bot a choice.
     For example - if the bot has 1 pokemon left, the opponent is faster, and can kill your active pokemon with move X
@@ -68,22 +73,78 @@ def move_item_to_front_of_list(l, item):
     return [l[i] for i in all_indicies]
 
 
-def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=True):
+def order_options_from_scores(user_options, opponent_options, score_lookup):
+    """Orders the options using the scores from a shallower search of the same position
+
+    User options are ordered best worst-case first and opponent options are ordered by the lowest score they
+    gave the bot. Searching the likely best moves first lets `get_payoff_matrix` prune more of the tree
+    """
+    worst_user_scores = dict()
+    worst_opponent_scores = dict()
+    for (user_move, opponent_move), score in score_lookup.items():
+        if math.isnan(score):
+            continue
+        worst_user_scores[user_move] = min(
+            score, worst_user_scores.get(user_move, score)
+        )
+        worst_opponent_scores[opponent_move] = min(
+            score, worst_opponent_scores.get(opponent_move, score)
+        )
+
+    return (
+        sorted(
+            user_options,
+            key=lambda x: worst_user_scores.get(x, float("-inf")),
+            reverse=True,
+        ),
+        sorted(
+            opponent_options, key=lambda x: worst_opponent_scores.get(x, float("inf"))
+        ),
+    )
+
+
+def get_payoff_matrix(
+    mutator,
+    user_options,
+    opponent_options,
+    depth=2,
+    prune=True,
+    transposition_table=None,
+    deadline=None,
+    instruction_cache=None,
+    batch_evaluation=False,
+):
     """
     :param mutator: a StateMutator object representing the state of the battle
     :param user_options: options for the bot
     :param opponent_options: options for the opponent
     :param depth: the remaining depth before the state is evaluated
     :param prune: specify whether or not to prune the tree
+    :param transposition_table: an optional TranspositionTable used to skip searching positions already seen
+    :param deadline: an optional time.time() value after which a SearchTimeout is raised
+    :param instruction_cache: an optional InstructionCache used to skip generating instructions already generated
+    :param batch_evaluation: score all of the states at the last depth of a move pair together with `evaluate_leaves`
     :return: a dictionary representing the potential move combinations and their associated scores
     """
 
+    if deadline is not None and time.time() > deadline:
+        raise SearchTimeout()
+
+    if transposition_table is not None:
+        position_key = (
+            mutator.state_hash,
+            tuple(user_options),
+            tuple(opponent_options),
+            prune,
+        )
+        cached_scores = transposition_table.get(position_key, depth)
+        if cached_scores is not None:
+            return cached_scores
+
     winner = mutator.state.battle_is_finished()
     if winner:
         return {
-            (constants.DO_NOTHING_MOVE, constants.DO_NOTHING_MOVE): evaluate(
-                mutator.state
-            )
+            (constants.DO_NOTHING_MOVE, constants.DO_NOTHING_MOVE): mutator.evaluate()
             + WON_BATTLE * depth * winner
         }
 
@@ -97,7 +158,7 @@ def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=Tr
         and mutator.state.opponent.active.hp == 0
     ):
         return {
-            (user_option, constants.DO_NOTHING_MOVE): evaluate(mutator.state)
+            (user_option, constants.DO_NOTHING_MOVE): mutator.evaluate()
             for user_option in user_options
         }
 
@@ -117,12 +178,18 @@ def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=Tr
 
             score = 0
             state_instructions = get_all_state_instructions(
-                mutator, user_move, opponent_move
+                mutator, user_move, opponent_move, instruction_cache
             )
-            if depth == 0:
+            if depth == 0 and batch_evaluation:
+                for instructions, t_score in zip(
+                    state_instructions, evaluate_leaves(mutator, state_instructions)
+                ):
+                    score += t_score * instructions.percentage
+
+            elif depth == 0:
                 for instructions in state_instructions:
                     mutator.apply(instructions.instructions)
-                    t_score = evaluate(mutator.state)
+                    t_score = mutator.evaluate()
                     score += t_score * instructions.percentage
                     mutator.reverse(instructions.instructions)
 
@@ -130,21 +197,29 @@ def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=Tr
                 for instructions in state_instructions:
                     this_percentage = instructions.percentage
                     mutator.apply(instructions.instructions)
-                    (
-                        next_turn_user_options,
-                        next_turn_opponent_options,
-                    ) = mutator.state.get_all_options()
-                    safest = pick_safest(
-                        get_payoff_matrix(
-                            mutator,
+
+                    # the state must be restored if the search runs out of time
+                    try:
+                        (
                             next_turn_user_options,
                             next_turn_opponent_options,
-                            depth=depth,
-                            prune=prune,
+                        ) = mutator.state.get_all_options()
+                        safest = pick_safest(
+                            get_payoff_matrix(
+                                mutator,
+                                next_turn_user_options,
+                                next_turn_opponent_options,
+                                depth=depth,
+                                prune=prune,
+                                transposition_table=transposition_table,
+                                deadline=deadline,
+                                instruction_cache=instruction_cache,
+                                batch_evaluation=batch_evaluation,
+                            )
                         )
-                    )
+                    finally:
+                        mutator.reverse(instructions.instructions)
                     score += safest[1] * this_percentage
-                    mutator.reverse(instructions.instructions)
 
             state_scores[(user_move, opponent_move)] = score
 
@@ -163,4 +238,8 @@ def get_payoff_matrix(mutator, user_options, opponent_options, depth=2, prune=Tr
         if worst_score_for_this_row > best_score:
             best_score = worst_score_for_this_row
 
+    if transposition_table is not None:
+        # `depth` was decremented for the children of this position
+        transposition_table.put(position_key, depth + 1, state_scores)
+
     return state_scores
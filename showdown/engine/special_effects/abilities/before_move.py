@@ -71,6 +71,13 @@ def protean(
 libero = protean
 
 
+ability_lookup = {
+    "stancechange": stancechange,
+    "protean": protean,
+    "libero": libero,
+}
+
+
 def ability_before_move(
     ability_name,
     state,
@@ -79,9 +86,10 @@ def ability_before_move(
     attacking_pokemon,
     defending_pokemon,
 ):
-    try:
-        return globals()[ability_name](
+    ability_func = ability_lookup.get(ability_name)
+    if ability_func is not None:
+        return ability_func(
             state, attacking_side, attacking_move, attacking_pokemon, defending_pokemon
         )
-    except KeyError:
+    else:
         return None
@@ -96,6 +96,17 @@ def icebody(
         )
 
 
+ability_lookup = {
+    "poisonheal": poisonheal,
+    "speedboost": speedboost,
+    "hydration": hydration,
+    "solarpower": solarpower,
+    "raindish": raindish,
+    "dryskin": dryskin,
+    "icebody": icebody,
+}
+
+
 def ability_end_of_turn(
     ability_name,
     state,
@@ -110,9 +121,8 @@ def ability_end_of_turn(
         or not attacking_pokemon.hp
     ):
         return None
-    try:
-        return globals()[ability_name](
+    ability_func = ability_lookup.get(ability_name)
+    if ability_func is not None:
+        return ability_func(
             state, attacking_side, attacking_pokemon, defending_side, defending_pokemon
         )
-    except KeyError:
-        pass
@@ -0,0 +1,67 @@
+from .abilities.before_move import ability_lookup as ability_before_move_lookup
+from .abilities.end_of_turn import ability_lookup as ability_end_of_turn_lookup
+from .abilities.modify_attack_against import (
+    ability_lookup as ability_modify_attack_against_lookup,
+)
+from .abilities.modify_attack_being_used import (
+    ability_lookup as ability_modify_attack_being_used_lookup,
+)
+from .abilities.on_switch_in import ability_lookup as ability_on_switch_in_lookup
+from .items.end_of_turn import item_lookup as item_end_of_turn_lookup
+from .items.modify_attack_against import (
+    item_lookup as item_modify_attack_against_lookup,
+)
+from .items.modify_attack_being_used import (
+    item_lookup as item_modify_attack_being_used_lookup,
+)
+from .items.on_switch_in import item_lookup as item_on_switch_in_lookup
+from .moves.after_move import move_lookup as after_move_lookup
+from .moves.modify_move import move_lookup as modify_move_lookup
+
+# Which stages each ability, item, and move has a special-effect in
+# Every stage is one bit so the instruction generators can skip the stages where nothing happens
+# without calling into the special-effects at all
+
+
+NO_HOOKS = 0
+MODIFY_ATTACK_BEING_USED = 1 << 0
+MODIFY_ATTACK_AGAINST = 1 << 1
+BEFORE_MOVE = 1 << 2
+AFTER_MOVE = 1 << 3
+END_OF_TURN = 1 << 4
+ON_SWITCH_IN = 1 << 5
+
+
+def build_hooks(stage_lookups):
+    hooks = dict()
+    for stage, lookup in stage_lookups:
+        for name in lookup:
+            hooks[name] = hooks.get(name, NO_HOOKS) | stage
+    return hooks
+
+
+ability_hooks = build_hooks(
+    [
+        (MODIFY_ATTACK_BEING_USED, ability_modify_attack_being_used_lookup),
+        (MODIFY_ATTACK_AGAINST, ability_modify_attack_against_lookup),
+        (BEFORE_MOVE, ability_before_move_lookup),
+        (END_OF_TURN, ability_end_of_turn_lookup),
+        (ON_SWITCH_IN, ability_on_switch_in_lookup),
+    ]
+)
+
+item_hooks = build_hooks(
+    [
+        (MODIFY_ATTACK_BEING_USED, item_modify_attack_being_used_lookup),
+        (MODIFY_ATTACK_AGAINST, item_modify_attack_against_lookup),
+        (END_OF_TURN, item_end_of_turn_lookup),
+        (ON_SWITCH_IN, item_on_switch_in_lookup),
+    ]
+)
+
+move_hooks = build_hooks(
+    [
+        (MODIFY_ATTACK_BEING_USED, modify_move_lookup),
+        (AFTER_MOVE, after_move_lookup),
+    ]
+)
@@ -45,6 +45,14 @@ def toxicorb(
         return (constants.MUTATOR_APPLY_STATUS, attacking_side, constants.TOXIC)
 
 
+item_lookup = {
+    "leftovers": leftovers,
+    "blacksludge": blacksludge,
+    "flameorb": flameorb,
+    "toxicorb": toxicorb,
+}
+
+
 def item_end_of_turn(
     item_name,
     state,
@@ -53,14 +61,8 @@ def item_end_of_turn(
     defending_side,
     defending_pokemon,
 ):
-    if attacking_pokemon.hp:
-        try:
-            return globals()[item_name](
-                state,
-                attacking_side,
-                attacking_pokemon,
-                defending_side,
-                defending_pokemon,
-            )
-        except KeyError:
-            pass
+    item_func = item_lookup.get(item_name)
+    if attacking_pokemon.hp and item_func is not None:
+        return item_func(
+            state, attacking_side, attacking_pokemon, defending_side, defending_pokemon
+        )
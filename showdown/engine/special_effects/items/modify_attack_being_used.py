@@ -231,12 +231,44 @@ def lightball(attacking_move, attacking_pokemon, defending_pokemon):
     return attacking_move
 
 
+item_lookup = {
+    "choiceband": choiceband,
+    "choicespecs": choicespecs,
+    "lifeorb": lifeorb,
+    "expertbelt": expertbelt,
+    "blackglasses": blackglasses,
+    "magnet": magnet,
+    "spelltag": spelltag,
+    "thickclub": thickclub,
+    "whiteherb": whiteherb,
+    "wiseglasses": wiseglasses,
+    "blackbelt": blackbelt,
+    "charcoal": charcoal,
+    "dragonfang": dragonfang,
+    "hardstone": hardstone,
+    "metalcoat": metalcoat,
+    "miracleseed": miracleseed,
+    "mysticwater": mysticwater,
+    "nevermeltice": nevermeltice,
+    "poisonbarb": poisonbarb,
+    "sharpbeak": sharpbeak,
+    "silkscarf": silkscarf,
+    "silverpowder": silverpowder,
+    "softsand": softsand,
+    "twistedspoon": twistedspoon,
+    "souldew": souldew,
+    "adamantorb": adamantorb,
+    "lustrousorb": lustrousorb,
+    "griseousorb": griseousorb,
+    "lightball": lightball,
+}
+
+
 def item_modify_attack_being_used(
     item_name, attacking_move, attacking_pokemon, defending_pokemon
 ):
-    try:
-        return globals()[item_name](
-            attacking_move, attacking_pokemon, defending_pokemon
-        )
-    except KeyError:
+    item_func = item_lookup.get(item_name)
+    if item_func is not None:
+        return item_func(attacking_move, attacking_pokemon, defending_pokemon)
+    else:
         return attacking_move
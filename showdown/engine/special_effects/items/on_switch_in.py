@@ -91,6 +91,15 @@ def boosterenergy(
         ]
 
 
+item_lookup = {
+    "grassyseed": grassyseed,
+    "mistyseed": mistyseed,
+    "psychicseed": psychicseed,
+    "electricseed": electricseed,
+    "boosterenergy": boosterenergy,
+}
+
+
 def item_on_switch_in(
     item_name,
     state,
@@ -99,14 +108,8 @@ def item_on_switch_in(
     defending_side,
     defending_pokemon,
 ):
-    if attacking_pokemon.hp:
-        try:
-            return globals()[item_name](
-                state,
-                attacking_side,
-                attacking_pokemon,
-                defending_side,
-                defending_pokemon,
-            )
-        except KeyError:
-            pass
+    item_func = item_lookup.get(item_name)
+    if attacking_pokemon.hp and item_func is not None:
+        return item_func(
+            state, attacking_side, attacking_pokemon, defending_side, defending_pokemon
+        )
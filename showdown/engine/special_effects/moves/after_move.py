@@ -62,6 +62,18 @@ def doubleshock(
         ]
 
 
+move_lookup = {
+    "knockoff": knockoff,
+    "phantomforce": phantomforce,
+    "fly": fly,
+    "bounce": bounce,
+    "dig": dig,
+    "dive": dive,
+    "shadowforce": shadowforce,
+    "doubleshock": doubleshock,
+}
+
+
 def after_move(
     move_name,
     state,
@@ -72,10 +84,11 @@ def after_move(
     move_hit,
     hit_sub,
 ):
-    try:
-        after_move_instructions = globals()[move_name](
+    move_func = move_lookup.get(move_name)
+    if move_func is not None:
+        after_move_instructions = move_func(
             state, attacker, defender, attacking_side, defending_side, move_hit, hit_sub
         )
         return after_move_instructions or []
-    except KeyError:
+    else:
         return []
@@ -132,8 +132,8 @@ def foulplay(
 ):
     attacking_move = attacking_move.copy()
     attacking_move[constants.BASE_POWER] *= (
-        defending_pokemon.calculate_boosted_stats()[constants.ATTACK]
-        / attacking_pokemon.calculate_boosted_stats()[constants.ATTACK]
+        defending_pokemon.get_boosted_stats()[constants.ATTACK]
+        / attacking_pokemon.get_boosted_stats()[constants.ATTACK]
     )
     return attacking_move
 
@@ -171,7 +171,7 @@ def psyshock(
     weather,
     terrain,
 ):
-    defending_stats = defending_pokemon.calculate_boosted_stats()
+    defending_stats = defending_pokemon.get_boosted_stats()
     attacking_move = attacking_move.copy()
     attacking_move[constants.BASE_POWER] *= (
         defending_stats[constants.SPECIAL_DEFENSE] / defending_stats[constants.DEFENSE]
@@ -226,8 +226,8 @@ def gyroball(
 ):
     # power = (25 × TargetSpeed ÷ UserSpeed) + 1
     attacking_move = attacking_move.copy()
-    attacker_speed = attacking_pokemon.calculate_boosted_stats()[constants.SPEED]
-    defender_speed = defending_pokemon.calculate_boosted_stats()[constants.SPEED]
+    attacker_speed = attacking_pokemon.get_boosted_stats()[constants.SPEED]
+    defender_speed = defending_pokemon.get_boosted_stats()[constants.SPEED]
     attacking_move[constants.BASE_POWER] = min(
         150, (25 * defender_speed / attacker_speed) + 1
     )
@@ -245,8 +245,8 @@ def electroball(
     terrain,
 ):
     speed_ratio = (
-        defending_pokemon.calculate_boosted_stats()[constants.SPEED]
-        / attacking_pokemon.calculate_boosted_stats()[constants.SPEED]
+        defending_pokemon.get_boosted_stats()[constants.SPEED]
+        / attacking_pokemon.get_boosted_stats()[constants.SPEED]
     )
 
     attacking_move = attacking_move.copy()
@@ -499,7 +499,7 @@ def strengthsap(
     attacking_move = attacking_move.copy()
     attacking_move[constants.BOOSTS] = {constants.ATTACK: -1}
     attacking_move[constants.HEAL] = [
-        defending_pokemon.calculate_boosted_stats()[constants.ATTACK],
+        defending_pokemon.get_boosted_stats()[constants.ATTACK],
         attacking_pokemon.maxhp,
     ]
     attacking_move[constants.HEAL_TARGET] = constants.SELF
@@ -746,7 +746,7 @@ def terablast(
         attacking_move = attacking_move.copy()
         attacking_move[constants.TYPE] = attacking_pokemon.types[0]
 
-        boosted_stats = attacking_pokemon.calculate_boosted_stats()
+        boosted_stats = attacking_pokemon.get_boosted_stats()
 
         if boosted_stats[constants.SPECIAL_ATTACK] > boosted_stats[constants.ATTACK]:
             attacking_move[constants.CATEGORY] = constants.PHYSICAL
@@ -765,7 +765,7 @@ def bodypress(
     terrain,
 ):
     attacking_move = attacking_move.copy()
-    boosted_stats = attacking_pokemon.calculate_boosted_stats()
+    boosted_stats = attacking_pokemon.get_boosted_stats()
     attacking_move[constants.BASE_POWER] *= (
         boosted_stats[constants.DEFENSE] / boosted_stats[constants.ATTACK]
     )
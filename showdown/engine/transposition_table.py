@@ -0,0 +1,21 @@
+from .bounded_cache import BoundedCache
+
+DEFAULT_TRANSPOSITION_TABLE_SIZE = 100000
+
+
+class TranspositionTable(BoundedCache):
+    """The payoff matrices produced by `get_payoff_matrix`
+
+    Different orderings of instructions often lead to the same State,
+    so a position is looked up by the hash of its State and the options being searched.
+    A position searched to different remaining depths, as iterative deepening does, has an entry for each depth,
+    and a search only uses the entry for its own depth"""
+
+    def __init__(self, max_size=DEFAULT_TRANSPOSITION_TABLE_SIZE):
+        super().__init__(max_size)
+
+    def get(self, key, depth):
+        return super().get((key, depth))
+
+    def put(self, key, depth, score_lookup):
+        super().put((key, depth), score_lookup)
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+# seconds to wait for connecting, reading a chunk of the response, or sending the request
+HTTP_TIMEOUT = 10
+
+# a request is tried once more for each retry, waiting longer before every attempt
+HTTP_RETRIES = 3
+HTTP_BACKOFF = 0.5
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# only these methods can be sent twice without doing something twice on the server
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# these errors happen before any of the request is sent, so every method can be retried after them
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# one client is shared so connections to the same host are reused
+http_client = None
+
+
+def get_http_client():
+    global http_client
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return http_client
+
+
+async def close_http_client():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+
+@asynccontextmanager
+async def stream(method, url, retries=HTTP_RETRIES, backoff=HTTP_BACKOFF, **kwargs):
+    # the response is given before its body is read so large bodies can be handled in chunks
+    # connection errors, timeouts and server errors are retried for idempotent methods
+    # other methods, like the POSTs that log in or upload a replay, are only retried when they were not sent
+    # the last response is given if the server keeps failing so the caller can check the status code
+    client = get_http_client()
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    for attempt in range(retries + 1):
+        try:
+            response = await client.send(
+                client.build_request(method, url, **kwargs), stream=True
+            )
+        except httpx.TransportError as e:
+            if attempt == retries or not (idempotent or isinstance(e, NOT_SENT_ERRORS)):
+                raise
+            logger.warning("{} {} failed: {}".format(method, url, repr(e)))
+        else:
+            if (
+                not idempotent
+                or response.status_code not in RETRY_STATUS_CODES
+                or attempt == retries
+            ):
+                try:
+                    yield response
+                finally:
+                    await response.aclose()
+                return
+
+            await response.aclose()
+            logger.warning(
+                "{} {} returned {}".format(method, url, response.status_code)
+            )
+
+        await asyncio.sleep(backoff * 2**attempt)
+
+
+async def request(method, url, **kwargs):
+    async with stream(method, url, **kwargs) as response:
+        await response.aread()
+    return response
+
+
+async def get(url, **kwargs):
+    return await request("GET", url, **kwargs)
+
+
+async def post(url, **kwargs):
+    return await request("POST", url, **kwargs)
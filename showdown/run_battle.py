@@ -1,20 +1,21 @@
 import importlib
 import json
 import asyncio
-import concurrent.futures
 from copy import deepcopy
 import logging
 
 import database
 
-import data
 from data.helpers import get_standard_battle_sets
+from data.team_datasets import TeamDatasets
 import constants
 from config import ShowdownConfig
-from showdown.engine.evaluate import Scoring
 from showdown.battle import Pokemon
 from showdown.battle import LastUsedMove
 from showdown.battle_modifier import async_update_battle
+from showdown.decision_executor import apply_battle_context
+from showdown.decision_executor import create_battle_snapshot
+from showdown.decision_executor import find_best_move_from_snapshot
 
 from showdown.websocket_client import PSWebsocketClient
 
@@ -29,14 +30,13 @@ def battle_is_finished(battle_tag, msg):
     )
 
 
-async def async_pick_move(battle):
-    battle_copy = deepcopy(battle)
-    if battle_copy.request_json:
-        battle_copy.user.from_json(battle_copy.request_json)
-
+async def async_pick_move(battle, executor):
+    # the worker picks a move using its own copy of the battle
+    battle_snapshot = create_battle_snapshot(battle)
     loop = asyncio.get_event_loop()
-    with concurrent.futures.ThreadPoolExecutor() as pool:
-        best_move = await loop.run_in_executor(pool, battle_copy.find_best_move)
+    best_move = await loop.run_in_executor(
+        executor, find_best_move_from_snapshot, battle_snapshot
+    )
     choice = best_move[0]
     if constants.SWITCH_STRING in choice:
         battle.user.last_used_move = LastUsedMove(
@@ -49,12 +49,12 @@ async def async_pick_move(battle):
     return best_move
 
 
-async def handle_team_preview(battle, ps_websocket_client):
+async def handle_team_preview(battle, ps_websocket_client, executor):
     battle_copy = deepcopy(battle)
     battle_copy.user.active = Pokemon.get_dummy()
     battle_copy.opponent.active = Pokemon.get_dummy()
 
-    best_move = await async_pick_move(battle_copy)
+    best_move = await async_pick_move(battle_copy, executor)
     size_of_team = len(battle.user.reserve) + 1
     team_list_indexes = list(range(1, size_of_team))
     choice_digit = int(best_move[0].split()[-1])
@@ -69,13 +69,15 @@ async def handle_team_preview(battle, ps_websocket_client):
     await ps_websocket_client.send_message(battle.battle_tag, message)
 
 
-async def get_battle_tag_and_opponent(ps_websocket_client: PSWebsocketClient):
+async def get_battle_tag_and_opponent(
+    ps_websocket_client: PSWebsocketClient, pokemon_battle_type
+):
+    battle_tag = await ps_websocket_client.receive_new_battle(pokemon_battle_type)
     while True:
-        msg = await ps_websocket_client.receive_message()
+        msg = await ps_websocket_client.receive_message(battle_tag)
         split_msg = msg.split("|")
         first_msg = split_msg[0]
         if "battle" in first_msg:
-            battle_tag = first_msg.replace(">", "").strip()
             user_name = split_msg[-1].replace("☆", "").strip()
             opponent_name = (
                 split_msg[4].replace(user_name, "").replace("vs.", "").strip()
@@ -84,15 +86,17 @@ async def get_battle_tag_and_opponent(ps_websocket_client: PSWebsocketClient):
 
 
 async def initialize_battle_with_tag(
-    ps_websocket_client: PSWebsocketClient, set_request_json=True
+    ps_websocket_client: PSWebsocketClient, pokemon_battle_type, set_request_json=True
 ):
     battle_module = importlib.import_module(
         "showdown.battle_bots.{}.main".format(ShowdownConfig.battle_bot_module)
     )
 
-    battle_tag, opponent_name = await get_battle_tag_and_opponent(ps_websocket_client)
+    battle_tag, opponent_name = await get_battle_tag_and_opponent(
+        ps_websocket_client, pokemon_battle_type
+    )
     while True:
-        msg = await ps_websocket_client.receive_message()
+        msg = await ps_websocket_client.receive_message(battle_tag)
         split_msg = msg.split("|")
         if split_msg[1].strip() == "request" and split_msg[2].strip():
             user_json = json.loads(split_msg[2].strip("'"))
@@ -109,13 +113,14 @@ async def initialize_battle_with_tag(
 
 
 async def read_messages_until_first_pokemon_is_seen(
-    ps_websocket_client, battle, opponent_id, user_json
+    ps_websocket_client, battle, opponent_id, user_json, executor
 ):
     # keep reading messages until the opponent's first pokemon is seen
     # this is run when starting non team-preview battles
     while True:
-        msg = await ps_websocket_client.receive_message()
+        msg = await ps_websocket_client.receive_message(battle.battle_tag)
         if constants.START_STRING in msg:
+            apply_battle_context(battle)
             split_msg = msg.split(constants.START_STRING)[-1].split("\n")
             for line in split_msg:
                 if opponent_id in line and constants.SWITCH_STRING in line:
@@ -125,45 +130,47 @@ async def read_messages_until_first_pokemon_is_seen(
                     await async_update_battle(battle, line)
 
             # first move needs to be picked here
-            best_move = await async_pick_move(battle)
+            best_move = await async_pick_move(battle, executor)
             await ps_websocket_client.send_message(battle.battle_tag, best_move)
 
             return
 
 
 async def start_random_battle(
-    ps_websocket_client: PSWebsocketClient, pokemon_battle_type
+    ps_websocket_client: PSWebsocketClient, pokemon_battle_type, executor
 ):
     battle, opponent_id, user_json = await initialize_battle_with_tag(
-        ps_websocket_client
+        ps_websocket_client, pokemon_battle_type
     )
     battle.battle_type = constants.RANDOM_BATTLE
     battle.generation = pokemon_battle_type[:4]
+    # random battle benefits from a lower static score for an alive pkmn
+    battle.context = battle.context._replace(pokemon_alive_static=30)
 
     await read_messages_until_first_pokemon_is_seen(
-        ps_websocket_client, battle, opponent_id, user_json
+        ps_websocket_client, battle, opponent_id, user_json, executor
     )
 
     return battle
 
 
 async def start_standard_battle(
-    ps_websocket_client: PSWebsocketClient, pokemon_battle_type
+    ps_websocket_client: PSWebsocketClient, pokemon_battle_type, executor
 ):
     battle, opponent_id, user_json = await initialize_battle_with_tag(
-        ps_websocket_client, set_request_json=False
+        ps_websocket_client, pokemon_battle_type, set_request_json=False
     )
     battle.battle_type = constants.STANDARD_BATTLE
     battle.generation = pokemon_battle_type[:4]
 
     if battle.generation in constants.NO_TEAM_PREVIEW_GENS:
         await read_messages_until_first_pokemon_is_seen(
-            ps_websocket_client, battle, opponent_id, user_json
+            ps_websocket_client, battle, opponent_id, user_json, executor
         )
     else:
         msg = ""
         while constants.START_TEAM_PREVIEW not in msg:
-            msg = await ps_websocket_client.receive_message()
+            msg = await ps_websocket_client.receive_message(battle.battle_tag)
 
         preview_string_lines = msg.split(constants.START_TEAM_PREVIEW)[-1].split("\n")
 
@@ -179,33 +186,39 @@ async def start_standard_battle(
             ):
                 opponent_pokemon.append(split_line[3])
 
+        apply_battle_context(battle)
         battle.initialize_team_preview(user_json, opponent_pokemon, pokemon_battle_type)
         battle.during_team_preview()
 
-        smogon_usage_data = get_standard_battle_sets(
+        smogon_usage_data = await get_standard_battle_sets(
             pokemon_battle_type,
             pokemon_names=set(
                 p.name for p in battle.opponent.reserve + battle.user.reserve
             ),
         )
-        data.pokemon_sets = smogon_usage_data
-        for pkmn, values in smogon_usage_data.items():
-            data.effectiveness[pkmn] = values["effectiveness"]
+        battle.context = battle.context._replace(
+            pokemon_sets=smogon_usage_data,
+            effectiveness={
+                pkmn: values["effectiveness"]
+                for pkmn, values in smogon_usage_data.items()
+            },
+            team_dataset_sets=TeamDatasets.pokemon_sets,
+        )
+        apply_battle_context(battle)
 
-        await handle_team_preview(battle, ps_websocket_client)
+        await handle_team_preview(battle, ps_websocket_client, executor)
 
     return battle
 
 
-async def start_battle(ps_websocket_client, battle_format, prisma):
+async def start_battle(ps_websocket_client, battle_format, prisma, executor):
     # Only random battles - CC1v1 / Battle Factory has team preview
     if "random" in battle_format:
-        Scoring.POKEMON_ALIVE_STATIC = (
-            30  # random battle benefits from a lower static score for an alive pkmn
-        )
-        battle = await start_random_battle(ps_websocket_client, battle_format)
+        battle = await start_random_battle(ps_websocket_client, battle_format, executor)
     else:
-        battle = await start_standard_battle(ps_websocket_client, battle_format)
+        battle = await start_standard_battle(
+            ps_websocket_client, battle_format, executor
+        )
 
     # Prisma defined
     if ShowdownConfig.show_win_streak:
@@ -245,14 +258,14 @@ async def start_battle(ps_websocket_client, battle_format, prisma):
     return battle
 
 
-async def pokemon_battle(ps_websocket_client, battle_format, prisma):
+async def pokemon_battle(ps_websocket_client, battle_format, prisma, executor):
     # Start the pokemon battle
-    battle = await start_battle(ps_websocket_client, battle_format, prisma)
+    battle = await start_battle(ps_websocket_client, battle_format, prisma, executor)
 
     # Infinite Loop
     while True:
         # Get the message from the showdown web socket
-        msg = await ps_websocket_client.receive_message()
+        msg = await ps_websocket_client.receive_message(battle.battle_tag)
 
         # If the battle has ended
         if battle_is_finished(battle.battle_tag, msg):
@@ -334,13 +347,16 @@ async def pokemon_battle(ps_websocket_client, battle_format, prisma):
             # Return the battle winner
             return winner_name
         else:  # Battle has not ended
+            # Other battles may have put their own data in place
+            apply_battle_context(battle)
+
             # Check if a battle action is required
             action_required = await async_update_battle(battle, msg)
 
             # Action is required, and wait it set to false
             if action_required and not battle.wait:
                 # Pick the best move for the battle
-                best_move = await async_pick_move(battle)
+                best_move = await async_pick_move(battle, executor)
 
                 # Send the selected move websocket to the client
                 await ps_websocket_client.send_message(battle.battle_tag, best_move)
@@ -2,7 +2,6 @@ import asyncio
 import constants
 import websockets
 import database
-import requests
 import json
 import time
 
@@ -10,6 +9,9 @@ import logging
 from config import ShowdownConfig
 
 from teams import get_team
+from showdown import http_client
+from showdown.battle_messages import MessageRouter
+from showdown.battle_messages import SAVE_REPLAY_RESPONSE
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +35,10 @@ class PSWebsocketClient:
     last_message = None
     last_challenge_time = 0
 
+    # messages are read by one task and put into the queue for the battle they belong to
+    message_router = None
+    message_reader = None
+
     @classmethod
     async def create(cls, username, password, address):
         self = PSWebsocketClient()
@@ -41,17 +47,31 @@ class PSWebsocketClient:
         self.address = "ws://{}/showdown/websocket".format(address)
         self.websocket = await websockets.connect(self.address)
         self.login_uri = "https://play.pokemonshowdown.com/action.php"
+        self.message_router = MessageRouter()
+        self.message_reader = asyncio.create_task(self.read_messages())
         return self
 
+    async def read_messages(self):
+        try:
+            while True:
+                message = await self.websocket.recv()
+                logger.debug("Received message from websocket: {}".format(message))
+                self.message_router.route_message(message)
+        except Exception as e:
+            logger.error("Stopped reading from the websocket: {}".format(e))
+            self.message_router.close(e)
+
+    async def receive_new_battle(self, battle_format):
+        return await self.message_router.receive_new_battle(battle_format)
+
     async def join_room(self, room_name):
         message = "/join {}".format(room_name)
         await self.send_message("", [message])
         logger.debug("Joined room '{}'".format(room_name))
 
-    async def receive_message(self):
-        message = await self.websocket.recv()
-        logger.debug("Received message from websocket: {}".format(message))
-        return message
+    async def receive_message(self, battle_tag=None):
+        # messages that are not for a battle are received when `battle_tag` is None
+        return await self.message_router.receive_message(battle_tag)
 
     async def send_message(self, room, message_list):
         message = room + "|" + "|".join(message_list)
@@ -70,7 +90,7 @@ class PSWebsocketClient:
         logger.debug("Logging in...")
         client_id, challstr = await self.get_id_and_challstr()
         if self.password:
-            response = requests.post(
+            response = await http_client.post(
                 self.login_uri,
                 data={
                     "act": "login",
@@ -81,7 +101,7 @@ class PSWebsocketClient:
             )
 
         else:
-            response = requests.post(
+            response = await http_client.post(
                 self.login_uri,
                 data={
                     "act": "getassertion",
@@ -114,7 +134,7 @@ class PSWebsocketClient:
         if battle_format in constants.RANDOM_FORMATS:
             return None
         else:  # Non random battle format, generate the team
-            return get_team(battle_format, selection_method, team_link)
+            return await get_team(battle_format, selection_method, team_link)
 
     async def update_team(self, battle_format, team):
         if battle_format in constants.RANDOM_FORMATS:
@@ -283,8 +303,9 @@ class PSWebsocketClient:
         await self.send_message("", message)
 
         while True:
-            msg = await self.receive_message()
+            msg = await self.receive_message(battle_tag)
             if battle_tag in msg and "deinit" in msg:
+                self.message_router.finish_battle(battle_tag)
                 return
 
     async def save_replay(self, battle_tag):
@@ -292,12 +313,12 @@ class PSWebsocketClient:
         await self.send_message(battle_tag, message)
 
         while True:
-            msg = await self.receive_message()
-            if msg.startswith("|queryresponse|savereplay|"):
-                obj = json.loads(msg.replace("|queryresponse|savereplay|", ""))
+            msg = await self.receive_message(battle_tag)
+            if msg.startswith(SAVE_REPLAY_RESPONSE):
+                obj = json.loads(msg.replace(SAVE_REPLAY_RESPONSE, ""))
                 log = obj["log"]
                 identifier = obj["id"]
-                post_response = requests.post(
+                post_response = await http_client.post(
                     "https://play.pokemonshowdown.com/~~showdown/action.php?act=uploadreplay",
                     data={"log": log, "id": identifier},
                 )
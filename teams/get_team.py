@@ -1,19 +1,19 @@
 import os
 import random
 import logging
-import requests
 from bs4 import BeautifulSoup
 
 from teams.team_converter import export_factory_to_packed, export_to_packed
 
 from config import ShowdownConfig
+from showdown import http_client
 
 logger = logging.getLogger(__name__)
 
 TEAM_JSON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "teams")
 
 
-def get_user_team(url):
+async def get_user_team(url):
     # Team Data (None by default)
     team: str | None = None
 
@@ -22,7 +22,7 @@ def get_user_team(url):
     # Url HAS to start with this
     if url.startswith("https://pokepast.es/"):
         # Get content from the url
-        response = requests.get(url)
+        response = await http_client.get(url)
 
         # If success status code
         if response.status_code == 200:
@@ -38,7 +38,7 @@ def get_user_team(url):
             # Loop over all of the articles
             for article in articles:
                 # Get the text from the article and trim the whitespace
-                set = article.text.trim()
+                set = article.text.strip()
 
                 # Add set to the list
                 sets.append(set)
@@ -64,7 +64,7 @@ def get_user_team(url):
     return team
 
 
-def get_team(format, method=None, team_link=None):
+async def get_team(format, method=None, team_link=None):
     logger.debug(f"Selecting team for format {format} ...")
 
     # Team Data (None by default)
@@ -72,7 +72,7 @@ def get_team(format, method=None, team_link=None):
 
     # Selection method is user, and team link provided
     if method == "user" and team_link:
-        team = get_user_team(team_link)
+        team = await get_user_team(team_link)
     else:  # Any other selection method / no team
         # Files to process
         files = []
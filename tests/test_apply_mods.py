@@ -0,0 +1,141 @@
+import unittest
+from collections import defaultdict
+
+import constants
+import data
+from config import ShowdownConfig
+from data.mods.apply_mods import apply_mods
+from data.mods.apply_mods import get_gen_number
+from data.mods.apply_mods import get_generation_data
+from showdown.engine import damage_calculator
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.find_state_instructions import get_all_state_instructions
+from showdown.engine.find_state_instructions import lookup_move
+from showdown.engine.objects import Pokemon
+from showdown.engine.objects import Side
+from showdown.engine.objects import State
+from showdown.engine.objects import StateMutator
+
+
+class TestApplyMods(unittest.TestCase):
+    def setUp(self):
+        self.original_pokemon_sets = data.pokemon_sets
+        data.pokemon_sets = data.random_battle_sets
+
+    def tearDown(self):
+        apply_mods("gen9")
+        data.pokemon_sets = self.original_pokemon_sets
+
+    def test_gen_number_is_read_from_the_game_mode(self):
+        self.assertEqual(3, get_gen_number("gen3ou"))
+        self.assertEqual(9, get_gen_number("gen9randombattle"))
+
+    def test_generation_data_is_only_built_once(self):
+        self.assertIs(get_generation_data("gen4ou"), get_generation_data("gen4uu"))
+
+    def test_generation_data_is_not_changed_by_other_generations(self):
+        gen3_data = get_generation_data("gen3ou")
+        gen9_data = get_generation_data("gen9ou")
+
+        self.assertEqual(
+            constants.SPECIAL, gen3_data.all_move_json["crunch"]["category"]
+        )
+        self.assertEqual(
+            constants.PHYSICAL, gen9_data.all_move_json["crunch"]["category"]
+        )
+
+    def test_changing_the_data_module_does_not_change_the_generation_data(self):
+        apply_mods("gen3ou")
+        data.all_move_json["crunch"]["category"] = constants.STATUS
+        data.all_move_json["crunch"]["flags"]["contact"] = 0
+        data.pokedex["tyranitar"]["types"].append("fire")
+        data.random_battle_sets["tyranitar"]["moves"] = {}
+
+        gen3_data = get_generation_data("gen3ou")
+        self.assertEqual(
+            constants.SPECIAL, gen3_data.all_move_json["crunch"]["category"]
+        )
+        self.assertEqual(1, gen3_data.all_move_json["crunch"]["flags"]["contact"])
+        self.assertEqual(["rock", "dark"], gen3_data.pokedex["tyranitar"]["types"])
+        self.assertNotEqual({}, gen3_data.random_battle_sets["tyranitar"]["moves"])
+
+        apply_mods("gen9ou")
+        apply_mods("gen3ou")
+        self.assertEqual(constants.SPECIAL, data.all_move_json["crunch"]["category"])
+
+    def test_gen3_mods_are_applied(self):
+        apply_mods("gen3ou")
+
+        self.assertEqual(constants.SPECIAL, data.all_move_json["crunch"]["category"])
+        self.assertEqual(constants.HAIL, constants.ICE_WEATHER)
+        self.assertEqual("baseAbility", constants.REQUEST_DICT_ABILITY)
+        self.assertEqual(1.5, damage_calculator.TERRAIN_DAMAGE_BOOST)
+
+    def test_compiled_moves_follow_the_generation(self):
+        apply_mods("gen3ou")
+        self.assertEqual(constants.SPECIAL, lookup_move("crunch")[constants.CATEGORY])
+
+        apply_mods("gen9ou")
+        self.assertEqual(constants.PHYSICAL, lookup_move("crunch")[constants.CATEGORY])
+
+    def test_returning_to_gen9_restores_everything(self):
+        gen9_random_battle_sets = dict(data.random_battle_sets)
+        apply_mods("gen3ou")
+        apply_mods("gen9ou")
+
+        self.assertEqual(constants.PHYSICAL, data.all_move_json["crunch"]["category"])
+        self.assertEqual(constants.SNOW, constants.ICE_WEATHER)
+        self.assertEqual(constants.ABILITY, constants.REQUEST_DICT_ABILITY)
+        self.assertEqual(-1, constants.HIDDEN_POWER_TYPE_STRING_INDEX)
+        self.assertEqual(1.3, damage_calculator.TERRAIN_DAMAGE_BOOST)
+        self.assertEqual(gen9_random_battle_sets, data.random_battle_sets)
+
+    def test_random_battle_sets_follow_the_generation(self):
+        apply_mods("gen7randombattle")
+
+        self.assertIs(data.random_battle_sets, data.pokemon_sets)
+        self.assertEqual(
+            dict(get_generation_data("gen7randombattle").random_battle_sets),
+            data.pokemon_sets,
+        )
+
+    def test_damage_in_a_search_follows_the_generation(self):
+        ShowdownConfig.damage_calc_type = "average"
+        ShowdownConfig.merge_equivalent_states = False
+        for generation in ["gen9ou", "gen7ou"]:
+            apply_mods(generation)
+            state = State(
+                Side(
+                    Pokemon.from_state_pokemon_dict(
+                        StatePokemon("pikachu", 100).to_dict()
+                    ),
+                    dict(),
+                    (0, 0),
+                    defaultdict(lambda: 0),
+                    (0, 0),
+                ),
+                Side(
+                    Pokemon.from_state_pokemon_dict(
+                        StatePokemon("blastoise", 100).to_dict()
+                    ),
+                    dict(),
+                    (0, 0),
+                    defaultdict(lambda: 0),
+                    (0, 0),
+                ),
+                None,
+                constants.ELECTRIC_TERRAIN,
+                False,
+            )
+            expected_damage = damage_calculator.calculate_damage(
+                state, constants.USER, "thunderbolt", "splash"
+            )[0]
+
+            state_instructions = get_all_state_instructions(
+                StateMutator(state), "thunderbolt", "splash"
+            )
+            self.assertIn(
+                (constants.MUTATOR_DAMAGE, constants.OPPONENT, expected_damage),
+                state_instructions[0].instructions,
+                msg=generation,
+            )
@@ -0,0 +1,155 @@
+import unittest
+from unittest import mock
+
+import constants
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.batch_damage_calculator import calculate_damage_against_defenders
+from showdown.engine.batch_damage_calculator import calculate_damage_rolls
+from showdown.engine.damage_calculator import _calculate_damage
+from showdown.engine.damage_calculator import pokemon_type_indicies
+from showdown.engine.objects import Pokemon
+from tests import test_damage_calculator
+
+CALC_TYPES = ["average", "min", "max", "min_max", "min_max_average", "all"]
+
+
+def get_pokemon(name):
+    return Pokemon.from_state_pokemon_dict(StatePokemon(name, 100).to_dict())
+
+
+class TestBatchDamageMatchesEveryDamageCalculatorTest(
+    test_damage_calculator.TestCalculateDamageAmount
+):
+    # runs every test of `_calculate_damage` with each call also checked against the batch calculation
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(
+            test_damage_calculator,
+            "_calculate_damage",
+            self.calculate_damage_and_compare,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def calculate_damage_and_compare(
+        self, attacker, defender, move, conditions=None, calc_type="average"
+    ):
+        damage = _calculate_damage(
+            attacker, defender, move, conditions=conditions, calc_type=calc_type
+        )
+        self.assertEqual(
+            [[damage]],
+            calculate_damage_against_defenders(
+                attacker, [move], [defender], conditions=conditions, calc_type=calc_type
+            ),
+        )
+        return damage
+
+
+class TestCalculateDamageAgainstDefenders(unittest.TestCase):
+    def setUp(self):
+        self.attacker = get_pokemon("garchomp")
+        self.defenders = [
+            get_pokemon("skarmory"),
+            get_pokemon("tyranitar"),
+            get_pokemon("gengar"),
+            get_pokemon("chansey"),
+        ]
+        self.moves = [
+            "earthquake",
+            "dragonclaw",
+            "fireblast",
+            "stoneedge",
+            "thousandarrows",
+            "seismictoss",
+            "swordsdance",
+            "bodypress",
+            "hydropump",
+        ]
+
+    def assert_matches_calculate_damage(self, conditions=None):
+        for calc_type in CALC_TYPES:
+            expected = [
+                [
+                    _calculate_damage(
+                        self.attacker,
+                        defender,
+                        move,
+                        conditions=conditions,
+                        calc_type=calc_type,
+                    )
+                    for defender in self.defenders
+                ]
+                for move in self.moves
+            ]
+            self.assertEqual(
+                expected,
+                calculate_damage_against_defenders(
+                    self.attacker,
+                    self.moves,
+                    self.defenders,
+                    conditions=conditions,
+                    calc_type=calc_type,
+                ),
+                msg=calc_type,
+            )
+
+    def test_every_move_against_every_defender_matches_calculate_damage(self):
+        self.assert_matches_calculate_damage()
+
+    def test_matches_calculate_damage_with_boosts_statuses_and_abilities(self):
+        self.attacker.attack_boost = 2
+        self.attacker.status = constants.BURN
+        self.attacker.ability = "swordofruin"
+        self.defenders[0].defense_boost = -1
+        self.defenders[1].ability = "unaware"
+        self.defenders[2].volatile_status.add(constants.ROOST)
+        self.defenders[3].types = []
+
+        self.assert_matches_calculate_damage()
+
+    def test_matches_calculate_damage_with_conditions(self):
+        self.assert_matches_calculate_damage(
+            conditions={
+                constants.WEATHER: constants.SAND,
+                constants.TERRAIN: constants.ELECTRIC_TERRAIN,
+                constants.REFLECT: 1,
+                constants.LIGHT_SCREEN: 1,
+            }
+        )
+
+    def test_no_defenders_gives_an_empty_list_for_each_move(self):
+        self.assertEqual(
+            [[], []],
+            calculate_damage_against_defenders(
+                self.attacker, ["earthquake", "swordsdance"], []
+            ),
+        )
+
+
+class TestCalculateDamageRolls(unittest.TestCase):
+    def test_shape_is_moves_by_defenders_by_rolls(self):
+        rolls = calculate_damage_rolls(
+            100,
+            [100, 80],
+            200,
+            [[100, 150, 200]],
+            [pokemon_type_indicies["fire"], pokemon_type_indicies["water"]],
+            [[pokemon_type_indicies["grass"], pokemon_type_indicies["typeless"]]] * 3,
+            calc_type="min_max",
+        )
+
+        self.assertEqual((2, 3, 2), rolls.shape)
+
+    def test_invalid_calc_type_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            calculate_damage_rolls(
+                100,
+                [100],
+                200,
+                200,
+                [pokemon_type_indicies["fire"]],
+                [[pokemon_type_indicies["grass"]]],
+                calc_type="not_a_calc_type",
+            )
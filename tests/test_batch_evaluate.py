@@ -0,0 +1,120 @@
+import math
+import unittest
+from collections import defaultdict
+
+import constants
+from config import ShowdownConfig
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.batch_evaluate import evaluate_leaves
+from showdown.engine.evaluate import evaluate
+from showdown.engine.evaluate import Scoring
+from showdown.engine.find_state_instructions import get_all_state_instructions
+from showdown.engine.objects import Pokemon
+from showdown.engine.objects import Side
+from showdown.engine.objects import State
+from showdown.engine.objects import StateMutator
+from showdown.engine.select_best_move import get_payoff_matrix
+
+
+def get_side(active, reserve):
+    return Side(
+        Pokemon.from_state_pokemon_dict(StatePokemon(active, 100).to_dict()),
+        {
+            name: Pokemon.from_state_pokemon_dict(StatePokemon(name, 100).to_dict())
+            for name in reserve
+        },
+        (0, 0),
+        defaultdict(lambda: 0),
+        (0, 0),
+    )
+
+
+class TestEvaluateLeaves(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        ShowdownConfig.merge_equivalent_states = False
+        self.state = State(
+            get_side("pikachu", ["rattata", "charmander"]),
+            get_side("squirtle", ["bulbasaur"]),
+            None,
+            None,
+            False,
+        )
+        self.state.user.active.moves = [
+            {constants.ID: "thunderbolt", constants.DISABLED: False},
+            {constants.ID: "nuzzle", constants.DISABLED: False},
+            {constants.ID: "substitute", constants.DISABLED: False},
+            {constants.ID: "agility", constants.DISABLED: False},
+        ]
+        self.state.opponent.active.moves = [
+            {constants.ID: "scald", constants.DISABLED: False},
+            {constants.ID: "spikes", constants.DISABLED: False},
+            {constants.ID: "willowisp", constants.DISABLED: False},
+            {constants.ID: "leechseed", constants.DISABLED: False},
+        ]
+        self.state.user.side_conditions[constants.STEALTH_ROCK] = 1
+        self.state.opponent.side_conditions[constants.REFLECT] = 1
+        self.state.opponent.active.attack_boost = -2
+        self.mutator = StateMutator(self.state)
+
+    def assert_every_leaf_has_the_same_score_as_evaluate(self):
+        user_options, opponent_options = self.state.get_all_options()
+        for user_move in user_options:
+            for opponent_move in opponent_options:
+                state_instructions = get_all_state_instructions(
+                    self.mutator, user_move, opponent_move
+                )
+                expected_scores = []
+                for instructions in state_instructions:
+                    self.mutator.apply(instructions.instructions)
+                    expected_scores.append(evaluate(self.state))
+                    self.mutator.reverse(instructions.instructions)
+
+                self.assertEqual(
+                    expected_scores,
+                    evaluate_leaves(self.mutator, state_instructions),
+                    msg=(user_move, opponent_move),
+                )
+
+    def test_every_leaf_has_the_same_score_as_evaluate(self):
+        self.assert_every_leaf_has_the_same_score_as_evaluate()
+
+    def test_leaves_are_scored_with_the_current_scoring_weights(self):
+        pokemon_alive_static = Scoring.POKEMON_ALIVE_STATIC
+        self.addCleanup(setattr, Scoring, "POKEMON_ALIVE_STATIC", pokemon_alive_static)
+        Scoring.POKEMON_ALIVE_STATIC = 30
+
+        self.assert_every_leaf_has_the_same_score_as_evaluate()
+
+    def test_state_is_not_changed(self):
+        state_hash = self.state.get_hash()
+        state_instructions = get_all_state_instructions(
+            self.mutator, "thunderbolt", "scald"
+        )
+
+        evaluate_leaves(self.mutator, state_instructions)
+
+        self.assertEqual(state_hash, self.state.get_hash())
+
+    def test_no_leaves_gives_no_scores(self):
+        self.assertEqual([], evaluate_leaves(self.mutator, []))
+
+    def test_payoff_matrix_is_the_same_with_batch_evaluation(self):
+        user_options, opponent_options = self.state.get_all_options()
+        scores = get_payoff_matrix(
+            self.mutator, user_options, opponent_options, depth=2
+        )
+        batch_scores = get_payoff_matrix(
+            self.mutator,
+            user_options,
+            opponent_options,
+            depth=2,
+            batch_evaluation=True,
+        )
+
+        self.assertEqual(scores.keys(), batch_scores.keys())
+        for move_pair, score in scores.items():
+            if math.isnan(score):
+                self.assertTrue(math.isnan(batch_scores[move_pair]))
+            else:
+                self.assertEqual(score, batch_scores[move_pair])
@@ -26,6 +26,7 @@ from showdown.engine.objects import StateMutator
 class TestBattleMechanics(unittest.TestCase):
     def setUp(self):
         ShowdownConfig.damage_calc_type = "average"  # some tests may override this
+        ShowdownConfig.merge_equivalent_states = False
         self.state = State(
             Side(
                 Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
@@ -177,7 +178,9 @@ class TestBattleMechanics(unittest.TestCase):
             self.mutator, bot_move, opponent_move
         )
 
+        # the boost is not applied by the mutator so the cached boosted stats have to be cleared here
         self.state.user.active.defense_boost = 6
+        self.state.user.active.boosted_stats = None
         instructions_with_6_attack_boost = get_all_state_instructions(
             self.mutator, bot_move, opponent_move
         )
@@ -15150,6 +15153,75 @@ class TestRemoveDuplicateInstructions(unittest.TestCase):
 
         self.assertEqual(expected_instructions, new_instructions)
 
+    def test_combines_instructions_that_hold_lists(self):
+        change_type_instruction = (
+            constants.MUTATOR_CHANGE_TYPE,
+            constants.USER,
+            ["fire"],
+            ["water"],
+        )
+        instructions = [
+            TransposeInstruction(0.5, [change_type_instruction], False),
+            TransposeInstruction(0.5, [deepcopy(change_type_instruction)], False),
+        ]
+
+        new_instructions = remove_duplicate_instructions(instructions)
+
+        expected_instructions = [
+            TransposeInstruction(1.0, [change_type_instruction], False),
+        ]
+        self.assertEqual(expected_instructions, new_instructions)
+
+    def test_combines_different_instructions_that_reach_the_same_state(self):
+        TestBattleMechanics.setUp(self)
+        instructions = [
+            TransposeInstruction(
+                0.5,
+                [
+                    (constants.MUTATOR_DAMAGE, constants.USER, 5),
+                    (constants.MUTATOR_HEAL, constants.USER, 5),
+                ],
+                False,
+            ),
+            TransposeInstruction(0.25, [], False),
+            TransposeInstruction(
+                0.25, [(constants.MUTATOR_DAMAGE, constants.USER, 5)], False
+            ),
+        ]
+
+        new_instructions = remove_duplicate_instructions(instructions, self.mutator)
+        self.mutator.rollback(0)
+
+        expected_instructions = [
+            TransposeInstruction(
+                0.75,
+                [
+                    (constants.MUTATOR_DAMAGE, constants.USER, 5),
+                    (constants.MUTATOR_HEAL, constants.USER, 5),
+                ],
+                False,
+            ),
+            TransposeInstruction(
+                0.25, [(constants.MUTATOR_DAMAGE, constants.USER, 5)], False
+            ),
+        ]
+        self.assertEqual(expected_instructions, new_instructions)
+
+    def test_same_state_is_not_combined_without_a_mutator(self):
+        instructions = [
+            TransposeInstruction(
+                0.5,
+                [
+                    (constants.MUTATOR_DAMAGE, constants.USER, 5),
+                    (constants.MUTATOR_HEAL, constants.USER, 5),
+                ],
+                False,
+            ),
+            TransposeInstruction(0.5, [], False),
+        ]
+
+        self.assertEqual(2, len(remove_duplicate_instructions(instructions)))
+
 
 class TestUserMovesFirst(unittest.TestCase):
     def setUp(self):
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import unittest
+
+from showdown.battle_messages import get_battle_format
+from showdown.battle_messages import get_battle_room
+from showdown.battle_messages import MessageRouter
+
+
+class TestGetBattleRoom(unittest.TestCase):
+    def test_returns_battle_room_from_room_message(self):
+        msg = ">battle-gen9randombattle-123\n|init|battle"
+        self.assertEqual("battle-gen9randombattle-123", get_battle_room(msg))
+
+    def test_returns_none_for_global_message(self):
+        self.assertIsNone(get_battle_room("|challstr|4|abc"))
+
+    def test_returns_none_for_chat_room_message(self):
+        self.assertIsNone(get_battle_room(">lobby\n|c|user|hello"))
+
+    def test_save_replay_response_is_for_the_battle_room(self):
+        msg = "|queryresponse|savereplay|{}".format(
+            json.dumps({"log": "", "id": "gen9randombattle-123"})
+        )
+        self.assertEqual("battle-gen9randombattle-123", get_battle_room(msg))
+
+    def test_get_battle_format(self):
+        self.assertEqual(
+            "gen9randombattle", get_battle_format("battle-gen9randombattle-123")
+        )
+
+
+class TestMessageRouter(unittest.TestCase):
+    def run_with_messages(self, messages, coroutine_function):
+        async def run():
+            router = MessageRouter()
+            for message in messages:
+                router.route_message(message)
+            return await coroutine_function(router)
+
+        return asyncio.run(run())
+
+    def test_messages_are_routed_to_their_battles(self):
+        messages = [
+            ">battle-gen9randombattle-1\n|init|battle",
+            ">battle-gen9randombattle-2\n|init|battle",
+            "|pm| user|bot|/challenge gen9randombattle",
+            ">battle-gen9randombattle-1\n|turn|1",
+        ]
+
+        async def receive(router):
+            first_battle = await router.receive_new_battle("gen9randombattle")
+            second_battle = await router.receive_new_battle("gen9randombattle")
+            return (
+                first_battle,
+                second_battle,
+                await router.receive_message(first_battle),
+                await router.receive_message(first_battle),
+                await router.receive_message(second_battle),
+                await router.receive_message(),
+            )
+
+        self.assertEqual(
+            (
+                "battle-gen9randombattle-1",
+                "battle-gen9randombattle-2",
+                ">battle-gen9randombattle-1\n|init|battle",
+                ">battle-gen9randombattle-1\n|turn|1",
+                ">battle-gen9randombattle-2\n|init|battle",
+                "|pm| user|bot|/challenge gen9randombattle",
+            ),
+            self.run_with_messages(messages, receive),
+        )
+
+    def test_new_battles_are_separated_by_format(self):
+        messages = [
+            ">battle-gen8randombattle-1\n|init|battle",
+            ">battle-gen9randombattle-2\n|init|battle",
+        ]
+
+        async def receive(router):
+            return await router.receive_new_battle("gen9randombattle")
+
+        self.assertEqual(
+            "battle-gen9randombattle-2", self.run_with_messages(messages, receive)
+        )
+
+    def test_messages_for_finished_battles_are_dropped(self):
+        async def receive(router):
+            router.route_message(">battle-gen9randombattle-1\n|init|battle")
+            battle_tag = await router.receive_new_battle("gen9randombattle")
+            router.finish_battle(battle_tag)
+            router.route_message(">battle-gen9randombattle-1\n|chat")
+            router.route_message(">battle-gen9randombattle-2\n|init|battle")
+            return await router.receive_new_battle("gen9randombattle")
+
+        self.assertEqual(
+            "battle-gen9randombattle-2", self.run_with_messages([], receive)
+        )
+
+    def test_error_is_raised_to_every_receiver(self):
+        messages = [">battle-gen9randombattle-1\n|init|battle"]
+
+        async def receive(router):
+            battle_tag = await router.receive_new_battle("gen9randombattle")
+            await router.receive_message(battle_tag)
+            router.close(ConnectionError("closed"))
+            for battle_tag in ("battle-gen9randombattle-1", None, None):
+                with self.assertRaises(ConnectionError):
+                    await router.receive_message(battle_tag)
+            with self.assertRaises(ConnectionError):
+                await router.receive_new_battle("gen9randombattle")
+
+        self.run_with_messages(messages, receive)
+
+    def test_discarding_global_messages_keeps_battle_messages(self):
+        messages = [
+            "|pm| user|bot|/challenge gen9randombattle",
+            ">battle-gen9randombattle-1\n|init|battle",
+        ]
+
+        async def receive(router):
+            battle_tag = await router.receive_new_battle("gen9randombattle")
+            router.discard_global_messages()
+            return router.global_messages.empty(), await router.receive_message(
+                battle_tag
+            )
+
+        self.assertEqual(
+            (True, ">battle-gen9randombattle-1\n|init|battle"),
+            self.run_with_messages(messages, receive),
+        )
@@ -0,0 +1,69 @@
+import unittest
+
+from showdown.engine.bounded_cache import BoundedCache
+
+
+class TestBoundedCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = BoundedCache(max_size=2)
+
+    def test_get_returns_the_default_for_a_missing_key(self):
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual("missing", self.cache.get("a", "missing"))
+        self.assertEqual(2, self.cache.misses)
+
+    def test_get_returns_the_stored_value(self):
+        self.cache.put("a", 1)
+
+        self.assertEqual(1, self.cache.get("a"))
+        self.assertEqual(1, self.cache.hits)
+
+    def test_none_can_be_stored(self):
+        self.cache.put("a", None)
+
+        self.assertIsNone(self.cache.get("a", "missing"))
+        self.assertEqual(1, self.cache.hits)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.get("a")
+        self.cache.put("c", 3)
+
+        self.assertEqual(2, len(self.cache))
+        self.assertEqual(1, self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+
+    def test_putting_an_existing_key_makes_it_the_most_recently_used(self):
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.put("a", 3)
+        self.cache.put("c", 4)
+
+        self.assertEqual(3, self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+
+    def test_hit_rate(self):
+        self.cache.put("a", 1)
+        self.cache.get("a")
+        self.cache.get("b")
+
+        self.assertEqual(0.5, self.cache.hit_rate())
+
+    def test_hit_rate_is_zero_before_any_lookups(self):
+        self.assertEqual(0, self.cache.hit_rate())
+
+    def test_clear_resets_entries_and_counters(self):
+        self.cache.put("a", 1)
+        self.cache.get("a")
+        self.cache.clear()
+
+        self.assertEqual(0, len(self.cache))
+        self.assertEqual(0, self.cache.hits)
+        self.assertEqual(0, self.cache.misses)
+
+    def test_repr_names_the_subclass(self):
+        class ExampleCache(BoundedCache):
+            pass
+
+        self.assertTrue(repr(ExampleCache(1)).startswith("ExampleCache(entries=0"))
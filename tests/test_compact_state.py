@@ -0,0 +1,92 @@
+import pickle
+import unittest
+
+import constants
+from showdown.engine.compact_state import decode_name
+from showdown.engine.compact_state import decode_state
+from showdown.engine.compact_state import decode_volatile_statuses
+from showdown.engine.compact_state import encode_name
+from showdown.engine.compact_state import encode_state
+from showdown.engine.compact_state import encode_volatile_statuses
+from showdown.engine.compact_state import NAMES
+from tests import test_state
+
+
+def comparable(state):
+    # volatile statuses are a set so their order is not part of the state
+    for pkmn in [state.user.active, state.opponent.active]:
+        pkmn.volatile_status = sorted(pkmn.volatile_status)
+    return str(state)
+
+
+class TestCompactState(unittest.TestCase):
+    def setUp(self):
+        self.state = test_state.TestStateHash.create_state()
+        self.state.user.active.moves = [
+            {
+                constants.ID: "thunderbolt",
+                constants.DISABLED: False,
+                constants.CURRENT_PP: 24,
+            },
+            {constants.ID: "voltswitch", constants.DISABLED: True},
+        ]
+        self.state.user.active.volatile_status.update(
+            {"leechseed", "notavolatilestatus"}
+        )
+        self.state.user.active.status = constants.PARALYZED
+        self.state.user.active.item = constants.UNKNOWN_ITEM
+        self.state.opponent.active.ability = None
+        self.state.opponent.side_conditions[constants.STEALTH_ROCK] = 1
+        self.state.opponent.wish = (1, 100)
+        self.state.opponent.future_sight = (2, "pikachu")
+        self.state.weather = constants.RAIN
+        self.state.field = constants.ELECTRIC_TERRAIN
+
+    def test_encoded_state_decodes_to_the_same_state(self):
+        new_state = decode_state(encode_state(self.state))
+        self.assertEqual(self.state.get_hash(), new_state.get_hash())
+        self.assertEqual(comparable(self.state), comparable(new_state))
+
+    def test_encoded_state_can_be_pickled(self):
+        encoded_state = pickle.loads(pickle.dumps(encode_state(self.state)))
+        self.assertEqual(
+            comparable(self.state), comparable(decode_state(encoded_state))
+        )
+
+    def test_decoded_state_does_not_share_mutable_values(self):
+        new_state = decode_state(encode_state(self.state))
+        new_state.user.active.moves[0][constants.DISABLED] = True
+        new_state.user.active.volatile_status.add("confusion")
+        new_state.opponent.side_conditions[constants.SPIKES] += 1
+
+        self.assertFalse(self.state.user.active.moves[0][constants.DISABLED])
+        self.assertNotIn("confusion", self.state.user.active.volatile_status)
+        self.assertEqual(0, self.state.opponent.side_conditions[constants.SPIKES])
+
+    def test_known_names_are_small_integers(self):
+        for name in ["pikachu", "thunderbolt", "electric", "static", "leftovers"]:
+            code = encode_name(name)
+            self.assertIsInstance(code, int)
+            self.assertEqual(name, decode_name(code))
+
+    def test_none_is_code_zero(self):
+        self.assertEqual(0, encode_name(None))
+        self.assertIsNone(NAMES[0])
+
+    def test_unknown_name_is_kept_as_a_string(self):
+        self.assertEqual("notapokemon", encode_name("notapokemon"))
+        self.assertEqual("notapokemon", decode_name("notapokemon"))
+
+    def test_volatile_statuses_are_one_bitmask(self):
+        mask, unknown = encode_volatile_statuses({"leechseed", constants.SUBSTITUTE})
+        self.assertEqual((), unknown)
+        self.assertEqual(
+            {"leechseed", constants.SUBSTITUTE}, decode_volatile_statuses(mask, unknown)
+        )
+
+    def test_unknown_volatile_status_is_kept_beside_the_bitmask(self):
+        mask, unknown = encode_volatile_statuses({"leechseed", "notavolatilestatus"})
+        self.assertEqual(("notavolatilestatus",), unknown)
+        self.assertEqual(
+            {"leechseed", "notavolatilestatus"}, decode_volatile_statuses(mask, unknown)
+        )
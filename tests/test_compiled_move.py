@@ -0,0 +1,74 @@
+import unittest
+from copy import deepcopy
+
+import constants
+from data import all_move_json
+from showdown.engine.compiled_move import CompiledMove
+from showdown.engine.compiled_move import compiled_moves
+from showdown.engine.find_state_instructions import lookup_move
+
+
+class TestCompiledMove(unittest.TestCase):
+    def setUp(self):
+        self.move = CompiledMove(all_move_json["uturn"])
+
+    def test_compiled_move_has_the_same_values_as_the_move_data(self):
+        self.assertEqual(all_move_json["uturn"], self.move)
+        self.assertEqual(all_move_json["uturn"].keys(), self.move.keys())
+
+    def test_compiled_move_cannot_be_changed(self):
+        with self.assertRaises(TypeError):
+            self.move[constants.BASE_POWER] = 100
+        with self.assertRaises(TypeError):
+            self.move[constants.FLAGS][constants.CHARGE] = 1
+
+    def test_flags_are_checked_with_the_flag_bits(self):
+        self.assertTrue(self.move.has_flag(constants.CONTACT))
+        self.assertFalse(self.move.has_flag(constants.CHARGE))
+        self.assertFalse(self.move.has_flag("notaflag"))
+
+    def test_lookup_move_gives_the_same_compiled_move_every_time(self):
+        self.assertIs(compiled_moves["uturn"], lookup_move("uturn"))
+        self.assertIs(lookup_move("uturn"), deepcopy(lookup_move("uturn")))
+
+
+class TestMoveOverlay(unittest.TestCase):
+    def setUp(self):
+        self.move = CompiledMove(all_move_json["uturn"])
+        self.overlay = self.move.copy()
+
+    def test_changes_are_only_kept_in_the_overlay(self):
+        self.overlay[constants.BASE_POWER] *= 2
+
+        self.assertEqual(140, self.overlay[constants.BASE_POWER])
+        self.assertEqual(70, self.move[constants.BASE_POWER])
+        self.assertEqual({constants.BASE_POWER: 140}, self.overlay.changes)
+
+    def test_unchanged_values_are_read_from_the_compiled_move(self):
+        self.overlay[constants.TYPE] = "fire"
+
+        self.assertEqual(self.move[constants.ID], self.overlay[constants.ID])
+        self.assertEqual({**all_move_json["uturn"], "type": "fire"}, self.overlay)
+
+    def test_deleted_key_is_not_in_the_overlay(self):
+        del self.overlay[constants.FLAGS]
+
+        self.assertNotIn(constants.FLAGS, self.overlay)
+        self.assertIsNone(self.overlay.get(constants.FLAGS))
+        self.assertNotIn(constants.FLAGS, list(self.overlay))
+        self.assertIn(constants.FLAGS, self.move)
+
+    def test_copy_of_an_overlay_does_not_share_changes(self):
+        self.overlay[constants.BASE_POWER] = 100
+        overlay_copy = self.overlay.copy()
+        overlay_copy[constants.BASE_POWER] = 200
+
+        self.assertIs(self.move, overlay_copy.base)
+        self.assertEqual(100, self.overlay[constants.BASE_POWER])
+
+    def test_changed_flags_change_the_flag_bits(self):
+        self.overlay[constants.FLAGS] = self.overlay[constants.FLAGS].copy()
+        self.overlay[constants.FLAGS].pop(constants.CONTACT)
+
+        self.assertFalse(self.overlay.has_flag(constants.CONTACT))
+        self.assertTrue(self.move.has_flag(constants.CONTACT))
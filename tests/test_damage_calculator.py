@@ -4,6 +4,7 @@ from collections import defaultdict
 import constants
 from showdown.engine.damage_calculator import _calculate_damage
 from showdown.engine.damage_calculator import calculate_damage
+from showdown.engine.damage_calculator import DamageCache
 from showdown.engine.objects import State
 from showdown.engine.objects import Side
 from showdown.engine.objects import Pokemon
@@ -395,3 +396,104 @@ class TestCalculateDamage(unittest.TestCase):
         )
 
         self.assertNotEqual(0, damage_amounts[0])
+
+
+class TestDamageCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = DamageCache(max_size=2)
+        self.charizard = Pokemon.from_state_pokemon_dict(
+            StatePokemon("charizard", 100).to_dict()
+        )
+        self.venusaur = Pokemon.from_state_pokemon_dict(
+            StatePokemon("venusaur", 100).to_dict()
+        )
+
+    def test_damage_is_the_same_as_calculate_damage(self):
+        conditions = {constants.WEATHER: constants.SUN, constants.REFLECT: 1}
+        self.charizard.special_attack_boost = 2
+        self.venusaur.volatile_status.add("tarshot")
+
+        for calc_type in ["average", "min_max", "all"]:
+            self.assertEqual(
+                _calculate_damage(
+                    self.charizard,
+                    self.venusaur,
+                    "fireblast",
+                    conditions=conditions,
+                    calc_type=calc_type,
+                ),
+                self.cache.calculate_damage(
+                    self.charizard,
+                    self.venusaur,
+                    "fireblast",
+                    conditions=conditions,
+                    calc_type=calc_type,
+                ),
+            )
+
+    def test_same_calculation_is_only_done_once(self):
+        self.cache.calculate_damage(self.charizard, self.venusaur, "fireblast")
+        self.cache.calculate_damage(self.charizard, self.venusaur, "fireblast")
+
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+    def test_changed_boost_is_calculated_again(self):
+        self.cache.calculate_damage(self.charizard, self.venusaur, "fireblast")
+        self.venusaur.special_defense_boost = 1
+        dmg = self.cache.calculate_damage(self.charizard, self.venusaur, "fireblast")
+
+        self.assertEqual(0, self.cache.hits)
+        self.assertEqual(
+            _calculate_damage(self.charizard, self.venusaur, "fireblast"), dmg
+        )
+
+    def test_changed_conditions_are_calculated_again(self):
+        self.cache.calculate_damage(self.charizard, self.venusaur, "fireblast")
+        dmg = self.cache.calculate_damage(
+            self.charizard,
+            self.venusaur,
+            "fireblast",
+            conditions={constants.WEATHER: constants.RAIN},
+        )
+
+        self.assertEqual(0, self.cache.hits)
+        self.assertEqual(
+            _calculate_damage(
+                self.charizard,
+                self.venusaur,
+                "fireblast",
+                conditions={constants.WEATHER: constants.RAIN},
+            ),
+            dmg,
+        )
+
+    def test_changing_the_result_does_not_change_the_cached_damage(self):
+        dmg = self.cache.calculate_damage(self.charizard, self.venusaur, "fireblast")
+        dmg.append(1)
+
+        self.assertNotEqual(
+            dmg, self.cache.calculate_damage(self.charizard, self.venusaur, "fireblast")
+        )
+
+    def test_status_move_is_cached_as_none(self):
+        self.cache.calculate_damage(self.charizard, self.venusaur, "willowisp")
+
+        self.assertIsNone(
+            self.cache.calculate_damage(self.charizard, self.venusaur, "willowisp")
+        )
+        self.assertEqual(1, self.cache.hits)
+
+    def test_invalid_move_raises_type_error(self):
+        with self.assertRaises(TypeError):
+            self.cache.calculate_damage(self.charizard, self.venusaur, None)
+
+    def test_least_recently_used_entry_is_evicted_when_full(self):
+        for move in ["fireblast", "airslash"]:
+            self.cache.calculate_damage(self.charizard, self.venusaur, move)
+        self.cache.calculate_damage(self.charizard, self.venusaur, "fireblast")
+        self.cache.calculate_damage(self.charizard, self.venusaur, "dragonpulse")
+
+        self.assertEqual(2, len(self.cache))
+        self.cache.calculate_damage(self.charizard, self.venusaur, "fireblast")
+        self.assertEqual(2, self.cache.hits)
@@ -0,0 +1,156 @@
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from unittest import mock
+
+import data
+from config import ShowdownConfig
+from data.team_datasets import TeamDatasets
+from showdown.battle import Battle
+from showdown.battle import BattleContext
+from showdown.battle import Pokemon
+from showdown.engine.evaluate import Scoring
+from showdown.decision_executor import apply_battle_context
+from showdown.decision_executor import check_concurrent_battles
+from showdown.decision_executor import create_battle_snapshot
+from showdown.decision_executor import create_decision_executor
+from showdown.decision_executor import find_best_move_from_snapshot
+from showdown.decision_executor import PROCESS_EXECUTOR
+from showdown.decision_executor import THREAD_EXECUTOR
+
+# so we can instantiate a Battle object for testing
+Battle.__abstractmethods__ = set()
+
+
+class TestBattleSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.battle = Battle("battle-tag")
+        self.battle.user.active = Pokemon("pikachu", 100)
+        self.battle.user.active.boosts["attack"] = 1
+        self.battle.opponent.active = Pokemon("charmander", 100)
+        self.battle.opponent.side_conditions["stealthrock"] = 1
+
+    def test_snapshot_recreates_an_independent_battle(self):
+        battle_copy = pickle.loads(create_battle_snapshot(self.battle))
+        battle_copy.user.active.boosts["attack"] += 1
+        battle_copy.opponent.side_conditions["spikes"] += 1
+
+        self.assertEqual(1, self.battle.user.active.boosts["attack"])
+        self.assertEqual(2, battle_copy.user.active.boosts["attack"])
+        self.assertEqual(0, self.battle.opponent.side_conditions["spikes"])
+        self.assertEqual("pikachu", battle_copy.user.active.name)
+        self.assertEqual(
+            self.battle.opponent.active.speed_range,
+            battle_copy.opponent.active.speed_range,
+        )
+
+
+class TestBattleContext(unittest.TestCase):
+    def setUp(self):
+        self.battle = Battle("battle-tag")
+        self.original_pokemon_sets = data.pokemon_sets
+        self.original_effectiveness = dict(data.effectiveness)
+        self.original_pokemon_alive_static = Scoring.POKEMON_ALIVE_STATIC
+        self.original_team_dataset_sets = TeamDatasets.pokemon_sets
+
+    def tearDown(self):
+        data.pokemon_sets = self.original_pokemon_sets
+        data.effectiveness.clear()
+        data.effectiveness.update(self.original_effectiveness)
+        Scoring.POKEMON_ALIVE_STATIC = self.original_pokemon_alive_static
+        TeamDatasets.pokemon_sets = self.original_team_dataset_sets
+
+    def test_applying_a_battle_puts_its_data_in_place(self):
+        self.battle.context = BattleContext(
+            pokemon_sets={"pikachu": {}},
+            effectiveness={"pikachu": {"charmander": 1.0}},
+            pokemon_alive_static=30,
+            team_dataset_sets={"pikachu": []},
+        )
+        apply_battle_context(self.battle)
+
+        self.assertEqual({"pikachu": {}}, data.pokemon_sets)
+        self.assertEqual({"pikachu": {"charmander": 1.0}}, data.effectiveness)
+        self.assertEqual(30, Scoring.POKEMON_ALIVE_STATIC)
+        self.assertEqual({"pikachu": []}, TeamDatasets.pokemon_sets)
+
+    def test_default_context_uses_the_random_battle_sets_and_default_scoring(self):
+        self.battle.context = BattleContext(pokemon_sets={"pikachu": {}})
+        apply_battle_context(self.battle)
+
+        apply_battle_context(Battle("other-battle-tag"))
+
+        self.assertIs(data.random_battle_sets, data.pokemon_sets)
+        self.assertEqual({}, data.effectiveness)
+        self.assertEqual(75, Scoring.POKEMON_ALIVE_STATIC)
+
+    def test_one_battle_does_not_change_the_data_used_by_another(self):
+        random_battle = Battle("random-battle-tag")
+        random_battle.context = BattleContext(pokemon_alive_static=30)
+        standard_battle = Battle("standard-battle-tag")
+        standard_battle.context = BattleContext(
+            pokemon_sets={"pikachu": {}}, effectiveness={"pikachu": {"pikachu": 0.5}}
+        )
+
+        apply_battle_context(random_battle)
+        apply_battle_context(standard_battle)
+        random_battle_snapshot = create_battle_snapshot(random_battle)
+
+        with mock.patch.object(
+            Battle, "find_best_move", lambda battle: Scoring.POKEMON_ALIVE_STATIC
+        ):
+            self.assertEqual(30, find_best_move_from_snapshot(random_battle_snapshot))
+        self.assertIs(data.random_battle_sets, data.pokemon_sets)
+        self.assertEqual({}, data.effectiveness)
+
+    def test_copies_of_a_battle_share_its_context(self):
+        self.battle.context = BattleContext(pokemon_sets={"pikachu": {}})
+        self.assertIs(self.battle.context, deepcopy(self.battle).context)
+
+
+class TestCheckConcurrentBattles(unittest.TestCase):
+    def test_standard_battles_cannot_be_played_at_the_same_time_in_threads(self):
+        with self.assertRaises(ValueError):
+            check_concurrent_battles(THREAD_EXECUTOR, 2, ["gen9randombattle", "gen9ou"])
+
+    def test_random_battles_can_be_played_at_the_same_time_in_threads(self):
+        check_concurrent_battles(
+            THREAD_EXECUTOR, 2, ["gen9randombattle", "gen9randombattleblitz"]
+        )
+
+    def test_generations_cannot_be_mixed_at_the_same_time_in_threads(self):
+        with self.assertRaises(ValueError):
+            check_concurrent_battles(
+                THREAD_EXECUTOR, 2, ["gen9randombattle", "gen7randombattle"]
+            )
+
+    def test_generations_can_be_mixed_one_at_a_time_in_threads(self):
+        check_concurrent_battles(
+            THREAD_EXECUTOR, 1, ["gen9randombattle", "gen7randombattle"]
+        )
+
+    def test_generations_can_be_mixed_at_the_same_time_in_processes(self):
+        check_concurrent_battles(
+            PROCESS_EXECUTOR, 2, ["gen9randombattle", "gen7randombattle"]
+        )
+
+    def test_standard_battles_can_be_played_one_at_a_time_in_threads(self):
+        check_concurrent_battles(THREAD_EXECUTOR, 1, ["gen9ou"])
+
+    def test_standard_battles_can_be_played_at_the_same_time_in_processes(self):
+        check_concurrent_battles(PROCESS_EXECUTOR, 2, ["gen9ou"])
+
+
+class TestCreateDecisionExecutor(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.battle_bot_module = "safest"
+
+    def test_thread_executor_is_created(self):
+        executor = create_decision_executor(THREAD_EXECUTOR, 1)
+        self.assertIsInstance(executor, ThreadPoolExecutor)
+        executor.shutdown()
+
+    def test_invalid_executor_type_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            create_decision_executor("not-an-executor", 1)
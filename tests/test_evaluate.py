@@ -0,0 +1,189 @@
+import unittest
+from collections import defaultdict
+
+import constants
+from config import ShowdownConfig
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.evaluate import evaluate
+from showdown.engine.evaluate import evaluate_pokemon
+from showdown.engine.evaluate import PokemonScoreCache
+from showdown.engine.evaluate import Scoring
+from showdown.engine.objects import Pokemon
+from showdown.engine.objects import Side
+from showdown.engine.objects import State
+from showdown.engine.objects import StateMutator
+from showdown.engine.select_best_move import get_payoff_matrix
+
+
+def get_side(active, reserve):
+    return Side(
+        Pokemon.from_state_pokemon_dict(StatePokemon(active, 100).to_dict()),
+        {
+            name: Pokemon.from_state_pokemon_dict(StatePokemon(name, 100).to_dict())
+            for name in reserve
+        },
+        (0, 0),
+        defaultdict(lambda: 0),
+        (0, 0),
+    )
+
+
+class TestIncrementalEvaluator(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        ShowdownConfig.merge_equivalent_states = False
+        self.state = State(
+            get_side("pikachu", ["rattata", "charmander"]),
+            get_side("squirtle", ["bulbasaur"]),
+            None,
+            None,
+            False,
+        )
+        self.mutator = StateMutator(self.state, verify_evaluation=True)
+        self.instructions = [
+            (constants.MUTATOR_DAMAGE, constants.OPPONENT, 10),
+            (constants.MUTATOR_BOOST, constants.USER, constants.SPEED, 2),
+            (constants.MUTATOR_SIDE_START, constants.USER, constants.SPIKES, 1),
+            (constants.MUTATOR_SWITCH, constants.USER, "pikachu", "rattata"),
+            (constants.MUTATOR_APPLY_STATUS, constants.USER, constants.POISON),
+            (
+                constants.MUTATOR_APPLY_VOLATILE_STATUS,
+                constants.OPPONENT,
+                constants.SUBSTITUTE,
+            ),
+            (constants.MUTATOR_DAMAGE, constants.USER, 1000),
+            (constants.MUTATOR_SWITCH, constants.USER, "rattata", "charmander"),
+            (constants.MUTATOR_SIDE_START, constants.OPPONENT, constants.REFLECT, 1),
+        ]
+
+    def test_score_matches_evaluate_after_each_instruction(self):
+        for instruction in self.instructions:
+            self.mutator.apply_one(instruction)
+            self.assertEqual(evaluate(self.state), self.mutator.evaluate())
+
+    def test_score_matches_evaluate_after_reversing_each_instruction(self):
+        self.mutator.apply(self.instructions)
+        self.mutator.evaluate()
+        for instruction in reversed(self.instructions):
+            self.mutator.reverse([instruction])
+            self.assertEqual(evaluate(self.state), self.mutator.evaluate())
+
+    def test_score_matches_evaluate_when_moving_between_branches(self):
+        heal = (constants.MUTATOR_HEAL, constants.OPPONENT, 5)
+        for i in range(len(self.instructions)):
+            self.mutator.move_to(self.instructions)
+            self.assertEqual(evaluate(self.state), self.mutator.evaluate())
+            self.mutator.move_to(self.instructions[:i] + [heal])
+            self.assertEqual(evaluate(self.state), self.mutator.evaluate())
+
+    def test_only_the_pokemon_that_changed_are_scored_again(self):
+        self.mutator.evaluate()
+        self.mutator.apply_one(self.instructions[0])
+        self.mutator.evaluator.touch_changes()
+
+        self.assertEqual(
+            {(constants.OPPONENT, "squirtle")}, self.mutator.evaluator.dirty_pokemon
+        )
+        self.assertEqual(set(), self.mutator.evaluator.dirty_sides)
+        self.assertFalse(self.mutator.evaluator.dirty_matchup)
+
+    def test_recalculate_picks_up_changes_made_without_the_mutator(self):
+        self.mutator.evaluate()
+        self.state.user.active.hp = 1
+
+        self.mutator.evaluator.recalculate()
+
+        self.assertEqual(evaluate(self.state), self.mutator.evaluate())
+
+    def test_payoff_matrix_is_the_same_with_every_leaf_verified(self):
+        user_options, opponent_options = self.state.get_all_options()
+        verified_scores = get_payoff_matrix(
+            self.mutator, user_options, opponent_options, depth=2, prune=False
+        )
+
+        state = State(
+            get_side("pikachu", ["rattata", "charmander"]),
+            get_side("squirtle", ["bulbasaur"]),
+            None,
+            None,
+            False,
+        )
+        scores = get_payoff_matrix(
+            StateMutator(state), user_options, opponent_options, depth=2, prune=False
+        )
+
+        self.assertEqual(scores, verified_scores)
+
+    def test_new_mutator_scores_with_the_current_scoring_weights(self):
+        self.mutator.evaluate()
+        pokemon_alive_static = Scoring.POKEMON_ALIVE_STATIC
+        self.addCleanup(setattr, Scoring, "POKEMON_ALIVE_STATIC", pokemon_alive_static)
+        Scoring.POKEMON_ALIVE_STATIC = 30
+
+        self.assertEqual(evaluate(self.state), StateMutator(self.state).evaluate())
+
+    def test_mutators_given_the_same_cache_share_it(self):
+        pokemon_score_cache = PokemonScoreCache()
+        StateMutator(self.state, pokemon_score_cache=pokemon_score_cache).evaluate()
+        misses = pokemon_score_cache.misses
+        StateMutator(self.state, pokemon_score_cache=pokemon_score_cache).evaluate()
+
+        self.assertEqual(misses, pokemon_score_cache.misses)
+
+
+class TestPokemonScoreCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = PokemonScoreCache(max_size=2)
+        self.pikachu = Pokemon.from_state_pokemon_dict(
+            StatePokemon("pikachu", 100).to_dict()
+        )
+
+    def test_score_is_the_same_as_evaluate_pokemon(self):
+        self.pikachu.hp = 1
+        self.pikachu.speed_boost = 2
+        self.pikachu.status = constants.BURN
+        self.pikachu.volatile_status.add(constants.SUBSTITUTE)
+
+        self.assertEqual(
+            evaluate_pokemon(self.pikachu), self.cache.get_score(self.pikachu)
+        )
+
+    def test_pokemon_in_the_same_condition_is_only_scored_once(self):
+        self.cache.get_score(self.pikachu)
+        self.cache.get_score(self.pikachu)
+
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(1, self.cache.misses)
+
+    def test_pokemon_in_a_different_condition_is_scored_again(self):
+        self.cache.get_score(self.pikachu)
+        self.pikachu.hp -= 1
+        score = self.cache.get_score(self.pikachu)
+
+        self.assertEqual(0, self.cache.hits)
+        self.assertEqual(evaluate_pokemon(self.pikachu), score)
+
+    def test_fainted_pokemon_share_a_score(self):
+        rattata = Pokemon.from_state_pokemon_dict(
+            StatePokemon("rattata", 100).to_dict()
+        )
+        self.pikachu.hp = 0
+        rattata.hp = 0
+        self.cache.get_score(self.pikachu)
+
+        self.assertEqual(0, self.cache.get_score(rattata))
+        self.assertEqual(1, self.cache.hits)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        for hp in (1, 2, 1, 3):
+            self.pikachu.hp = hp
+            self.cache.get_score(self.pikachu)
+
+        self.assertEqual(2, len(self.cache))
+        self.assertEqual(1, self.cache.hits)
+        self.pikachu.hp = 1
+        self.cache.get_score(self.pikachu)
+        self.pikachu.hp = 2
+        self.cache.get_score(self.pikachu)
+        self.assertEqual(2, self.cache.hits)
+        self.assertEqual(4, self.cache.misses)
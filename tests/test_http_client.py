@@ -0,0 +1,204 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import httpx
+
+from config import ShowdownConfig
+from showdown import http_client
+from data.parse_smogon_stats import get_pokemon_information
+
+
+class LocalHandler(BaseHTTPRequestHandler):
+    # path -> list of (status, body, delay) returned one after another
+    # the last response is repeated once the list runs out
+    responses = {}
+    received = []
+
+    def respond(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.received.append((self.command, self.path, self.rfile.read(length)))
+
+        responses = self.responses[self.path]
+        status, body, delay = responses.pop(0) if len(responses) > 1 else responses[0]
+        time.sleep(delay)
+
+        body = body.encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        # the client stops waiting for a response after a timeout
+        except ConnectionError:
+            pass
+
+    do_GET = respond
+    do_POST = respond
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServerTestCase(unittest.TestCase):
+    def setUp(self):
+        LocalHandler.responses = {}
+        LocalHandler.received = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), LocalHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.address = "http://127.0.0.1:{}".format(self.server.server_port)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def run_requests(self, coroutine):
+        # the shared client is closed so the next event loop starts with a new one
+        async def run():
+            try:
+                return await coroutine
+            finally:
+                await http_client.close_http_client()
+
+        return asyncio.run(run())
+
+
+class TestHttpClient(LocalServerTestCase):
+    def test_get_returns_response(self):
+        LocalHandler.responses["/team"] = [(200, "pikachu", 0)]
+        response = self.run_requests(http_client.get(self.address + "/team"))
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("pikachu", response.text)
+
+    def test_post_sends_form_data(self):
+        LocalHandler.responses["/action.php"] = [(200, "ok", 0)]
+        self.run_requests(
+            http_client.post(self.address + "/action.php", data={"act": "login"})
+        )
+
+        self.assertEqual([("POST", "/action.php", b"act=login")], LocalHandler.received)
+
+    def test_server_error_is_retried(self):
+        LocalHandler.responses["/team"] = [(503, "", 0), (503, "", 0), (200, "ok", 0)]
+        response = self.run_requests(
+            http_client.get(self.address + "/team", retries=3, backoff=0)
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, len(LocalHandler.received))
+
+    def test_last_response_is_returned_when_retries_run_out(self):
+        LocalHandler.responses["/team"] = [(503, "", 0)]
+        response = self.run_requests(
+            http_client.get(self.address + "/team", retries=2, backoff=0)
+        )
+
+        self.assertEqual(503, response.status_code)
+        self.assertEqual(3, len(LocalHandler.received))
+
+    def test_client_error_is_not_retried(self):
+        LocalHandler.responses["/team"] = [(404, "", 0)]
+        response = self.run_requests(
+            http_client.get(self.address + "/team", retries=2, backoff=0)
+        )
+
+        self.assertEqual(404, response.status_code)
+        self.assertEqual(1, len(LocalHandler.received))
+
+    def test_timeout_is_retried_then_raised(self):
+        LocalHandler.responses["/team"] = [(200, "", 0.5)]
+        with self.assertRaises(httpx.TimeoutException):
+            self.run_requests(
+                http_client.get(
+                    self.address + "/team", retries=1, backoff=0, timeout=0.1
+                )
+            )
+
+        self.assertEqual(2, len(LocalHandler.received))
+
+    def test_post_is_not_retried_after_a_server_error(self):
+        LocalHandler.responses["/action.php"] = [(503, "", 0), (200, "ok", 0)]
+        response = self.run_requests(
+            http_client.post(self.address + "/action.php", retries=2, backoff=0)
+        )
+
+        self.assertEqual(503, response.status_code)
+        self.assertEqual(1, len(LocalHandler.received))
+
+    def test_post_is_not_retried_after_a_read_timeout(self):
+        LocalHandler.responses["/action.php"] = [(200, "", 0.5)]
+        with self.assertRaises(httpx.ReadTimeout):
+            self.run_requests(
+                http_client.post(
+                    self.address + "/action.php", retries=2, backoff=0, timeout=0.1
+                )
+            )
+
+        self.assertEqual(1, len(LocalHandler.received))
+
+    def test_post_is_retried_when_it_could_not_connect(self):
+        self.server.shutdown()
+        self.server.server_close()
+        # logging is disabled in the tests so the warnings are counted instead
+        with mock.patch.object(http_client.logger, "warning") as warning:
+            with self.assertRaises(httpx.ConnectError):
+                self.run_requests(
+                    http_client.post(self.address + "/action.php", retries=2, backoff=0)
+                )
+
+        self.assertEqual(2, warning.call_count)
+
+    def test_slow_request_does_not_block_the_event_loop(self):
+        LocalHandler.responses["/slow"] = [(200, "", 0.3)]
+
+        async def run():
+            ticks = 0
+            request = asyncio.ensure_future(http_client.get(self.address + "/slow"))
+            while not request.done():
+                ticks += 1
+                await asyncio.sleep(0.01)
+            return ticks
+
+        self.assertGreater(self.run_requests(run()), 5)
+
+
+class TestGetPokemonInformation(LocalServerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        ShowdownConfig.smogon_stats_cache_dir = ""
+        ShowdownConfig.smogon_stats_offline = False
+
+    def test_usage_stats_are_downloaded_and_parsed(self):
+        stats = {
+            "data": {
+                "Pikachu": {
+                    "Raw count": 10,
+                    "Checks and Counters": {},
+                    "Spreads": {"Timid:0/0/0/252/4/252": 10},
+                    "Items": {"lightball": 10},
+                    "Moves": {"thunderbolt": 10},
+                    "Abilities": {"static": 10},
+                },
+                "Charmander": {},
+            }
+        }
+        LocalHandler.responses["/gen9ou-0.json"] = [(200, json.dumps(stats), 0)]
+
+        infos = self.run_requests(
+            get_pokemon_information(
+                self.address + "/gen9ou-0.json", pkmn_names={"pikachu"}
+            )
+        )
+
+        self.assertEqual(["pikachu"], list(infos))
+        self.assertEqual([("lightball", 100.0)], infos["pikachu"]["items"])
+        self.assertEqual([("thunderbolt", 100.0)], infos["pikachu"]["moves"])
@@ -0,0 +1,80 @@
+import unittest
+
+import constants
+from showdown.engine.instruction_cache import InstructionCache
+from showdown.engine.objects import TransposeInstruction
+
+
+def create_state_instructions():
+    return [
+        TransposeInstruction(
+            0.5, [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)], False
+        ),
+        TransposeInstruction(0.5, [], False),
+    ]
+
+
+class TestInstructionCache(unittest.TestCase):
+    def setUp(self):
+        self.instruction_cache = InstructionCache(max_size=2)
+
+    def test_get_returns_none_for_missing_key(self):
+        self.assertIsNone(self.instruction_cache.get("state"))
+        self.assertEqual(1, self.instruction_cache.misses)
+
+    def test_get_returns_the_stored_instructions(self):
+        state_instructions = create_state_instructions()
+        self.instruction_cache.put("state", state_instructions)
+
+        self.assertEqual(state_instructions, self.instruction_cache.get("state"))
+        self.assertEqual(1, self.instruction_cache.hits)
+
+    def test_changing_the_returned_instructions_does_not_change_the_cache(self):
+        self.instruction_cache.put("state", create_state_instructions())
+        state_instructions = self.instruction_cache.get("state")
+        state_instructions[0].add_instruction(
+            (constants.MUTATOR_HEAL, constants.USER, 10)
+        )
+        state_instructions[1].percentage = 0.25
+        state_instructions.pop()
+
+        self.assertEqual(
+            create_state_instructions(), self.instruction_cache.get("state")
+        )
+
+    def test_changing_the_stored_instructions_does_not_change_the_cache(self):
+        state_instructions = create_state_instructions()
+        self.instruction_cache.put("state", state_instructions)
+        state_instructions[0].add_instruction(
+            (constants.MUTATOR_HEAL, constants.USER, 10)
+        )
+
+        self.assertEqual(
+            create_state_instructions(), self.instruction_cache.get("state")
+        )
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.instruction_cache.put("a", [])
+        self.instruction_cache.put("b", [])
+        self.instruction_cache.get("a")
+        self.instruction_cache.put("c", [])
+
+        self.assertEqual(2, len(self.instruction_cache))
+        self.assertIsNotNone(self.instruction_cache.get("a"))
+        self.assertIsNone(self.instruction_cache.get("b"))
+
+    def test_hit_rate(self):
+        self.instruction_cache.put("a", [])
+        self.instruction_cache.get("a")
+        self.instruction_cache.get("b")
+
+        self.assertEqual(0.5, self.instruction_cache.hit_rate())
+
+    def test_clear_resets_entries_and_counters(self):
+        self.instruction_cache.put("a", [])
+        self.instruction_cache.get("a")
+        self.instruction_cache.clear()
+
+        self.assertEqual(0, len(self.instruction_cache))
+        self.assertEqual(0, self.instruction_cache.hits)
+        self.assertEqual(0, self.instruction_cache.misses)
@@ -0,0 +1,118 @@
+import unittest
+from collections import defaultdict
+
+import constants
+from config import ShowdownConfig
+from data import all_move_json
+from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.compiled_move import compiled_moves
+from showdown.engine.find_state_instructions import get_state_instructions_from_move
+from showdown.engine.find_state_instructions import (
+    get_state_instructions_from_move_reference,
+)
+from showdown.engine.find_state_instructions import lookup_move
+from showdown.engine.move_stages import get_move_stages
+from showdown.engine.objects import Pokemon
+from showdown.engine.objects import Side
+from showdown.engine.objects import State
+from showdown.engine.objects import StateMutator
+from showdown.engine.objects import TransposeInstruction
+
+
+def get_side(active, reserve):
+    return Side(
+        Pokemon.from_state_pokemon_dict(StatePokemon(active, 81).to_dict()),
+        {
+            name: Pokemon.from_state_pokemon_dict(StatePokemon(name, 81).to_dict())
+            for name in reserve
+        },
+        (0, 0),
+        defaultdict(lambda: 0),
+        (0, "some_pkmn"),
+    )
+
+
+def as_comparable(list_of_instructions):
+    return [
+        (i.percentage, [tuple(instruction) for instruction in i.instructions], i.frozen)
+        for i in list_of_instructions
+    ]
+
+
+class TestMoveStages(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        ShowdownConfig.merge_equivalent_states = False
+        self.user_ability = None
+        self.opponent_ability = None
+
+    def get_mutator(self):
+        state = State(
+            get_side("raichu", ["xatu", "starmie"]),
+            get_side("aromatisse", ["yveltal", "toxapex"]),
+            None,
+            None,
+            False,
+        )
+        if self.user_ability is not None:
+            state.user.active.ability = self.user_ability
+        if self.opponent_ability is not None:
+            state.opponent.active.ability = self.opponent_ability
+        return StateMutator(state)
+
+    def assert_same_as_reference(self, move_name, defending_move_name, first_move):
+        attacking_move = lookup_move(move_name)
+        defending_move = lookup_move(defending_move_name)
+        results = []
+        for get_instructions in (
+            get_state_instructions_from_move,
+            get_state_instructions_from_move_reference,
+        ):
+            # each gets a new state because the order of the reserve pokemon changes after a switch
+            # and that can change which pokemon a switch-out move picks when two are equally good
+            results.append(
+                as_comparable(
+                    get_instructions(
+                        self.get_mutator(),
+                        attacking_move,
+                        defending_move,
+                        constants.USER,
+                        constants.OPPONENT,
+                        first_move,
+                        TransposeInstruction(1.0, [], False),
+                    )
+                )
+            )
+        self.assertEqual(results[0], results[1], msg=move_name)
+
+    def test_every_move_gives_the_same_instructions_as_the_reference(self):
+        for move_name in all_move_json:
+            for first_move in (True, False):
+                self.assert_same_as_reference(move_name, "tackle", first_move)
+
+    def test_defender_with_an_ability_after_move_gives_the_same_instructions(self):
+        self.opponent_ability = "static"
+        for move_name in ["tackle", "nuzzle", "ironhead", "swordsdance", "uturn"]:
+            for first_move in (True, False):
+                self.assert_same_as_reference(move_name, "tackle", first_move)
+
+    def test_modified_moves_give_the_same_instructions(self):
+        # sheerforce removes the secondary effects of the move when it is used
+        self.user_ability = "sheerforce"
+        for move_name in ["ironhead", "thunderbolt", "crunch", "chargebeam"]:
+            for first_move in (True, False):
+                self.assert_same_as_reference(move_name, "tackle", first_move)
+
+    def test_stages_are_kept_on_the_compiled_move(self):
+        move = compiled_moves["ironhead"]
+        self.assertIs(get_move_stages(move, True), get_move_stages(move, True))
+
+    def test_flinch_stage_is_only_used_when_moving_first(self):
+        move = compiled_moves["ironhead"]
+        self.assertEqual(30, get_move_stages(move, True).flinch_accuracy)
+        self.assertIsNone(get_move_stages(move, False).flinch_accuracy)
+
+    def test_modified_move_is_analysed_every_time(self):
+        move = compiled_moves["ironhead"].copy()
+        move[constants.SECONDARY] = None
+        self.assertIsNone(get_move_stages(move, True).flinch_accuracy)
@@ -1,8 +1,12 @@
+import json
 import unittest
 from unittest import mock
 from datetime import date
 
 from data.parse_smogon_stats import get_smogon_stats_file_name
+from data.parse_smogon_stats import pokemon_is_similar
+from data.parse_smogon_stats import PokemonNameIndex
+from data.parse_smogon_stats import SmogonStatsParser
 
 
 class TestGetSmogonStatsFileName(unittest.TestCase):
@@ -38,3 +42,84 @@ class TestGetSmogonStatsFileName(unittest.TestCase):
         self.assertEqual(
             "https://www.smogon.com/stats/2018-11/chaos/gen7ou-0.json", file_name
         )
+
+
+class TestPokemonNameIndex(unittest.TestCase):
+    def test_is_similar_matches_pokemon_is_similar(self):
+        pkmn_names = ["pikachu", "charizardmegax", "mew"]
+        name_index = PokemonNameIndex(pkmn_names)
+        for normalized_name in [
+            "pikachu",
+            "pikachualola",
+            "pika",
+            "charizard",
+            "charizardmegay",
+            "mewtwo",
+            "me",
+            "squirtle",
+        ]:
+            self.assertEqual(
+                pokemon_is_similar(normalized_name, pkmn_names),
+                name_index.is_similar(normalized_name),
+                normalized_name,
+            )
+
+    def test_contains_exact_and_similar_names(self):
+        name_index = PokemonNameIndex(["pikachu"])
+        self.assertIn("pikachu", name_index)
+        self.assertIn("pikachualola", name_index)
+        self.assertNotIn("squirtle", name_index)
+
+
+class TestSmogonStatsParser(unittest.TestCase):
+    def setUp(self):
+        pokemon = {
+            "Moves": {"thunderbolt": 12.5, "": 1.0},
+            "Checks and Counters": {"Great Tusk": [10.0, 0.5, 0.1]},
+            "Viability Ceiling": [1, 2, 3, 4],
+            "Teammates": {'weird "} name [': 1.0},
+        }
+        self.stats = {
+            "info": {"metagame": "gen9ou", "nested": [1, [2, {"a": "}"}]]},
+            "data": {
+                "Pikachu": pokemon,
+                "Pikachu-Alola": pokemon,
+                "Great Tusk": pokemon,
+                'Weird "} Name': pokemon,
+            },
+        }
+
+    def parse(self, text, chunk_size, name_index=None):
+        parser = SmogonStatsParser(name_index)
+        for i in range(0, len(text), chunk_size):
+            parser.feed(text[i : i + chunk_size])
+        return parser.close()
+
+    def test_every_pokemon_is_read_without_a_name_index(self):
+        for indent in [None, 2]:
+            text = json.dumps(self.stats, indent=indent)
+            for chunk_size in [1, 3, 16, len(text)]:
+                self.assertEqual(self.stats["data"], self.parse(text, chunk_size))
+
+    def test_only_wanted_pokemon_are_read(self):
+        text = json.dumps(self.stats)
+        name_index = PokemonNameIndex(["pikachu", "greattusk"])
+        for chunk_size in [1, 3, 16, len(text)]:
+            self.assertEqual(
+                ["Pikachu", "Pikachu-Alola", "Great Tusk"],
+                list(self.parse(text, chunk_size, name_index)),
+            )
+
+    def test_skipped_pokemon_are_not_kept(self):
+        text = json.dumps(self.stats)
+        parser = SmogonStatsParser(PokemonNameIndex(["pikachu"]))
+        parser.feed(text[: text.index('"Great Tusk": {') + 40])
+
+        self.assertLess(len(parser.buffer), 40)
+
+    def test_incomplete_file_raises_value_error(self):
+        parser = SmogonStatsParser()
+        parser.feed(json.dumps(self.stats)[:-10])
+
+        with self.assertRaises(ValueError):
+            parser.close()
@@ -1,11 +1,23 @@
+import itertools
+import math
 import unittest
 from collections import defaultdict
+from unittest import mock
 
 import constants
+from config import ShowdownConfig
+from showdown.engine.compact_state import decode_state
+from showdown.engine.compact_state import encode_state
 from showdown.engine.objects import State
+from showdown.engine.objects import StateMutator
 from showdown.engine.objects import Side
 from showdown.engine.objects import Pokemon
 from showdown.battle import Pokemon as StatePokemon
+from showdown.engine.select_best_move import get_payoff_matrix
+from showdown.engine.select_best_move import order_options_from_scores
+from showdown.engine.select_best_move import SearchTimeout
+from showdown.engine.instruction_cache import InstructionCache
+from showdown.engine.transposition_table import TranspositionTable
 
 
 class TestGetAllOptions(unittest.TestCase):
@@ -515,3 +527,250 @@ class TestGetAllOptions(unittest.TestCase):
         options = self.state.get_all_options()
 
         self.assertEqual(expected_options, options)
+
+
+class TestGetPayoffMatrix(unittest.TestCase):
+    def setUp(self):
+        ShowdownConfig.damage_calc_type = "average"
+        ShowdownConfig.merge_equivalent_states = False
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("raichu", 73).to_dict()),
+                {
+                    "xatu": Pokemon.from_state_pokemon_dict(
+                        StatePokemon("xatu", 81).to_dict()
+                    ),
+                    "starmie": Pokemon.from_state_pokemon_dict(
+                        StatePokemon("starmie", 81).to_dict()
+                    ),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0),
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(
+                    StatePokemon("aromatisse", 81).to_dict()
+                ),
+                {
+                    "yveltal": Pokemon.from_state_pokemon_dict(
+                        StatePokemon("yveltal", 73).to_dict()
+                    ),
+                    "toxapex": Pokemon.from_state_pokemon_dict(
+                        StatePokemon("toxapex", 73).to_dict()
+                    ),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0),
+            ),
+            None,
+            None,
+            False,
+        )
+        for pkmn in [self.state.user.active, self.state.opponent.active]:
+            pkmn.moves = [
+                {constants.ID: "tackle", constants.DISABLED: False},
+                {constants.ID: "thunderwave", constants.DISABLED: False},
+            ]
+        self.mutator = StateMutator(self.state)
+
+    def test_transposition_table_does_not_change_the_payoff_matrix(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_scores = get_payoff_matrix(
+            self.mutator, user_options, opponent_options, depth=2
+        )
+
+        transposition_table = TranspositionTable()
+        scores = get_payoff_matrix(
+            self.mutator,
+            user_options,
+            opponent_options,
+            depth=2,
+            transposition_table=transposition_table,
+        )
+
+        self.assertEqual(expected_scores.keys(), scores.keys())
+        for move_pair, score in expected_scores.items():
+            if math.isnan(score):
+                self.assertTrue(math.isnan(scores[move_pair]), msg=move_pair)
+            else:
+                self.assertAlmostEqual(score, scores[move_pair], msg=move_pair)
+
+    def test_searching_the_same_position_twice_hits_the_transposition_table(self):
+        user_options, opponent_options = self.state.get_all_options()
+        transposition_table = TranspositionTable()
+        first_scores = get_payoff_matrix(
+            self.mutator,
+            user_options,
+            opponent_options,
+            depth=2,
+            transposition_table=transposition_table,
+        )
+        hits = transposition_table.hits
+
+        second_scores = get_payoff_matrix(
+            self.mutator,
+            user_options,
+            opponent_options,
+            depth=2,
+            transposition_table=transposition_table,
+        )
+
+        self.assertEqual(hits + 1, transposition_table.hits)
+        self.assertIs(first_scores, second_scores)
+
+    def test_instruction_cache_does_not_change_the_payoff_matrix(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_scores = get_payoff_matrix(
+            self.mutator, user_options, opponent_options, depth=2, prune=False
+        )
+
+        instruction_cache = InstructionCache()
+        for _ in range(2):
+            scores = get_payoff_matrix(
+                self.mutator,
+                user_options,
+                opponent_options,
+                depth=2,
+                prune=False,
+                instruction_cache=instruction_cache,
+            )
+            self.assertEqual(expected_scores.keys(), scores.keys())
+            for move_pair, score in expected_scores.items():
+                self.assertAlmostEqual(score, scores[move_pair], msg=move_pair)
+
+        self.assertGreater(instruction_cache.hits, 0)
+
+    def test_searching_the_same_position_again_only_hits_the_instruction_cache(
+        self,
+    ):
+        user_options, opponent_options = self.state.get_all_options()
+        instruction_cache = InstructionCache()
+        get_payoff_matrix(
+            self.mutator,
+            user_options,
+            opponent_options,
+            depth=1,
+            instruction_cache=instruction_cache,
+        )
+        misses = instruction_cache.misses
+
+        get_payoff_matrix(
+            self.mutator,
+            user_options,
+            opponent_options,
+            depth=1,
+            instruction_cache=instruction_cache,
+        )
+
+        self.assertEqual(misses, instruction_cache.misses)
+        self.assertEqual(misses, instruction_cache.hits)
+
+    def test_searching_does_not_modify_the_state(self):
+        hash_before = self.state.get_hash()
+        user_options, opponent_options = self.state.get_all_options()
+        get_payoff_matrix(
+            self.mutator,
+            user_options,
+            opponent_options,
+            depth=2,
+            transposition_table=TranspositionTable(),
+        )
+        self.assertEqual(hash_before, self.state.get_hash())
+
+    def test_searching_each_user_option_separately_gives_the_same_scores(self):
+        user_options, opponent_options = self.state.get_all_options()
+        expected_scores = get_payoff_matrix(
+            self.mutator, user_options, opponent_options, depth=2, prune=False
+        )
+
+        scores = dict()
+        for user_option in user_options:
+            mutator = StateMutator(decode_state(encode_state(self.state)))
+            scores.update(
+                get_payoff_matrix(mutator, [user_option], opponent_options, depth=2)
+            )
+
+        self.assertEqual(list(expected_scores.keys()), list(scores.keys()))
+        for move_pair, score in expected_scores.items():
+            self.assertAlmostEqual(score, scores[move_pair], msg=move_pair)
+
+    def test_search_raises_search_timeout_after_the_deadline(self):
+        user_options, opponent_options = self.state.get_all_options()
+        with self.assertRaises(SearchTimeout):
+            get_payoff_matrix(
+                self.mutator, user_options, opponent_options, depth=2, deadline=0
+            )
+
+    def test_running_out_of_time_mid_search_does_not_modify_the_state(self):
+        hash_before = self.state.get_hash()
+        user_options, opponent_options = self.state.get_all_options()
+
+        # the deadline passes part way through searching the first turn's children
+        times = itertools.chain([0, 0, 0], itertools.repeat(100))
+        with mock.patch(
+            "showdown.engine.select_best_move.time.time", side_effect=times
+        ):
+            with self.assertRaises(SearchTimeout):
+                get_payoff_matrix(
+                    self.mutator, user_options, opponent_options, depth=2, deadline=50
+                )
+
+        self.assertEqual(hash_before, self.state.get_hash())
+
+
+class TestOrderOptionsFromScores(unittest.TestCase):
+    def test_orders_user_options_by_worst_case_score(self):
+        score_lookup = {
+            ("tackle", "splash"): 10,
+            ("tackle", "growl"): -5,
+            ("thunderbolt", "splash"): 20,
+            ("thunderbolt", "growl"): 5,
+        }
+
+        user_options, _ = order_options_from_scores(
+            ["tackle", "thunderbolt"], ["splash", "growl"], score_lookup
+        )
+
+        self.assertEqual(["thunderbolt", "tackle"], user_options)
+
+    def test_orders_opponent_options_by_lowest_score(self):
+        score_lookup = {
+            ("tackle", "splash"): 10,
+            ("tackle", "growl"): -5,
+            ("thunderbolt", "splash"): 20,
+            ("thunderbolt", "growl"): 5,
+        }
+
+        _, opponent_options = order_options_from_scores(
+            ["tackle", "thunderbolt"], ["splash", "growl"], score_lookup
+        )
+
+        self.assertEqual(["growl", "splash"], opponent_options)
+
+    def test_pruned_scores_are_ignored(self):
+        score_lookup = {
+            ("thunderbolt", "splash"): 20,
+            ("thunderbolt", "growl"): 5,
+            ("tackle", "growl"): -5,
+            ("tackle", "splash"): float("nan"),
+        }
+
+        _, opponent_options = order_options_from_scores(
+            ["tackle", "thunderbolt"], ["splash", "growl"], score_lookup
+        )
+
+        self.assertEqual(["growl", "splash"], opponent_options)
+
+    def test_options_without_scores_are_searched_last(self):
+        score_lookup = {
+            ("tackle", "splash"): 10,
+        }
+
+        user_options, opponent_options = order_options_from_scores(
+            ["thunderbolt", "tackle"], ["growl", "splash"], score_lookup
+        )
+
+        self.assertEqual(["tackle", "thunderbolt"], user_options)
+        self.assertEqual(["splash", "growl"], opponent_options)
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from config import ShowdownConfig
+from data.parse_smogon_stats import filter_pokemon_information
+from data.parse_smogon_stats import get_pokemon_information
+from data.parse_smogon_stats import parse_pokemon_information
+from data.parse_smogon_stats import stats_downloads
+from data.smogon_stats_cache import find_newest_cache_key
+from data.smogon_stats_cache import get_cache_key
+from data.smogon_stats_cache import get_cache_path
+from data.smogon_stats_cache import read_cache
+from data.smogon_stats_cache import write_cache
+
+STATS_URL = "https://www.smogon.com/stats/2024-05/chaos/gen9ou-0.json"
+
+
+def pokemon_stats(counters):
+    return {
+        "Raw count": 10,
+        "Checks and Counters": {c: [10, 0.25, 0.1] for c in counters},
+        "Spreads": {"Timid:0/0/0/252/4/252": 10},
+        "Items": {"leftovers": 10},
+        "Moves": {"protect": 10},
+        "Abilities": {"pressure": 10},
+    }
+
+
+SMOGON_STATS = {
+    "Pikachu": pokemon_stats(["Charmander", "Squirtle"]),
+    "Charmander": pokemon_stats(["Pikachu"]),
+    "Squirtle": pokemon_stats([]),
+}
+
+
+class CacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        ShowdownConfig.smogon_stats_cache_dir = self.cache_dir.name
+        ShowdownConfig.smogon_stats_cache_ttl = 60
+        ShowdownConfig.smogon_stats_offline = False
+
+        self.download_patch = mock.patch("data.parse_smogon_stats.get_smogon_stats")
+        self.addCleanup(self.download_patch.stop)
+        self.download_mock = self.download_patch.start()
+        self.download_mock.return_value = SMOGON_STATS
+
+
+class TestSmogonStatsCache(CacheTestCase):
+    def test_cache_key_is_the_month_and_file_name(self):
+        self.assertEqual("2024-05-gen9ou-0", get_cache_key(STATS_URL))
+
+    def test_written_stats_are_read_back(self):
+        write_cache(self.cache_dir.name, "2024-05-gen9ou-0", {"pikachu": {}})
+        saved_time, infos = read_cache(self.cache_dir.name, "2024-05-gen9ou-0")
+
+        self.assertEqual({"pikachu": {}}, infos)
+        self.assertAlmostEqual(time.time(), saved_time, delta=5)
+
+    def test_missing_file_is_not_read(self):
+        self.assertIsNone(read_cache(self.cache_dir.name, "2024-05-gen9ou-0"))
+
+    def test_corrupt_file_is_not_read(self):
+        with open(get_cache_path(self.cache_dir.name, "2024-05-gen9ou-0"), "wb") as f:
+            f.write(b"not stats")
+
+        self.assertIsNone(read_cache(self.cache_dir.name, "2024-05-gen9ou-0"))
+
+    def test_newest_month_of_the_same_file_is_found(self):
+        for cache_key in ["2024-03-gen9ou-0", "2024-04-gen9ou-0", "2024-06-gen9uu-0"]:
+            write_cache(self.cache_dir.name, cache_key, {})
+
+        self.assertEqual(
+            "2024-04-gen9ou-0",
+            find_newest_cache_key(self.cache_dir.name, "2024-05-gen9ou-0"),
+        )
+
+
+class TestFilterPokemonInformation(unittest.TestCase):
+    def test_filtering_all_pokemon_is_the_same_as_parsing_with_names(self):
+        all_infos = parse_pokemon_information(SMOGON_STATS)
+        for pkmn_names in [{"pikachu", "charmander"}, {"squirtle"}, set()]:
+            self.assertEqual(
+                parse_pokemon_information(SMOGON_STATS, pkmn_names=pkmn_names),
+                filter_pokemon_information(all_infos, pkmn_names=pkmn_names),
+            )
+
+
+class TestGetPokemonInformationFromCache(CacheTestCase):
+    def get_pokemon_information(self, pkmn_names):
+        async def run():
+            infos = await get_pokemon_information(STATS_URL, pkmn_names=pkmn_names)
+
+            # let a background refresh finish before the event loop closes
+            await asyncio.gather(*stats_downloads.values(), return_exceptions=True)
+            return infos
+
+        return asyncio.run(run())
+
+    def test_stats_are_downloaded_once(self):
+        first = self.get_pokemon_information({"pikachu", "charmander"})
+        second = self.get_pokemon_information({"pikachu", "charmander"})
+
+        self.assertEqual(1, self.download_mock.call_count)
+        self.assertEqual(first, second)
+        self.assertEqual(
+            parse_pokemon_information(
+                SMOGON_STATS, pkmn_names={"pikachu", "charmander"}
+            ),
+            first,
+        )
+
+    def test_expired_stats_are_used_and_refreshed(self):
+        self.get_pokemon_information({"pikachu"})
+        ShowdownConfig.smogon_stats_cache_ttl = -1
+        self.download_mock.return_value = {"Squirtle": pokemon_stats([])}
+
+        self.assertIn("pikachu", self.get_pokemon_information(None))
+        self.assertEqual(2, self.download_mock.call_count)
+
+        ShowdownConfig.smogon_stats_cache_ttl = 60
+        self.assertEqual(["squirtle"], list(self.get_pokemon_information(None)))
+
+    def test_failed_refresh_keeps_the_old_stats(self):
+        self.get_pokemon_information({"pikachu"})
+        ShowdownConfig.smogon_stats_cache_ttl = -1
+        self.download_mock.side_effect = ConnectionError("offline")
+
+        self.assertIn("pikachu", self.get_pokemon_information({"pikachu"}))
+        self.assertEqual(2, self.download_mock.call_count)
+        self.assertIn("pikachu", self.get_pokemon_information({"pikachu"}))
+
+    def test_offline_mode_uses_an_older_month(self):
+        write_cache(
+            self.cache_dir.name,
+            "2024-04-gen9ou-0",
+            parse_pokemon_information(SMOGON_STATS),
+        )
+        ShowdownConfig.smogon_stats_offline = True
+
+        self.assertIn("pikachu", self.get_pokemon_information({"pikachu"}))
+        self.download_mock.assert_not_called()
+
+    def test_offline_mode_without_cached_stats_returns_nothing(self):
+        ShowdownConfig.smogon_stats_offline = True
+
+        self.assertEqual({}, self.get_pokemon_information({"pikachu"}))
+        self.download_mock.assert_not_called()
+        self.assertEqual([], os.listdir(self.cache_dir.name))
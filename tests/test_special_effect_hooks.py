@@ -0,0 +1,45 @@
+import unittest
+
+from showdown.engine.special_effects import hooks
+from showdown.engine.special_effects.abilities.modify_attack_being_used import (
+    ability_lookup as ability_modify_attack_being_used_lookup,
+)
+from showdown.engine.special_effects.items.end_of_turn import (
+    item_lookup as item_end_of_turn_lookup,
+)
+from showdown.engine.special_effects.moves.after_move import (
+    move_lookup as after_move_lookup,
+)
+
+
+class TestSpecialEffectHooks(unittest.TestCase):
+    def test_every_name_in_a_lookup_has_the_stage(self):
+        for stage_lookup, name_hooks, stage in [
+            (
+                ability_modify_attack_being_used_lookup,
+                hooks.ability_hooks,
+                hooks.MODIFY_ATTACK_BEING_USED,
+            ),
+            (item_end_of_turn_lookup, hooks.item_hooks, hooks.END_OF_TURN),
+            (after_move_lookup, hooks.move_hooks, hooks.AFTER_MOVE),
+        ]:
+            for name in stage_lookup:
+                self.assertTrue(name_hooks[name] & stage, msg=name)
+
+    def test_name_with_hooks_in_several_stages_has_every_stage(self):
+        self.assertEqual(
+            hooks.MODIFY_ATTACK_AGAINST | hooks.END_OF_TURN,
+            hooks.ability_hooks["dryskin"],
+        )
+        self.assertEqual(
+            hooks.MODIFY_ATTACK_BEING_USED | hooks.AFTER_MOVE,
+            hooks.move_hooks["knockoff"],
+        )
+
+    def test_alias_is_in_the_hooks(self):
+        self.assertEqual(hooks.BEFORE_MOVE, hooks.ability_hooks["libero"])
+
+    def test_name_without_special_effects_has_no_hooks(self):
+        self.assertNotIn("runaway", hooks.ability_hooks)
+        self.assertNotIn("tackle", hooks.move_hooks)
+        self.assertNotIn(None, hooks.item_hooks)
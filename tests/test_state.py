@@ -1,9 +1,14 @@
 import unittest
 
+from collections import defaultdict
+from copy import copy
+
 import constants
 from showdown.engine.objects import State
+from showdown.engine.objects import Side
 from showdown.battle import Pokemon as StatePokemon
 from showdown.engine.objects import Pokemon
+from showdown.engine.objects import TransposeInstruction
 
 
 class TestPokemonInit(unittest.TestCase):
@@ -494,3 +499,115 @@ class TestPokemon(unittest.TestCase):
     def test_item_can_be_removed_returns_false_if_target_is_kyogreprimal(self):
         self.pokemon.id = "kyogreprimal"
         self.assertFalse(self.pokemon.item_can_be_removed())
+
+
+class TestStateHash(unittest.TestCase):
+    def setUp(self):
+        self.state = self.create_state()
+
+    @staticmethod
+    def create_state():
+        def create_side():
+            return Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    name: Pokemon.from_state_pokemon_dict(
+                        StatePokemon(name, 100).to_dict()
+                    )
+                    for name in ["rattata", "charmander", "squirtle"]
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0),
+            )
+
+        return State(create_side(), create_side(), None, None, False)
+
+    def test_identical_states_have_the_same_hash(self):
+        self.assertEqual(self.create_state().get_hash(), self.state.get_hash())
+
+    def test_changing_hp_changes_the_hash(self):
+        original_hash = self.state.get_hash()
+        self.state.user.active.hp -= 1
+        self.assertNotEqual(original_hash, self.state.get_hash())
+
+    def test_same_change_on_different_sides_gives_different_hashes(self):
+        other_state = self.create_state()
+        self.state.user.active.attack_boost = 1
+        other_state.opponent.active.attack_boost = 1
+        self.assertNotEqual(other_state.get_hash(), self.state.get_hash())
+
+    def test_changing_which_pokemon_is_active_changes_the_hash(self):
+        original_hash = self.state.get_hash()
+        side = self.state.user
+        side.reserve[side.active.id] = side.active
+        side.active = side.reserve.pop("rattata")
+        self.assertNotEqual(original_hash, self.state.get_hash())
+
+    def test_order_of_reserve_pokemon_does_not_change_the_hash(self):
+        original_hash = self.state.get_hash()
+        self.state.user.reserve = dict(reversed(list(self.state.user.reserve.items())))
+        self.assertEqual(original_hash, self.state.get_hash())
+
+    def test_side_condition_with_zero_count_does_not_change_the_hash(self):
+        original_hash = self.state.get_hash()
+        self.state.user.side_conditions[constants.STEALTH_ROCK] += 0
+        self.assertEqual(original_hash, self.state.get_hash())
+
+    def test_volatile_status_changes_the_hash(self):
+        original_hash = self.state.get_hash()
+        self.state.opponent.active.volatile_status.add(constants.LEECH_SEED)
+        self.assertNotEqual(original_hash, self.state.get_hash())
+
+    def test_running_out_of_pp_changes_the_hash(self):
+        self.state.user.active.moves = [
+            {constants.ID: "tackle", constants.DISABLED: True, constants.CURRENT_PP: 1}
+        ]
+        original_hash = self.state.get_hash()
+        self.state.user.active.moves[0][constants.CURRENT_PP] = 0
+        self.assertNotEqual(original_hash, self.state.get_hash())
+
+
+class TestTransposeInstructionCopy(unittest.TestCase):
+    def setUp(self):
+        self.damage = (constants.MUTATOR_DAMAGE, constants.USER, 5)
+        self.heal = (constants.MUTATOR_HEAL, constants.USER, 5)
+        self.instruction = TransposeInstruction(0.5, [self.damage], False)
+
+    def test_copy_shares_the_instructions_until_one_is_added(self):
+        new_instruction = copy(self.instruction)
+        self.assertIs(self.instruction.instructions, new_instruction.instructions)
+
+        new_instruction.add_instruction(self.heal)
+        self.assertIsNot(self.instruction.instructions, new_instruction.instructions)
+
+    def test_adding_to_a_copy_does_not_change_the_original(self):
+        new_instruction = copy(self.instruction)
+        new_instruction.add_instruction(self.heal)
+
+        self.assertEqual((self.damage,), self.instruction.instructions)
+        self.assertEqual((self.damage, self.heal), new_instruction.instructions)
+
+    def test_adding_to_the_original_does_not_change_the_copies(self):
+        first_copy = copy(self.instruction)
+        second_copy = copy(first_copy)
+        self.instruction.add_instructions([self.heal, self.heal])
+        first_copy.add_instruction(self.damage)
+
+        self.assertEqual(
+            (self.damage, self.heal, self.heal), self.instruction.instructions
+        )
+        self.assertEqual((self.damage, self.damage), first_copy.instructions)
+        self.assertEqual((self.damage,), second_copy.instructions)
+
+    def test_instructions_cannot_be_changed_in_place(self):
+        with self.assertRaises(AttributeError):
+            self.instruction.instructions.append(self.heal)
+
+    def test_replacing_the_instructions_does_not_change_the_copies(self):
+        new_instruction = copy(self.instruction)
+        new_instruction.instructions = [self.heal]
+        self.instruction.add_instruction(self.heal)
+
+        self.assertEqual((self.damage, self.heal), self.instruction.instructions)
+        self.assertEqual((self.heal,), new_instruction.instructions)
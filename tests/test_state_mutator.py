@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 from collections import defaultdict
@@ -8,6 +9,10 @@ from showdown.engine.objects import State
 from showdown.engine.objects import Side
 from showdown.engine.objects import Pokemon
 from showdown.engine.objects import StateMutator
+from showdown.engine.objects import to_opcode_instructions
+from showdown.engine.objects import to_plain_instructions
+from showdown.engine.find_state_instructions import calculate_effective_speed
+from showdown.engine.find_state_instructions import get_effective_speed
 
 
 class TestStatemutator(unittest.TestCase):
@@ -729,3 +734,330 @@ class TestStatemutator(unittest.TestCase):
         self.assertEqual(3, self.state.user.active.special_attack)
         self.assertEqual(4, self.state.user.active.special_defense)
         self.assertEqual(5, self.state.user.active.speed)
+
+
+class TestStateMutatorHash(unittest.TestCase):
+    def setUp(self):
+        self.state = State(
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "rattata": Pokemon.from_state_pokemon_dict(
+                        StatePokemon("rattata", 100).to_dict()
+                    ),
+                    "charmander": Pokemon.from_state_pokemon_dict(
+                        StatePokemon("charmander", 100).to_dict()
+                    ),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0),
+            ),
+            Side(
+                Pokemon.from_state_pokemon_dict(StatePokemon("pikachu", 100).to_dict()),
+                {
+                    "squirtle": Pokemon.from_state_pokemon_dict(
+                        StatePokemon("squirtle", 100).to_dict()
+                    ),
+                    "bulbasaur": Pokemon.from_state_pokemon_dict(
+                        StatePokemon("bulbasaur", 100).to_dict()
+                    ),
+                },
+                (0, 0),
+                defaultdict(lambda: 0),
+                (0, 0),
+            ),
+            None,
+            None,
+            False,
+        )
+        self.state.user.active.moves = [
+            {"id": "return", "disabled": False, "current_pp": 16}
+        ]
+        self.mutator = StateMutator(self.state, verify_hash=True)
+        self.original_hash = self.state.get_hash()
+
+    def assert_hash_is_maintained(self, instructions):
+        self.mutator.apply(instructions)
+        self.assertEqual(self.state.get_hash(), self.mutator.state_hash)
+        self.assertNotEqual(self.original_hash, self.mutator.state_hash)
+
+        self.mutator.reverse(instructions)
+        self.assertEqual(self.original_hash, self.mutator.state_hash)
+
+    def test_hash_is_maintained_for_every_instruction_type(self):
+        user_active = self.state.user.active
+        all_instructions = [
+            (constants.MUTATOR_DISABLE_MOVE, constants.USER, "return"),
+            (constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.USER, "leechseed"),
+            (constants.MUTATOR_DAMAGE, constants.OPPONENT, 10),
+            (constants.MUTATOR_HEAL, constants.USER, -10),
+            (constants.MUTATOR_BOOST, constants.USER, constants.ATTACK, 2),
+            (constants.MUTATOR_UNBOOST, constants.OPPONENT, constants.SPEED, 1),
+            (constants.MUTATOR_APPLY_STATUS, constants.OPPONENT, constants.BURN),
+            (constants.MUTATOR_SIDE_START, constants.USER, constants.STEALTH_ROCK, 1),
+            (constants.MUTATOR_WISH_START, constants.USER, 50, 0),
+            (constants.MUTATOR_FUTURESIGHT_START, constants.USER, "pikachu", 0),
+            (constants.MUTATOR_WEATHER_START, constants.RAIN, None),
+            (constants.MUTATOR_FIELD_START, constants.ELECTRIC_TERRAIN, None),
+            (constants.MUTATOR_TOGGLE_TRICKROOM,),
+            (
+                constants.MUTATOR_CHANGE_TYPE,
+                constants.USER,
+                ["water"],
+                user_active.types,
+            ),
+            (
+                constants.MUTATOR_CHANGE_ITEM,
+                constants.USER,
+                "leftovers",
+                user_active.item,
+            ),
+            (
+                constants.MUTATOR_CHANGE_STATS,
+                constants.USER,
+                (1, 2, 3, 4, 5, 6),
+                (
+                    user_active.maxhp,
+                    user_active.attack,
+                    user_active.defense,
+                    user_active.special_attack,
+                    user_active.special_defense,
+                    user_active.speed,
+                ),
+            ),
+            (constants.MUTATOR_SWITCH, constants.USER, "pikachu", "rattata"),
+        ]
+        for instruction in all_instructions:
+            with self.subTest(instruction=instruction[0]):
+                self.assert_hash_is_maintained([instruction])
+
+        self.assert_hash_is_maintained(all_instructions)
+
+    def test_hash_is_maintained_when_removing_effects(self):
+        self.state.user.active.volatile_status.add("leechseed")
+        self.state.user.active.status = constants.PARALYZED
+        self.state.user.side_conditions[constants.SPIKES] = 1
+        self.state.user.wish = (2, 100)
+        self.state.user.future_sight = (3, "pikachu")
+        self.state.field = constants.ELECTRIC_TERRAIN
+        self.mutator.recalculate_hash()
+        self.original_hash = self.state.get_hash()
+
+        instructions = [
+            (constants.MUTATOR_REMOVE_VOLATILE_STATUS, constants.USER, "leechseed"),
+            (constants.MUTATOR_REMOVE_STATUS, constants.USER, constants.PARALYZED),
+            (constants.MUTATOR_SIDE_END, constants.USER, constants.SPIKES, 1),
+            (constants.MUTATOR_WISH_DECREMENT, constants.USER),
+            (constants.MUTATOR_FUTURESIGHT_DECREMENT, constants.USER),
+            (constants.MUTATOR_FIELD_END, constants.ELECTRIC_TERRAIN),
+        ]
+        self.assert_hash_is_maintained(instructions)
+
+    def test_applying_an_existing_volatile_status_does_not_change_the_hash(self):
+        self.state.user.active.volatile_status.add("leechseed")
+        self.mutator.recalculate_hash()
+
+        self.mutator.apply(
+            [(constants.MUTATOR_APPLY_VOLATILE_STATUS, constants.USER, "leechseed")]
+        )
+
+        self.assertEqual(self.state.get_hash(), self.mutator.state_hash)
+
+    def test_verify_hash_raises_when_state_is_modified_outside_of_the_mutator(self):
+        self.state.user.active.hp -= 1
+
+        with self.assertRaises(ValueError):
+            self.mutator.apply([(constants.MUTATOR_DAMAGE, constants.USER, 1)])
+
+    def test_recalculate_hash_resynchronizes_after_direct_modification(self):
+        self.state.user.active.hp -= 1
+        self.mutator.recalculate_hash()
+
+        self.mutator.apply([(constants.MUTATOR_DAMAGE, constants.USER, 1)])
+
+        self.assertEqual(self.state.get_hash(), self.mutator.state_hash)
+
+
+class TestOpcodeInstructions(unittest.TestCase):
+    def setUp(self):
+        TestStateMutatorHash.setUp(self)
+
+    def test_opcode_is_equal_to_its_name(self):
+        self.assertEqual("damage", constants.MUTATOR_DAMAGE)
+        self.assertEqual(hash("damage"), hash(constants.MUTATOR_DAMAGE))
+        self.assertEqual(
+            [("damage", constants.OPPONENT, 10)],
+            [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)],
+        )
+
+    def test_every_opcode_has_a_different_index(self):
+        self.assertEqual(
+            list(range(len(constants.OPCODES))),
+            [opcode.opcode_index for opcode in constants.OPCODES],
+        )
+
+    def test_opcode_survives_pickling(self):
+        opcode = pickle.loads(pickle.dumps(constants.MUTATOR_DAMAGE))
+        self.assertIs(constants.MUTATOR_DAMAGE, opcode)
+
+    def test_plain_instructions_are_converted_to_opcodes(self):
+        instructions = to_opcode_instructions([("damage", constants.OPPONENT, 10)])
+        self.assertIs(constants.MUTATOR_DAMAGE, instructions[0][0])
+
+        hp = self.state.opponent.active.hp
+        self.mutator.apply(instructions)
+        self.assertEqual(hp - 10, self.state.opponent.active.hp)
+
+    def test_opcode_instructions_are_converted_to_plain_strings(self):
+        instructions = to_plain_instructions(
+            [(constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)]
+        )
+        self.assertIs(str, type(instructions[0][0]))
+        self.assertEqual([("damage", constants.OPPONENT, 10)], instructions)
+
+    def test_unknown_instruction_name_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            to_opcode_instructions([("notaninstruction", constants.OPPONENT)])
+
+    def test_plain_string_instruction_raises_value_error(self):
+        for apply in (
+            self.mutator.apply,
+            self.mutator.reverse,
+            lambda instructions: self.mutator.apply_one(instructions[0]),
+        ):
+            with self.assertRaises(ValueError):
+                apply([("damage", constants.OPPONENT, 10)])
+
+    def test_opcode_index_does_not_hide_str_index(self):
+        self.assertEqual(2, constants.MUTATOR_DAMAGE.index("m"))
+
+
+class TestStateMutatorCheckpoints(unittest.TestCase):
+    def setUp(self):
+        TestStateMutatorHash.setUp(self)
+        self.damage = (constants.MUTATOR_DAMAGE, constants.OPPONENT, 10)
+        self.boost = (constants.MUTATOR_BOOST, constants.USER, constants.ATTACK, 1)
+        self.heal = (constants.MUTATOR_HEAL, constants.USER, 5)
+
+    def test_rollback_reverses_everything_applied_after_the_checkpoint(self):
+        self.mutator.apply([self.damage])
+        checkpoint = self.mutator.checkpoint()
+        self.mutator.apply([self.boost])
+        self.mutator.apply_one(self.heal)
+
+        self.mutator.rollback(checkpoint)
+
+        self.assertEqual(0, self.state.user.active.attack_boost)
+        self.assertEqual(
+            self.state.opponent.active.maxhp - 10, self.state.opponent.active.hp
+        )
+        self.assertEqual([self.damage], self.mutator.undo_log)
+
+    def test_reversed_instructions_are_not_rolled_back_again(self):
+        checkpoint = self.mutator.checkpoint()
+        self.mutator.apply([self.damage, self.boost])
+        self.mutator.reverse([self.damage, self.boost])
+
+        self.mutator.rollback(checkpoint)
+
+        self.assertEqual(self.original_hash, self.mutator.state_hash)
+        self.assertEqual([], self.mutator.undo_log)
+
+    def test_move_to_only_applies_what_is_not_applied_yet(self):
+        self.mutator.move_to([self.damage, self.boost])
+        self.mutator.move_to([self.damage, self.boost, self.heal])
+
+        self.assertEqual([self.damage, self.boost, self.heal], self.mutator.undo_log)
+        self.assertEqual(1, self.state.user.active.attack_boost)
+
+    def test_move_to_a_sibling_branch_reverses_only_the_difference(self):
+        self.mutator.move_to([self.damage, self.boost])
+        self.mutator.move_to([self.damage, self.heal])
+
+        self.assertEqual([self.damage, self.heal], self.mutator.undo_log)
+        self.assertEqual(0, self.state.user.active.attack_boost)
+
+    def test_move_to_starts_from_the_base_checkpoint(self):
+        self.mutator.apply([self.heal])
+        self.mutator.base_checkpoint = self.mutator.checkpoint()
+
+        self.mutator.move_to([self.damage])
+        self.mutator.move_to([])
+
+        self.assertEqual([self.heal], self.mutator.undo_log)
+        self.mutator.rollback(0)
+        self.assertEqual(self.original_hash, self.mutator.state_hash)
+
+
+class TestStateMutatorCachedStats(unittest.TestCase):
+    def setUp(self):
+        TestStateMutatorHash.setUp(self)
+        self.state.user.active.ability = "chlorophyll"
+        self.state.opponent.active.ability = "surgesurfer"
+        self.mutator.recalculate_hash()
+
+    def assert_cached_speeds_are_correct(self):
+        for side in (self.state.user, self.state.opponent):
+            self.assertEqual(
+                side.active.calculate_boosted_stats(),
+                side.active.get_boosted_stats(),
+            )
+            self.assertEqual(
+                calculate_effective_speed(self.state, side),
+                get_effective_speed(self.state, side),
+            )
+
+    def test_cached_stats_follow_every_instruction_that_changes_them(self):
+        pikachu = self.state.user.active
+        for instruction in [
+            (constants.MUTATOR_BOOST, constants.USER, constants.SPEED, 2),
+            (constants.MUTATOR_UNBOOST, constants.USER, constants.ATTACK, 1),
+            (constants.MUTATOR_APPLY_STATUS, constants.USER, constants.PARALYZED),
+            (constants.MUTATOR_CHANGE_ITEM, constants.USER, "choicescarf", "None"),
+            (constants.MUTATOR_SIDE_START, constants.USER, constants.TAILWIND, 1),
+            (constants.MUTATOR_WEATHER_START, constants.SUN, None),
+            (constants.MUTATOR_FIELD_START, constants.ELECTRIC_TERRAIN, None),
+            (
+                constants.MUTATOR_APPLY_VOLATILE_STATUS,
+                constants.USER,
+                "quarkdrivespe",
+            ),
+            (constants.MUTATOR_SWITCH, constants.USER, "pikachu", "rattata"),
+            (
+                constants.MUTATOR_CHANGE_STATS,
+                constants.USER,
+                (pikachu.maxhp, 1, 2, 3, 4, 5),
+                (
+                    pikachu.maxhp,
+                    pikachu.attack,
+                    pikachu.defense,
+                    pikachu.special_attack,
+                    pikachu.special_defense,
+                    pikachu.speed,
+                ),
+            ),
+        ]:
+            self.assert_cached_speeds_are_correct()
+            self.mutator.apply_one(instruction)
+            self.assert_cached_speeds_are_correct()
+            self.mutator.reverse([instruction])
+            self.assert_cached_speeds_are_correct()
+
+    def test_boosted_stats_are_kept_until_a_boost_changes(self):
+        pikachu = self.state.user.active
+        boosted_stats = pikachu.get_boosted_stats()
+        self.assertIs(boosted_stats, pikachu.get_boosted_stats())
+
+        self.mutator.apply_one(
+            (constants.MUTATOR_BOOST, constants.USER, constants.ATTACK, 1)
+        )
+
+        self.assertIsNot(boosted_stats, pikachu.get_boosted_stats())
+
+    def test_calculate_boosted_stats_does_not_return_the_cached_dictionary(self):
+        pikachu = self.state.user.active
+        pikachu.get_boosted_stats()
+        pikachu.calculate_boosted_stats()[constants.ATTACK] = 0
+
+        self.assertNotEqual(0, pikachu.get_boosted_stats()[constants.ATTACK])
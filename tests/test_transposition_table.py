@@ -0,0 +1,73 @@
+import unittest
+
+from showdown.engine.transposition_table import TranspositionTable
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.transposition_table = TranspositionTable(max_size=2)
+
+    def test_get_returns_none_for_missing_key(self):
+        self.assertIsNone(self.transposition_table.get("position", 1))
+        self.assertEqual(1, self.transposition_table.misses)
+
+    def test_get_returns_stored_scores_for_the_same_depth(self):
+        scores = {("tackle", "tackle"): 10}
+        self.transposition_table.put("position", 1, scores)
+
+        self.assertIs(scores, self.transposition_table.get("position", 1))
+        self.assertEqual(1, self.transposition_table.hits)
+
+    def test_get_misses_for_a_different_depth(self):
+        self.transposition_table.put("position", 1, {("tackle", "tackle"): 10})
+
+        self.assertIsNone(self.transposition_table.get("position", 2))
+        self.assertEqual(1, self.transposition_table.misses)
+
+    def test_each_depth_of_a_position_has_its_own_entry(self):
+        deep_scores = {("tackle", "tackle"): 10}
+        shallow_scores = {("tackle", "tackle"): 5}
+        self.transposition_table.put("position", 2, deep_scores)
+        self.transposition_table.put("position", 1, shallow_scores)
+
+        self.assertIs(deep_scores, self.transposition_table.get("position", 2))
+        self.assertIs(shallow_scores, self.transposition_table.get("position", 1))
+
+    def test_shallower_search_of_a_position_is_stored_and_hit(self):
+        self.transposition_table.put("position", 2, {("tackle", "tackle"): 10})
+        self.assertIsNone(self.transposition_table.get("position", 1))
+
+        shallow_scores = {("tackle", "tackle"): 5}
+        self.transposition_table.put("position", 1, shallow_scores)
+
+        self.assertIs(shallow_scores, self.transposition_table.get("position", 1))
+        self.assertEqual(1, self.transposition_table.hits)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.transposition_table.put("a", 1, {})
+        self.transposition_table.put("b", 1, {})
+        self.transposition_table.get("a", 1)
+        self.transposition_table.put("c", 1, {})
+
+        self.assertEqual(2, len(self.transposition_table))
+        self.assertIsNotNone(self.transposition_table.get("a", 1))
+        self.assertIsNone(self.transposition_table.get("b", 1))
+
+    def test_hit_rate(self):
+        self.transposition_table.put("a", 1, {})
+        self.transposition_table.get("a", 1)
+        self.transposition_table.get("b", 1)
+
+        self.assertEqual(0.5, self.transposition_table.hit_rate())
+
+    def test_hit_rate_is_zero_before_any_lookups(self):
+        self.assertEqual(0, self.transposition_table.hit_rate())
+
+    def test_clear_resets_entries_and_counters(self):
+        self.transposition_table.put("a", 1, {})
+        self.transposition_table.get("a", 1)
+        self.transposition_table.clear()
+
+        self.assertEqual(0, len(self.transposition_table))
+        self.assertEqual(0, self.transposition_table.hits)
+        self.assertEqual(0, self.transposition_table.misses)